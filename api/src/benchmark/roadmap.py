@@ -0,0 +1,182 @@
+# Banc d'essai hors ligne du calcul de tournées.
+# Usage (depuis api/src) : python -m benchmark.roadmap --sizes 10 50 200 1000 --budget-ms 2000 [--pipeline]
+# Sans --pipeline, seuls numpy et scipy sont nécessaires. --pipeline importe les services de l'API :
+# il faut les dépendances de requirements.txt, mais ni base de données ni accès réseau
+import argparse
+import json
+import time
+import numpy as np
+from scipy.sparse.csgraph import minimum_spanning_tree
+from service.route_optimizer import RouteOptimizerService
+
+# Centres de Paris et de villes d'Île-de-France : (latitude, longitude, écart-type en degrés, poids)
+CLUSTERS = [
+    (48.8566, 2.3522, 0.025, 0.45),  # Paris
+    (48.8049, 2.1204, 0.012, 0.08),  # Versailles
+    (48.9362, 2.3574, 0.010, 0.08),  # Saint-Denis
+    (48.7904, 2.4556, 0.010, 0.08),  # Créteil
+    (48.8924, 2.2071, 0.010, 0.08),  # Nanterre
+    (48.6241, 2.4290, 0.012, 0.07),  # Évry
+    (49.0364, 2.0761, 0.012, 0.08),  # Cergy
+    (48.9601, 2.8788, 0.012, 0.08),  # Meaux
+]
+CONSTRUCTIONS = ("nearest_neighbour", "greedy_edge", "christofides")
+
+
+def generate_instance(size: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng([seed, size])
+    weights = np.array([cluster[3] for cluster in CLUSTERS])
+    choices = rng.choice(len(CLUSTERS), size=size, p=weights / weights.sum())
+    centers = np.array([cluster[:2] for cluster in CLUSTERS])[choices]
+    spreads = np.array([cluster[2] for cluster in CLUSTERS])[choices]
+    # Le premier point est l'entrepôt, au centre de Paris
+    coordinates = centers + rng.normal(size=(size, 2)) * spreads[:, np.newaxis]
+    coordinates[0] = CLUSTERS[0][:2]
+    return coordinates
+
+
+def one_tree_length(dist_matrix: np.ndarray, penalties: np.ndarray):
+    # 1-arbre : arbre couvrant minimal sans le point 0 + ses deux arêtes les plus courtes
+    n = len(dist_matrix)
+    weights = dist_matrix + penalties[:, np.newaxis] + penalties[np.newaxis, :]
+    # minimum_spanning_tree ignore les arêtes nulles ou négatives : on décale toutes les arêtes
+    offset = max(0.0, -weights[1:, 1:].min()) + 1.0
+    sub_weights = weights[1:, 1:] + offset
+    np.fill_diagonal(sub_weights, 0)
+    mst = minimum_spanning_tree(sub_weights).tocoo()
+    degrees = np.zeros(n)
+    np.add.at(degrees, mst.row + 1, 1)
+    np.add.at(degrees, mst.col + 1, 1)
+    closest = np.argsort(weights[0, 1:])[:2] + 1
+    degrees[0] = 2
+    degrees[closest] += 1
+    length = mst.data.sum() - offset * mst.nnz + weights[0, closest].sum()
+    return float(length - 2 * penalties.sum()), degrees
+
+
+def one_tree_bound(dist_matrix: np.ndarray, upper_bound: float, iterations: int = 100) -> float:
+    # Borne de Held-Karp : sous-gradient sur les pénalités des points (pas de Polyak)
+    n = len(dist_matrix)
+    if n < 3:
+        return float(2 * dist_matrix[0].max())
+    penalties = np.zeros(n)
+    best, factor = 0.0, 2.0
+    for iteration in range(iterations):
+        length, degrees = one_tree_length(dist_matrix, penalties)
+        best = max(best, length)
+        subgradient = degrees - 2
+        norm = float((subgradient ** 2).sum())
+        if norm == 0:
+            break
+        penalties += factor * (upper_bound - length) / norm * subgradient
+        if iteration % 15 == 14:
+            factor /= 2
+    return best
+
+
+def run_solver(optimizer: RouteOptimizerService, coordinates: np.ndarray, construction: str,
+               budget_ms: int, workers: int) -> dict:
+    # Mêmes étapes que get_optimal_order_with_stats, chronométrées une à une ; le budget court dès la matrice
+    timings = dict()
+    wall_deadline = time.time() + budget_ms / 1000
+    started = time.perf_counter()
+    dist_matrix = optimizer.build_distance_matrix(coordinates)
+    timings['matrix_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    start_perm = optimizer.build_permutation(dist_matrix, method=construction,
+                                             locations=optimizer.get_kdtree_points(coordinates, "haversine"))
+    timings['construction_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    optimal_order, stats = optimizer.improve(dist_matrix, start_perm, seed=0, wall_deadline=wall_deadline,
+                                             workers=workers,
+                                             neighbour_points=optimizer.get_neighbour_points(coordinates, "haversine"))
+    timings['improvement_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    start_index = optimal_order.index(0)
+    ordered = optimal_order[start_index:] + optimal_order[:start_index]
+    timings['ordering_ms'] = (time.perf_counter() - started) * 1000
+
+    length = optimizer.tour_length(dist_matrix, ordered)
+    bound = one_tree_bound(dist_matrix, upper_bound=length)
+    return {
+        'construction_length_km': optimizer.tour_length(dist_matrix, start_perm),
+        'length_km': length,
+        'lower_bound_km': bound,
+        'gap': length / bound - 1 if bound else 0.0,
+        **{key: round(value, 3) for key, value in timings.items()},
+        'budget_exhausted': any(restart['budget_exhausted'] for restart in stats['restarts']),
+    }
+
+
+def run_pipeline(coordinates: np.ndarray) -> dict:
+    # generate_roadmap complet, avec Geoapify, S3 et le rendu de carte remplacés par des bouchons locaux
+    from unittest import mock
+    from model.location import Location
+    from service.roadmap import RoadmapService
+    from service.routing import LocalRouter
+
+    locations = [Location(id=i + 1, address=f"Point {i + 1}", description=f"Point {i + 1}",
+                          latitude=str(lat), longitude=str(lon))
+                 for i, (lat, lon) in enumerate(coordinates)]
+    by_id = {location.id: location for location in locations}
+    roadmap_service = RoadmapService()
+
+    def direction_details(locations):
+        points = [[float(location.latitude), float(location.longitude)] for location in locations]
+        points.append(points[0])
+        return points, 0, "meters", 0
+
+    with mock.patch.object(roadmap_service.location_service, "select_one_by_id", side_effect=lambda location_id: by_id[location_id]), \
+            mock.patch.object(roadmap_service.location_service, "select_all_by_id", side_effect=lambda locations_id: [by_id[i] for i in locations_id]), \
+            mock.patch.object(roadmap_service, "get_direction_details", side_effect=direction_details), \
+            mock.patch.object(roadmap_service.routing_service, "router", LocalRouter()), \
+            mock.patch.object(roadmap_service, "map_to_png", return_value=b""), \
+            mock.patch.object(roadmap_service.pdf_service, "build_roadmap_pdf", return_value=b""), \
+            mock.patch.object(roadmap_service.wasabi_s3, "upload_many", return_value=["local://roadmap.html", "local://roadmap.pdf"]):
+        started = time.perf_counter()
+        roadmap_service.generate_roadmap(locations_id=list(by_id), type="benchmark")
+        return {'pipeline_ms': round((time.perf_counter() - started) * 1000, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roadmap optimization benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--constructions", nargs="+", default=list(CONSTRUCTIONS), choices=CONSTRUCTIONS)
+    parser.add_argument("--budget-ms", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pipeline", action="store_true", help="also time generate_roadmap with network calls stubbed (needs requirements.txt installed)")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+    if args.pipeline:
+        try:
+            import service.roadmap
+        except ModuleNotFoundError as e:
+            parser.error(f"--pipeline needs the API dependencies (pip install -r requirements.txt), missing module '{e.name}'")
+
+    optimizer = RouteOptimizerService()
+    results = list()
+    print(f"{'size':>5} {'construction':>18} {'length km':>10} {'bound km':>9} {'gap':>7} "
+          f"{'constr ms':>10} {'improve ms':>11} {'order ms':>9}")
+    for size in args.sizes:
+        coordinates = generate_instance(size, seed=args.seed)
+        for construction in args.constructions:
+            result = {'size': size, 'construction': construction,
+                      **run_solver(optimizer, coordinates, construction, args.budget_ms, args.workers)}
+            if args.pipeline and construction == CONSTRUCTIONS[0]:
+                result.update(run_pipeline(coordinates))
+            results.append(result)
+            print(f"{size:>5} {construction:>18} {result['length_km']:>10.2f} {result['lower_bound_km']:>9.2f} "
+                  f"{result['gap']:>7.2%} {result['construction_ms']:>10.1f} {result['improvement_ms']:>11.1f} "
+                  f"{result['ordering_ms']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
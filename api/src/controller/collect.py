@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask_restful import Resource, reqparse, inputs, abort
 from service.collect import CollectService
 from exception.collect import *
@@ -5,27 +6,45 @@ from exception.vehicle import *
 from exception.demand import *
 from exception.storage import StorageIdNotFoundException
 from exception.demand import CollectsDemandAlreadyExistsException
+from exception.route_plan import RoutePlanNotFoundException, RoutePlanAccessDbException
 from flask import jsonify
 from flask_jwt_extended import jwt_required
 from function.roles_required import roles_required
+from function.download import download
+from exception.job import JobInProgressException, JobAccessDbException
+from exception.object_storage import ObjectNotFoundException, ObjectNotReadyException, ObjectStorageAccessException
 
 class CollectCheckArgs:
 
-    pattern = {'datetime': r'\b\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\b'}  # format : YYYY-MM-DD.
+    pattern = {'datetime': r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$'}  # format : YYYY-MM-DD.
         
     
-    def get_collect_args(self) -> dict:
+    def parse_datetime(self, value: str) -> datetime:
+        # Date convertie avant toute écriture : strptime refuse aussi les dates impossibles (31 février)
+        return datetime.strptime(inputs.regex(self.pattern['datetime'])(value), "%Y-%m-%d %H:%M:%S")
+
+
+    def get_collect_args(self, method=None) -> dict:
         parser = reqparse.RequestParser()
-        parser.add_argument('datetime', type=inputs.regex(self.pattern['datetime']), required=True, help="Invalid or missing parameter 'datetime'.")
+        parser.add_argument('datetime', type=self.parse_datetime, required=True, help="Invalid or missing parameter 'datetime'.")
         parser.add_argument('status', type=int, required=True, help="Invalid or missing parameter 'status'.")
         parser.add_argument('demands', type=int, required=True, action='append', help="Invalid or missing parameter 'demands'.")
         parser.add_argument('vehicle_id', type=int, required=True, help="Invalid or missing parameter 'vehicle_id.")
-        parser.add_argument('storage_id', type=int, required=True, help="Invalid or missing parameter 'storage_id.")
+        # À la création, l'entrepôt le plus proche des demandes est proposé si aucun stockage n'est choisi
+        parser.add_argument('storage_id', type=int, required=method != "post", help="Invalid or missing parameter 'storage_id'.")
         
         args = parser.parse_args(strict=True)
         return args
 
 
+    def get_file_args(self) -> dict:
+        parser = reqparse.RequestParser()
+        # stream : fichier relayé par l'API (Range, ETag) ; presigned : adresse temporaire vers le stockage
+        parser.add_argument('mode', type=str, location='args', choices=("stream", "presigned"), default="stream", help="Invalid parameter 'mode'.")
+        args = parser.parse_args(strict=True)
+        return args
+
+
 class CollectController(Resource):
 
     def __init__(self) -> None:
@@ -68,6 +87,10 @@ class CollectController(Resource):
             return jsonify({'message': f"Collect '{collect_id}' successfully deleted."})
         except CollectIdNotFoundException as e:
             abort(http_status_code=404, message=str(e))
+        except JobInProgressException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
         except CollectAccessDbException as e:
             abort(http_status_code=500, message=str(e)) 
             
@@ -93,9 +116,10 @@ class CollectListController(Resource):
     @roles_required([1])
     def post(self):
         try:
-            args = self.check_args.get_collect_args()
-            self.collect_service.insert(args=args)
-            return jsonify({'message': f"Collect successfully created."})
+            args = self.check_args.get_collect_args(method="post")
+            response = self.collect_service.insert(args=args)
+            response['message'] = "Collect successfully created, roadmap generation in progress."
+            return jsonify(response)
         except CollectAccessDbException as e:
             abort(http_status_code=500, message=str(e))
         except CollectsDemandAlreadyExistsException as e:
@@ -108,6 +132,8 @@ class CollectListController(Resource):
             abort(http_status_code=500, message=str(e))
         except StorageIdNotFoundException as e:
             abort(http_status_code=404, message=str(e))
+        except CollectStorageSuggestionException as e:
+            abort(http_status_code=400, message=str(e))
 
 
 
@@ -141,4 +167,45 @@ class CollectSearchController(Resource):
                 return jsonify({'message': "No collects found."})
         except CollectAccessDbException as e:
             abort(http_status_code=500, message=str(e))
-        
+
+
+class CollectItineraryController(Resource):
+    def __init__(self) -> None:
+        self.collect_service = CollectService()
+
+    @jwt_required()
+    def get(self, collect_id: int):
+        try:
+            route_plan = self.collect_service.get_itinerary(collect_id=collect_id)
+            return jsonify(route_plan.json())
+        except CollectIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except RoutePlanNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except CollectAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except RoutePlanAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class CollectFileController(Resource):
+    def __init__(self) -> None:
+        self.check_args = CollectCheckArgs()
+        self.collect_service = CollectService()
+
+    @jwt_required()
+    def get(self, collect_id: int, name: str):
+        try:
+            args = self.check_args.get_file_args()
+            src = self.collect_service.get_file(collect_id=collect_id, name=name)
+            return download(self.collect_service.wasabi_service, src=src, mode=args['mode'])
+        except CollectIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectNotReadyException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectStorageAccessException as e:
+            abort(http_status_code=500, message=str(e))
+        except CollectAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask_restful import Resource, reqparse, inputs, abort
 from service.delivery import DeliveryService
 from exception.delivery import *
@@ -6,18 +7,27 @@ from exception.type import *
 from exception.vehicle import *
 from exception.location import *
 from exception.package import PackageDeliveryAlreadyExistsException, PackageIdNotFoundException
+from exception.route_plan import RoutePlanNotFoundException, RoutePlanAccessDbException
 from flask import jsonify
 from flask_jwt_extended import jwt_required
 from function.roles_required import roles_required
+from function.download import download
+from exception.object_storage import ObjectNotFoundException, ObjectNotReadyException, ObjectStorageAccessException
+from exception.job import JobInProgressException, JobAccessDbException
 
 class DeliveryCheckArgs:
 
-    pattern = {'datetime': r'\b\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\b'}  # format : YYYY-MM-DD.
+    pattern = {'datetime': r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$'}  # format : YYYY-MM-DD.
         
     
+    def parse_datetime(self, value: str) -> datetime:
+        # Date convertie avant toute écriture : strptime refuse aussi les dates impossibles (31 février)
+        return datetime.strptime(inputs.regex(self.pattern['datetime'])(value), "%Y-%m-%d %H:%M:%S")
+
+
     def get_delivery_args(self, method=None) -> dict:
         parser = reqparse.RequestParser()
-        parser.add_argument('datetime', type=inputs.regex(self.pattern['datetime']), required=True, help="Invalid or missing parameter 'datetime'.")
+        parser.add_argument('datetime', type=self.parse_datetime, required=True, help="Invalid or missing parameter 'datetime'.")
         parser.add_argument('status', type=int, required=True, help="Invalid or missing parameter 'status'.")
         if method == "post":
             parser.add_argument('locations', type=int, required=True, action='append', help="Invalid or missing parameter 'locations'.")
@@ -27,6 +37,14 @@ class DeliveryCheckArgs:
         return args
 
 
+    def get_file_args(self) -> dict:
+        parser = reqparse.RequestParser()
+        # stream : fichier relayé par l'API (Range, ETag) ; presigned : adresse temporaire vers le stockage
+        parser.add_argument('mode', type=str, location='args', choices=("stream", "presigned"), default="stream", help="Invalid parameter 'mode'.")
+        args = parser.parse_args(strict=True)
+        return args
+
+
 class DeliveryController(Resource):
 
     def __init__(self) -> None:
@@ -68,6 +86,10 @@ class DeliveryController(Resource):
             return jsonify({'message': f"Delivery '{delivery_id}' successfully deleted."})
         except DeliveryIdNotFoundException as e:
             abort(http_status_code=404, message=str(e))
+        except JobInProgressException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
         except DeliveryAccessDbException as e:
             abort(http_status_code=500, message=str(e)) 
             
@@ -94,8 +116,9 @@ class DeliveryListController(Resource):
     def post(self):
         try:
             args = self.check_args.get_delivery_args(method="post")
-            self.delivery_service.insert(args=args)
-            return jsonify({'message': f"Delivery successfully created."})
+            response = self.delivery_service.insert(args=args)
+            response['message'] = "Delivery successfully created, roadmap generation in progress."
+            return jsonify(response)
         except DeliveryAccessDbException as e:
             abort(http_status_code=500, message=str(e))
         except LocationIdNotFoundException as e:
@@ -160,6 +183,10 @@ class DeliversToLocationController(Resource):
             abort(http_status_code=404, message=str(e))
         except DeliversToLocationAlreadyExistsException as e:
             abort(http_status_code=400, message=str(e))
+        except JobInProgressException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
         except LocationAccessDbException as e:
             abort(http_status_code=500, message=str(e))
         except DeliveryAccessDbException as e:
@@ -177,7 +204,57 @@ class DeliversToLocationController(Resource):
             abort(http_status_code=404, message=str(e))
         except DeliversToLocationNotFoundException as e:
             abort(http_status_code=404, message=str(e))
+        except DeliveryStartLocationException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobInProgressException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
         except DeliveryAccessDbException as e:
             abort(http_status_code=500, message=str(e))
         except LocationAccessDbException as e:
-            abort(http_status_code=500, message=str(e))
\ No newline at end of file
+            abort(http_status_code=500, message=str(e))
+        except RoutePlanAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class DeliveryItineraryController(Resource):
+    def __init__(self) -> None:
+        self.delivery_service = DeliveryService()
+
+    @jwt_required()
+    def get(self, delivery_id: int):
+        try:
+            route_plan = self.delivery_service.get_itinerary(delivery_id=delivery_id)
+            return jsonify(route_plan.json())
+        except DeliveryIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except RoutePlanNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except DeliveryAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except RoutePlanAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class DeliveryFileController(Resource):
+    def __init__(self) -> None:
+        self.check_args = DeliveryCheckArgs()
+        self.delivery_service = DeliveryService()
+
+    @jwt_required()
+    def get(self, delivery_id: int, name: str):
+        try:
+            args = self.check_args.get_file_args()
+            src = self.delivery_service.get_file(delivery_id=delivery_id, name=name)
+            return download(self.delivery_service.wasabi_service, src=src, mode=args['mode'])
+        except DeliveryIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectNotReadyException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectStorageAccessException as e:
+            abort(http_status_code=500, message=str(e))
+        except DeliveryAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
@@ -2,13 +2,18 @@ from flask_restful import Resource, reqparse, inputs, abort
 from service.demand import DemandService
 from exception.demand import *
 from exception.shop import *
+from exception.warehouse import WarehouseAccessDbException
+from service.warehouse_assignment import WarehouseAssignmentService
 from flask import jsonify
 from flask_jwt_extended import jwt_required
 from function.roles_required import roles_required
+from function.download import download
+from exception.job import JobInProgressException, JobAccessDbException
+from exception.object_storage import ObjectNotFoundException, ObjectNotReadyException, ObjectStorageAccessException
 
 class DemandCheckArgs:
 
-    pattern = {'datetime': r'\b\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\b',
+    pattern = {'datetime': r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$',
                'description': r'\b[A-Za-zÀ-ÖØ-öø-ÿ\s\d\-,.#]{1,500}\b'}  # format : YYYY-MM-DD.
         
     
@@ -22,8 +27,17 @@ class DemandCheckArgs:
             parser.add_argument('packages', action='append', help="Invalid or missing parameter 'packages'.")
         if method == "update":
             parser.add_argument('submitted_datetime', type=inputs.regex(self.pattern['datetime']), required=True, help="Invalid or missing parameter 'submitted_datetime'.")
-            parser.add_argument('pdf', type=str, required=True, help="Invalid or missing parameter 'pdf'.")
-            parser.add_argument('qr_code', type=str, required=True, help="Invalid or missing parameter 'qr_code'.")
+            # Remplis par la tâche de génération du QR code : absents, ils ne sont pas modifiés
+            parser.add_argument('pdf', type=str, help="Invalid parameter 'pdf'.")
+            parser.add_argument('qr_code', type=str, help="Invalid parameter 'qr_code'.")
+        args = parser.parse_args(strict=True)
+        return args
+
+
+    def get_file_args(self) -> dict:
+        parser = reqparse.RequestParser()
+        # stream : fichier relayé par l'API (Range, ETag) ; presigned : adresse temporaire vers le stockage
+        parser.add_argument('mode', type=str, location='args', choices=("stream", "presigned"), default="stream", help="Invalid parameter 'mode'.")
         args = parser.parse_args(strict=True)
         return args
 
@@ -68,6 +82,10 @@ class DemandController(Resource):
             return jsonify({'message': f"Demand '{demand_id}' successfully deleted."})
         except DemandIdNotFoundException as e:
             abort(http_status_code=404, message=str(e))
+        except JobInProgressException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
         except DemandAccessDbException as e:
             abort(http_status_code=500, message=str(e)) 
             
@@ -96,7 +114,7 @@ class DemandListController(Resource):
         try:
             args = self.check_args.get_demand_args(method="post")
             response = self.demand_service.insert(args=args)
-            response['message'] = "Demand successfully created."
+            response['message'] = "Demand successfully created, QR code generation in progress."
             return jsonify(response)
         except DemandAccessDbException as e:
             abort(http_status_code=500, message=str(e))
@@ -138,4 +156,42 @@ class DemandSearchController(Resource):
                 return jsonify({'message': "No demands found."})
         except DemandAccessDbException as e:
             abort(http_status_code=500, message=str(e))
-        
\ No newline at end of file
+
+
+class DemandGroupingController(Resource):
+    def __init__(self) -> None:
+        self.warehouse_assignment_service = WarehouseAssignmentService()
+
+    @jwt_required()
+    @roles_required([1])
+    def get(self):
+        try:
+            # Demandes sans collecte regroupées par entrepôt le plus proche
+            return jsonify(self.warehouse_assignment_service.get_collect_groupings())
+        except DemandAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except WarehouseAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class DemandFileController(Resource):
+    def __init__(self) -> None:
+        self.check_args = DemandCheckArgs()
+        self.demand_service = DemandService()
+
+    @jwt_required()
+    def get(self, demand_id: int, name: str):
+        try:
+            args = self.check_args.get_file_args()
+            src = self.demand_service.get_file(demand_id=demand_id, name=name)
+            return download(self.demand_service.wasabi_service, src=src, mode=args['mode'])
+        except DemandIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectNotReadyException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectStorageAccessException as e:
+            abort(http_status_code=500, message=str(e))
+        except DemandAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
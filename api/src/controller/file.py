@@ -0,0 +1,21 @@
+from flask_restful import Resource, abort
+from service.object_storage import get_object_storage
+from exception.object_storage import ObjectNotFoundException, ObjectStorageBackendException
+from function.download import send_object
+
+
+class FileController(Resource):
+    def __init__(self) -> None:
+        self.object_storage = get_object_storage()
+
+    def get(self, key: str):
+        try:
+            # Avec le stockage Wasabi, les fichiers sont servis directement par le bucket
+            if self.object_storage.name != "local":
+                raise ObjectStorageBackendException(backend=self.object_storage.name)
+            return send_object(self.object_storage.stat(key=key),
+                               lambda start, end: self.object_storage.read_range(key=key, start=start, end=end))
+        except ObjectNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ObjectStorageBackendException as e:
+            abort(http_status_code=404, message=str(e))
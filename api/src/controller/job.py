@@ -0,0 +1,54 @@
+from flask_restful import Resource, abort
+from service.job import JobService
+from service.delivery import DeliveryService
+from service.collect import CollectService
+from service.demand import DemandService
+from exception.job import JobIdNotFoundException, JobAccessDbException, JobInProgressException, JobRetryException
+from flask import jsonify
+from flask_jwt_extended import jwt_required
+from function.roles_required import roles_required
+
+
+# Service et méthode exécutés par chaque type de job
+JOB_TASKS = {
+    "delivery_roadmap": (DeliveryService, "generate_roadmap"),
+    "collect_roadmap": (CollectService, "generate_roadmap"),
+    "demand_qr_code": (DemandService, "generate_qr_code"),
+}
+
+
+class JobController(Resource):
+    def __init__(self) -> None:
+        self.job_service = JobService()
+
+    @jwt_required()
+    def get(self, job_id: int):
+        try:
+            job = self.job_service.select_one_by_id(job_id=job_id)
+            return jsonify(job.json())
+        except JobIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class JobRetryController(Resource):
+    def __init__(self) -> None:
+        self.job_service = JobService()
+
+    @jwt_required()
+    @roles_required([1])
+    def post(self, job_id: int):
+        try:
+            job = self.job_service.select_one_by_id(job_id=job_id)
+            service, method = JOB_TASKS[job.type]
+            new_job_id = self.job_service.retry(job_id=job_id, task=getattr(service(), method))
+            return jsonify({'job_id': new_job_id, 'message': f"Job '{job_id}' retried as job '{new_job_id}'."})
+        except JobIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except JobRetryException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobInProgressException as e:
+            abort(http_status_code=409, message=str(e))
+        except JobAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
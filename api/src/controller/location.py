@@ -20,6 +20,24 @@ class LocationCheckArgs:
         args = parser.parse_args(strict=True)
         return args
 
+    def get_radius_args(self) -> dict:
+        parser = reqparse.RequestParser()
+        parser.add_argument('radius_km', type=float, required=False, default=5.0, help="Invalid parameter 'radius_km'")
+        args = parser.parse_args(strict=True)
+        return args
+
+    def get_locations_args(self) -> list[dict]:
+        parser = reqparse.RequestParser()
+        parser.add_argument('locations', type=dict, required=True, action='append', help="Invalid or missing parameter 'locations'")
+        args = parser.parse_args(strict=True)
+        for location in args['locations']:
+            for field in ('address', 'zip_code', 'country', 'city'):
+                try:
+                    inputs.regex(self.pattern['country' if field == 'city' else field])(str(location.get(field, "")))
+                except ValueError:
+                    abort(http_status_code=400, message=f"Invalid or missing parameter '{field}'")
+        return args['locations']
+
 
 class LocationController(Resource):
 
@@ -50,6 +68,8 @@ class LocationController(Resource):
             abort(http_status_code=500, message=str(e))
         except LocationDetailsException as e:
             abort(http_status_code=500, message=str(e))        
+        except GeocodeCacheAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
    
     @jwt_required()
     @roles_required([1])
@@ -91,3 +111,44 @@ class LocationListController(Resource):
             abort(http_status_code=500, message=str(e))
         except LocationDetailsException as e:
             abort(http_status_code=500, message=str(e))
+        except GeocodeCacheAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class LocationBulkController(Resource):
+    def __init__(self) -> None:
+        self.check_args = LocationCheckArgs()
+        self.location_service = LocationService()
+
+    @jwt_required()
+    @roles_required([1])
+    def post(self):
+        try:
+            locations = self.check_args.get_locations_args()
+            new_locations_id = self.location_service.insert_many(locations=locations)
+            # locations_id suit l'ordre reçu, les adresses introuvables y valent null et sont détaillées dans failed
+            failed = [{'index': index, 'address': locations[index]['address'], 'message': str(LocationDetailsException())}
+                      for index, location_id in enumerate(new_locations_id) if location_id is None]
+            return jsonify({'message': f"{len(locations) - len(failed)} locations successfully created.",
+                            'locations_id': new_locations_id, 'failed': failed})
+        except LocationAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except GeocodeCacheAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+
+
+class LocationNearbyController(Resource):
+    def __init__(self) -> None:
+        self.check_args = LocationCheckArgs()
+        self.location_service = LocationService()
+
+    @jwt_required()
+    def get(self, location_id: int):
+        try:
+            args = self.check_args.get_radius_args()
+            nearby = self.location_service.select_within_radius(location_id=location_id, radius_km=args['radius_km'])
+            return jsonify([{**location.json_rest(), 'distance': round(distance, 3)} for location, distance in nearby])
+        except LocationIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except LocationAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
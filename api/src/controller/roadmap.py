@@ -1,6 +1,11 @@
 from flask_restful import Resource, reqparse, abort
 from service.roadmap import RoadmapService
+from service.vehicle_routing import VehicleRoutingService
 from exception.location import LocationAccessDbException, LocationIdNotFoundException
+from exception.roadmap import RoadmapWeightsException
+from exception.warehouse import WarehouseIdNotFoundException, WarehouseAccessDbException
+from exception.vehicle import VehicleIdNotFoundException, VehicleAccessDbException
+from exception.package import PackageIdNotFoundException, PackageAccessDbException
 from flask import jsonify
 from flask_jwt_extended import jwt_required
 from function.roles_required import roles_required
@@ -9,6 +14,19 @@ class RoadmapCheckArgs:
     def get_roadmap_args(self) -> dict:
         parser = reqparse.RequestParser()
         parser.add_argument('locations_id', type=int, required=True, action='append', help="Invalid or missing parameter 'locations_id'.")
+        parser.add_argument('construction', type=str, required=False, default="nearest_neighbour", choices=("nearest_neighbour", "greedy_edge", "christofides"), help="Invalid parameter 'construction'.")
+        parser.add_argument('metric', type=str, required=False, default="haversine", choices=("haversine", "equirectangular", "road"), help="Invalid parameter 'metric'.")
+        args = parser.parse_args(strict=True)
+        return args
+
+    def get_routes_args(self) -> dict:
+        parser = reqparse.RequestParser()
+        parser.add_argument('warehouse_id', type=int, required=True, help="Invalid or missing parameter 'warehouse_id'.")
+        parser.add_argument('locations_id', type=int, required=True, action='append', help="Invalid or missing parameter 'locations_id'.")
+        parser.add_argument('vehicles_id', type=int, required=True, action='append', help="Invalid or missing parameter 'vehicles_id'.")
+        parser.add_argument('weights', type=float, required=False, action='append', help="Invalid parameter 'weights'.")
+        parser.add_argument('packages', type=int, required=False, action='append', help="Invalid parameter 'packages'.")
+        parser.add_argument('method', type=str, required=False, default="savings", choices=("savings", "sweep"), help="Invalid parameter 'method'.")
         args = parser.parse_args(strict=True)
         return args
     
@@ -21,15 +39,44 @@ class RoadmapController(Resource):
     def get(self):
         try:
             args = self.check_args.get_roadmap_args()
-            response= self.roadmap_service.generate_roadmap(args['locations_id'])
+            # Calcul seul : carte, PDF et envois S3 ne sont produits qu'à l'enregistrement d'une collecte ou livraison
+            response = self.roadmap_service.get_order(locations_id=args['locations_id'], construction=args['construction'], metric=args['metric'])
             return jsonify(response)
         except LocationIdNotFoundException as e:
             abort(http_status_code=404, message=str(e))
         except LocationAccessDbException as e:
-            abort(http_status_code=500, message=str(e)) 
-       
+            abort(http_status_code=500, message=str(e))
 
 
-   
+class RoadmapRoutesController(Resource):
+    def __init__(self) -> None:
+        self.vehicle_routing_service = VehicleRoutingService()
+        self.check_args = RoadmapCheckArgs()
 
-   
\ No newline at end of file
+    @jwt_required()
+    @roles_required([1])
+    def post(self):
+        try:
+            args = self.check_args.get_routes_args()
+            response = self.vehicle_routing_service.plan_routes(
+                warehouse_id=args['warehouse_id'], locations_id=args['locations_id'], vehicles_id=args['vehicles_id'],
+                weights=args['weights'], packages=args['packages'], method=args['method'])
+            return jsonify(response)
+        except RoadmapWeightsException as e:
+            abort(http_status_code=400, message=str(e))
+        except WarehouseIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except LocationIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except VehicleIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except PackageIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except WarehouseAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except LocationAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except VehicleAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except PackageAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
@@ -3,6 +3,7 @@ from service.shop import ShopService
 from exception.shop import *
 from exception.company import *
 from exception.location import *
+from exception.warehouse import WarehouseAccessDbException
 from flask import jsonify
 from flask_jwt_extended import jwt_required
 from function.roles_required import roles_required
@@ -29,6 +30,12 @@ class ShopCheckArgs:
         args = parser.parse_args(strict=True)
         return args
 
+    def get_nearest_args(self) -> dict:
+        parser = reqparse.RequestParser()
+        parser.add_argument("k", type=inputs.positive, required=False, default=3, help="Invalid parameter 'k'.")
+        args = parser.parse_args(strict=True)
+        return args
+
 
 class ShopController(Resource):
 
@@ -147,4 +154,22 @@ class ShopSearchController(Resource):
                 return jsonify({'message': "No shops found."})
         except ShopAccessDbException as e:
             abort(http_status_code=500, message=str(e))
-        
\ No newline at end of file
+
+
+class ShopNearestWarehouseController(Resource):
+    def __init__(self) -> None:
+        self.check_args = ShopCheckArgs()
+        self.shop_service = ShopService()
+
+    @jwt_required()
+    def get(self, shop_id: int):
+        try:
+            args = self.check_args.get_nearest_args()
+            warehouses = self.shop_service.select_nearest_warehouses(shop_id=shop_id, k=args['k'])
+            return jsonify([{**warehouse.json_rest_storage(), 'distance': round(distance, 3)} for warehouse, distance in warehouses])
+        except ShopIdNotFoundException as e:
+            abort(http_status_code=404, message=str(e))
+        except ShopAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
+        except WarehouseAccessDbException as e:
+            abort(http_status_code=500, message=str(e))
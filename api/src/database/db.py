@@ -1,4 +1,3 @@
-import mysql.connector
 import os
 from flask_sqlalchemy import SQLAlchemy
 
@@ -0,0 +1,6 @@
+class ArtifactAccessDbException(Exception):
+    def __init__(self, method: str) -> None:
+        self.method = method
+
+    def __str__(self) -> str:
+        return f"Error {self.method} artifacts."
@@ -17,4 +17,8 @@ class CollectAccessDbException(Exception):
             return f"Error {self.method} collect '{self.collect_id}'."
         else: 
             return f"Error {self.method} collects."
-        
+
+
+class CollectStorageSuggestionException(Exception):
+    def __str__(self) -> str:
+        return "No storage could be suggested for these demands, please provide 'storage_id'."
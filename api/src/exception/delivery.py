@@ -32,4 +32,13 @@ class DeliversToLocationNotFoundException(Exception):
         self.location_id = location_id
 
     def __str__(self) -> str:
-        return f"Delivery id '{self.delivery_id}' don't contain location id '{self.location_id}'."
\ No newline at end of file
+        return f"Delivery id '{self.delivery_id}' don't contain location id '{self.location_id}'."
+
+
+class DeliveryStartLocationException(Exception):
+    def __init__(self, delivery_id: int, location_id: int) -> None:
+        self.delivery_id = delivery_id
+        self.location_id = location_id
+
+    def __str__(self) -> str:
+        return f"Location id '{self.location_id}' is the starting point of delivery id '{self.delivery_id}', remove the other locations first."
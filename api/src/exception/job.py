@@ -0,0 +1,35 @@
+class JobIdNotFoundException(Exception):
+    def __init__(self, job_id: int) -> None:
+        self.job_id = job_id
+
+    def __str__(self) -> str:
+        return f"Job with id '{self.job_id}' not found."
+
+
+class JobInProgressException(Exception):
+    def __init__(self, type: str, target_id: int) -> None:
+        self.type = type
+        self.target_id = target_id
+
+    def __str__(self) -> str:
+        return f"Job '{self.type}' for id '{self.target_id}' is still in progress, retry once it is finished."
+
+
+class JobRetryException(Exception):
+    def __init__(self, job_id: int) -> None:
+        self.job_id = job_id
+
+    def __str__(self) -> str:
+        return f"Job '{self.job_id}' cannot be retried, only failed jobs with saved parameters can."
+
+
+class JobAccessDbException(Exception):
+    def __init__(self, job_id: int, method: str) -> None:
+        self.job_id = job_id
+        self.method = method
+
+    def __str__(self) -> str:
+        if self.job_id:
+            return f"Error {self.method} job '{self.job_id}'."
+        else:
+            return f"Error {self.method} jobs."
@@ -20,4 +20,20 @@ class LocationAccessDbException(Exception):
 
 class LocationDetailsException(Exception):
     def __str__(self) -> str:
-        return f"Error, please retry with real addresses."
\ No newline at end of file
+        return f"Error, please retry with real addresses."
+
+class GeocodeCacheAccessDbException(Exception):
+    def __init__(self, method: str) -> None:
+        self.method = method
+
+    def __str__(self) -> str:
+        return f"Error {self.method} geocode cache."
+
+
+class GeocodingProviderException(Exception):
+    def __init__(self, provider: str, providers: list[str]) -> None:
+        self.provider = provider
+        self.providers = providers
+
+    def __str__(self) -> str:
+        return f"Unknown geocoding provider '{self.provider}' in GEOCODING_PROVIDER, expected one of: {', '.join(self.providers)}."
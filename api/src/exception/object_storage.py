@@ -0,0 +1,46 @@
+class ObjectNotFoundException(Exception):
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def __str__(self) -> str:
+        return f"File '{self.key}' not found."
+
+
+class ObjectNotReadyException(Exception):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __str__(self) -> str:
+        return f"File '{self.name}' is not available yet."
+
+
+class ObjectRangeException(Exception):
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def __str__(self) -> str:
+        return f"Requested range not satisfiable, file size is {self.size} bytes."
+
+
+class ObjectStorageBackendException(Exception):
+    def __init__(self, backend: str) -> None:
+        self.backend = backend
+
+    def __str__(self) -> str:
+        return f"Files are not served by the API with the '{self.backend}' storage backend."
+
+
+class ObjectDeleteException(Exception):
+    def __init__(self, keys: list[str]) -> None:
+        self.keys = keys
+
+    def __str__(self) -> str:
+        return f"Error deleting files {', '.join(self.keys)}."
+
+
+class ObjectStorageAccessException(Exception):
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def __str__(self) -> str:
+        return f"Error reading file '{self.key}' from storage."
@@ -3,4 +3,38 @@ class RoadmapIdNotFoundException(Exception):
         self.delivery_id = delivery_id
 
     def __str__(self) -> str:
-        return f"Delivery with id '{self.delivery_id}' not found."
\ No newline at end of file
+        return f"Delivery with id '{self.delivery_id}' not found."
+
+
+class RoadmapConstructionException(Exception):
+    def __init__(self, method: str) -> None:
+        self.method = method
+
+    def __str__(self) -> str:
+        return f"Unknown roadmap construction method '{self.method}'."
+
+
+class RoadmapMetricException(Exception):
+    def __init__(self, metric: str) -> None:
+        self.metric = metric
+
+    def __str__(self) -> str:
+        if self.metric == "road":
+            return f"Metric 'road' requires a precomputed distance matrix matching the locations."
+        return f"Unknown roadmap distance metric '{self.metric}'."
+
+
+class RoadmapWeightsException(Exception):
+    def __str__(self) -> str:
+        return f"Parameter 'weights' must contain one weight per location."
+
+
+class RoutingProviderException(Exception):
+    def __init__(self, provider: str, status_code: int = None) -> None:
+        self.provider = provider
+        self.status_code = status_code
+
+    def __str__(self) -> str:
+        if self.status_code:
+            return f"Routing provider '{self.provider}' answered with status {self.status_code}."
+        return f"Routing provider '{self.provider}' is unavailable."
@@ -0,0 +1,19 @@
+class RoutePlanNotFoundException(Exception):
+    def __init__(self, owner: str, owner_id: int) -> None:
+        self.owner = owner
+        self.owner_id = owner_id
+
+    def __str__(self) -> str:
+        return f"No route plan found for {self.owner} '{self.owner_id}'."
+
+
+class RoutePlanAccessDbException(Exception):
+    def __init__(self, route_plan_id: int, method: str) -> None:
+        self.route_plan_id = route_plan_id
+        self.method = method
+
+    def __str__(self) -> str:
+        if self.route_plan_id:
+            return f"Error {self.method} route plan '{self.route_plan_id}'."
+        else:
+            return f"Error {self.method} route plans."
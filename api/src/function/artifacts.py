@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+
+def artifact_dir() -> tempfile.TemporaryDirectory:
+    # Dossier propre à une génération (carte, PDF, QR code), supprimé en sortie du bloc with
+    return tempfile.TemporaryDirectory(prefix="artifacts-", dir=os.getenv('ARTIFACTS_TMP_DIR'))
@@ -0,0 +1,76 @@
+import numpy as np
+from scipy.spatial.distance import cdist
+from exception.roadmap import RoadmapMetricException
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def euclidean_matrix(coordinates: np.ndarray) -> np.ndarray:
+    return cdist(coordinates, coordinates)
+
+
+def haversine_matrix(coordinates: np.ndarray) -> np.ndarray:
+    radians = np.radians(np.asarray(coordinates, dtype=float))
+    lat = radians[:, 0][:, np.newaxis]
+    lon = radians[:, 1][:, np.newaxis]
+    dlat = lat.T - lat
+    dlon = lon.T - lon
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(lat.T) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def haversine_distances(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    # Distances point à point (km) entre deux listes de coordonnées de même taille
+    origins = np.radians(np.asarray(origins, dtype=float))
+    destinations = np.radians(np.asarray(destinations, dtype=float))
+    dlat = destinations[:, 0] - origins[:, 0]
+    dlon = destinations[:, 1] - origins[:, 1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(origins[:, 0]) * np.cos(destinations[:, 0]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def project_equirectangular(coordinates: np.ndarray) -> np.ndarray:
+    # Projection plane en km, valable à l'échelle d'une région
+    coordinates = np.asarray(coordinates, dtype=float)
+    radians = np.radians(coordinates)
+    mean_lat = radians[:, 0].mean()
+    x = radians[:, 1] * np.cos(mean_lat) * EARTH_RADIUS_KM
+    y = radians[:, 0] * EARTH_RADIUS_KM
+    return np.column_stack((y, x))
+
+
+def equirectangular_matrix(coordinates: np.ndarray) -> np.ndarray:
+    projected = project_equirectangular(coordinates)
+    return cdist(projected, projected)
+
+
+def to_unit_vectors(coordinates: np.ndarray) -> np.ndarray:
+    # Points sur la sphère unité : la distance euclidienne croît avec la distance orthodromique
+    radians = np.radians(np.asarray(coordinates, dtype=float).reshape(-1, 2))
+    cos_lat = np.cos(radians[:, 0])
+    return np.column_stack((cos_lat * np.cos(radians[:, 1]), cos_lat * np.sin(radians[:, 1]), np.sin(radians[:, 0])))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float):
+    # Rectangle (lat_min, lat_max, lon_min, lon_max) contenant le cercle de rayon radius_km
+    dlat = np.degrees(radius_km / EARTH_RADIUS_KM)
+    dlon = np.degrees(radius_km / (EARTH_RADIUS_KM * max(np.cos(np.radians(latitude)), 1e-6)))
+    return float(latitude - dlat), float(latitude + dlat), float(longitude - dlon), float(longitude + dlon)
+
+
+DISTANCE_METRICS = {
+    "euclidean": euclidean_matrix,
+    "haversine": haversine_matrix,
+    "equirectangular": equirectangular_matrix,
+}
+
+
+def distance_matrix(coordinates: np.ndarray, metric: str = "haversine", road_matrix: np.ndarray = None) -> np.ndarray:
+    if metric == "road":
+        # Distances routières précalculées, dans l'ordre des coordonnées
+        if road_matrix is None or np.shape(road_matrix) != (len(coordinates), len(coordinates)):
+            raise RoadmapMetricException(metric=metric)
+        return np.asarray(road_matrix, dtype=float)
+    if metric not in DISTANCE_METRICS:
+        raise RoadmapMetricException(metric=metric)
+    return DISTANCE_METRICS[metric](coordinates)
@@ -0,0 +1,66 @@
+import re
+from flask import Response, jsonify, request
+from exception.object_storage import ObjectRangeException
+
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: str, size: int):
+    # Une seule plage « début-fin » ou « -n » (n derniers octets), sinon le fichier entier est renvoyé
+    match = RANGE_PATTERN.match(header.replace(" ", "")) if header else None
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        if int(last) == 0:
+            raise ObjectRangeException(size=size)
+        return max(0, size - int(last)), size
+    start = int(first)
+    if last != "" and int(last) < start:
+        return None
+    if start >= size:
+        raise ObjectRangeException(size=size)
+    return start, size if last == "" else min(int(last) + 1, size)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def send_object(info: dict, read_range) -> Response:
+    size = info['size']
+    # no-cache : le client garde sa copie mais la revalide avec If-None-Match à chaque ouverture
+    headers = {'ETag': info['etag'], 'Accept-Ranges': "bytes", 'Cache-Control': "private, no-cache"}
+    if etag_matches(request.headers.get('If-None-Match'), info['etag']):
+        return Response(status=304, headers=headers)
+
+    byte_range = None
+    # If-Range : la reprise n'est valable que si le fichier n'a pas changé depuis le début du téléchargement
+    if_range = request.headers.get('If-Range')
+    if if_range is None or if_range.strip() == info['etag']:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ObjectRangeException as e:
+            response = jsonify({'message': str(e)})
+            response.status_code = 416
+            response.headers.update({**headers, 'Content-Range': f"bytes */{size}"})
+            return response
+
+    start, end = byte_range or (0, size)
+    if byte_range:
+        headers['Content-Range'] = f"bytes {start}-{end - 1}/{size}"
+    headers['Content-Length'] = str(end - start)
+    return Response(read_range(start, end), status=206 if byte_range else 200, mimetype=info['content_type'],
+                    headers=headers)
+
+
+def download(wasabi_service, src: str, mode: str) -> Response:
+    # presigned : adresse temporaire vers le stockage, le fichier ne transite pas par l'API
+    if mode == "presigned":
+        return jsonify(wasabi_service.get_presigned_url(src))
+    return send_object(wasabi_service.get_file_info(src),
+                       lambda start, end: wasabi_service.read_file(src, start=start, end=end))
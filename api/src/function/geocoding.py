@@ -0,0 +1,13 @@
+import re
+import unicodedata
+
+
+def normalize_address(address: str, zip_code: str, city: str, country: str) -> str:
+    # Clé de cache : casse, accents, ponctuation et espaces multiples n'y changent rien
+    parts = list()
+    for part in (address, zip_code, city, country):
+        text = unicodedata.normalize("NFKD", str(part or ""))
+        text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+        text = re.sub(r"[^\w]+", " ", text)
+        parts.append(" ".join(text.split()))
+    return "|".join(parts)
@@ -19,6 +19,10 @@ from model.package import Package
 from model.vehicle import Vehicle
 from model.collect import Collect
 from model.demand import Demand
+from model.route_plan import RoutePlan
+from model.geocode_cache import GeocodeCache
+from model.job import Job
+from model.artifact import Artifact
 
 
 def init_database():
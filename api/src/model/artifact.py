@@ -0,0 +1,15 @@
+from database.db import db
+
+
+class Artifact(db.Model):
+    __tablename__ = "artifact"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    key = db.Column(db.String(255), unique=True, nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False)
+    size = db.Column(db.Integer)
+    content_type = db.Column(db.String(100))
+    ref_count = db.Column(db.Integer, nullable=False)
+    uploaded = db.Column(db.Boolean, nullable=False, default=False) # objet présent dans le stockage
+    deleting = db.Column(db.Boolean, nullable=False, default=False) # plus référencé, suppression de l'objet en cours
+    created_at = db.Column(db.DateTime)
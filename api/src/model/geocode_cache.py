@@ -0,0 +1,13 @@
+from database.db import db
+
+
+class GeocodeCache(db.Model):
+    __tablename__ = "geocode_cache"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    address_key = db.Column(db.String(255), unique=True, nullable=False)
+    latitude = db.Column(db.Numeric(10, 7, asdecimal=False))
+    longitude = db.Column(db.Numeric(10, 7, asdecimal=False))
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    last_used_at = db.Column(db.DateTime, index=True)
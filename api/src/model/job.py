@@ -0,0 +1,27 @@
+from database.db import db
+
+
+class Job(db.Model):
+    __tablename__ = "job"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    type = db.Column(db.String(50), nullable=False) # delivery_roadmap / collect_roadmap / demand_qr_code
+    target_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False) # pending / running / done / failed
+    error = db.Column(db.Text)
+    payload = db.Column(db.Text) # paramètres de la tâche en JSON, pour la relancer
+    created_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    __table_args__ = (db.Index('ix_job_target', 'type', 'target_id'),)
+
+
+    def json(self):
+        return {'id': self.id,
+                'type': self.type,
+                'target_id': self.target_id,
+                'status': self.status,
+                'error': self.error,
+                'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
+                'started_at': self.started_at.strftime("%Y-%m-%d %H:%M:%S") if self.started_at else None,
+                'finished_at': self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None}
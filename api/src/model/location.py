@@ -10,12 +10,14 @@ class Location(db.Model):
     city = db.Column(db.String(30))
     country = db.Column(db.String(30))
     description = db.Column(db.Text)
-    latitude = db.Column(db.String(30))
-    longitude = db.Column(db.String(30))
+    # asdecimal=False : float côté Python, nombre (et non chaîne) dans les réponses JSON
+    latitude = db.Column(db.Numeric(10, 7, asdecimal=False))
+    longitude = db.Column(db.Numeric(10, 7, asdecimal=False))
     shops = db.relationship("Shop", backref="location")
     warehouses = db.relationship("Warehouse", backref="location")
     deliveries = db.relationship(
         'Delivery', secondary='delivers_to_location', back_populates='locations')
+    __table_args__ = (db.Index('ix_location_coordinates', 'latitude', 'longitude'),)
 
 
     def json(self):
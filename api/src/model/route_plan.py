@@ -0,0 +1,49 @@
+from database.db import db
+
+
+class RoutePlan(db.Model):
+    __tablename__ = "route_plan"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    solver_version = db.Column(db.String(50))
+    distance = db.Column(db.Integer)
+    duration = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime)
+    delivery_id = db.Column(db.Integer, db.ForeignKey('delivery.id'), unique=True)
+    collect_id = db.Column(db.Integer, db.ForeignKey('collect.id'), unique=True)
+    stops = db.relationship('RoutePlanStop', backref='route_plan',
+                            order_by='RoutePlanStop.position', cascade='all, delete-orphan')
+    delivery = db.relationship('Delivery', backref=db.backref('route_plan', uselist=False, cascade='all, delete-orphan'))
+    collect = db.relationship('Collect', backref=db.backref('route_plan', uselist=False, cascade='all, delete-orphan'))
+
+
+    def json(self):
+        return {'id': self.id,
+                'solver_version': self.solver_version,
+                'distance': self.distance,
+                'distance_units': "meters",
+                'duration': self.duration,
+                'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                'stops': [stop.json() for stop in self.stops]}
+
+
+class RoutePlanStop(db.Model):
+    __tablename__ = "route_plan_stop"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    route_plan_id = db.Column(db.Integer, db.ForeignKey('route_plan.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    location_id = db.Column(db.Integer, db.ForeignKey('location.id'), nullable=False)
+    # Trajet vers l'arrêt suivant, le dernier revient au point de départ
+    leg_distance = db.Column(db.Integer)
+    leg_duration = db.Column(db.Integer)
+    estimated_arrival = db.Column(db.DateTime)
+    location = db.relationship('Location')
+
+
+    def json(self):
+        return {'position': self.position,
+                'location': self.location.json_rest(),
+                'leg_distance': self.leg_distance,
+                'leg_duration': self.leg_duration,
+                'estimated_arrival': self.estimated_arrival.strftime("%Y-%m-%d %H:%M:%S") if self.estimated_arrival else None}
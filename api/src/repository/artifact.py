@@ -0,0 +1,139 @@
+import time
+from sqlalchemy.exc import IntegrityError, OperationalError
+from model.artifact import Artifact
+from database.db import db
+from app import app
+from exception.artifact import ArtifactAccessDbException
+
+
+# Interblocage (1213) ou attente de verrou expirée (1205) : la transaction est rejouée
+RETRY_ERROR_CODES = (1213, 1205)
+TRANSACTION_ATTEMPTS = 3
+# Attente avant de rejouer quand l'objet est en cours de suppression, multipliée à chaque tentative
+DELETING_WAIT_SECONDS = 0.25
+
+
+class ArtifactRepo():
+
+    def run(self, method: str, work):
+        # work renvoie None quand la ligne a changé entre deux lectures ou que l'objet est en cours de suppression :
+        # nouvelle tentative
+        try:
+            with app.app_context():
+                for attempt in range(TRANSACTION_ATTEMPTS):
+                    try:
+                        result = work()
+                    except OperationalError as e:
+                        db.session.rollback()
+                        if attempt + 1 == TRANSACTION_ATTEMPTS or e.orig.args[0] not in RETRY_ERROR_CODES:
+                            raise
+                        continue
+                    if result is not None:
+                        return result
+                    if attempt + 1 < TRANSACTION_ATTEMPTS:
+                        time.sleep(DELETING_WAIT_SECONDS * (attempt + 1))
+        except Exception:
+            raise ArtifactAccessDbException(method=method)
+        raise ArtifactAccessDbException(method=method)
+
+    def acquire(self, new_artifact: Artifact) -> bool:
+        # Ajoute une référence, renvoie True tant que l'objet n'est pas confirmé dans le stockage et doit être envoyé
+        return self.run("creating", lambda: self.add_reference(new_artifact))
+
+    def add_reference(self, new_artifact: Artifact):
+        # Insertion tentée d'abord : un SELECT ... FOR UPDATE sur une clé absente pose un verrou d'intervalle
+        # sur lequel deux requêtes simultanées peuvent s'interbloquer
+        try:
+            # Copie : l'objet d'origine reste utilisable si la tentative est annulée
+            db.session.add(Artifact(key=new_artifact.key, sha256=new_artifact.sha256, size=new_artifact.size,
+                                    content_type=new_artifact.content_type, ref_count=1, uploaded=False,
+                                    deleting=False, created_at=new_artifact.created_at))
+            db.session.commit()
+            db.session.close()
+            return True
+        except IntegrityError:
+            # Même contenu déjà référencé : on ajoute une référence
+            db.session.rollback()
+        artifact = Artifact.query.filter_by(key=new_artifact.key).with_for_update().first()
+        if artifact is None or artifact.deleting:
+            # Supprimé entre l'insertion et la lecture, ou objet en cours de suppression : un envoi maintenant
+            # pourrait être effacé par cette suppression
+            db.session.rollback()
+            return None
+        artifact.ref_count += 1
+        uploaded = artifact.uploaded
+        db.session.commit()
+        db.session.close()
+        return not uploaded
+
+    def mark_uploaded(self, key: str) -> None:
+        try:
+            with app.app_context():
+                Artifact.query.filter_by(key=key).update({'uploaded': True})
+                db.session.commit()
+                db.session.close()
+        except Exception:
+            raise ArtifactAccessDbException(method="updating")
+
+    def release(self, keys: list[str], delete) -> None:
+        # Retire une référence par clé, delete reçoit les clés plus référencées (ou inconnues)
+        to_delete = self.run("deleting", lambda: self.remove_references(keys))
+        if to_delete:
+            self.purge(keys=to_delete, delete=delete)
+
+    def remove_references(self, keys: list[str]) -> list[str]:
+        artifacts = {artifact.key: artifact for artifact in
+                     Artifact.query.filter(Artifact.key.in_(keys)).with_for_update().all()}
+        to_delete = list()
+        for key in keys:
+            if key in to_delete:
+                continue
+            artifact = artifacts.get(key)
+            if artifact is None:
+                to_delete.append(key)
+                continue
+            artifact.ref_count -= 1
+            if artifact.ref_count <= 0:
+                # Ligne gardée comme marqueur : les verrous sont relâchés avant l'appel au stockage
+                artifact.deleting = True
+                to_delete.append(key)
+        db.session.commit()
+        db.session.close()
+        return to_delete
+
+    def purge(self, keys: list[str], delete) -> None:
+        try:
+            delete(keys)
+        except Exception:
+            # Objets peut-être encore présents : les lignes redeviennent utilisables et l'objet sera renvoyé
+            self.run("updating", lambda: self.restore(keys))
+            raise
+        self.run("deleting", lambda: self.remove_tombstones(keys))
+
+    def restore(self, keys: list[str]) -> bool:
+        Artifact.query.filter(Artifact.key.in_(keys), Artifact.deleting.is_(True)) \
+            .update({'deleting': False, 'uploaded': False}, synchronize_session=False)
+        db.session.commit()
+        db.session.close()
+        return True
+
+    def remove_tombstones(self, keys: list[str]) -> bool:
+        Artifact.query.filter(Artifact.key.in_(keys), Artifact.deleting.is_(True)).delete(synchronize_session=False)
+        db.session.commit()
+        db.session.close()
+        return True
+
+    def collect_garbage(self, delete) -> None:
+        # Lignes sans référence laissées par un arrêt en cours de suppression ou une suppression refusée
+        keys = self.run("deleting", self.mark_unreferenced)
+        if keys:
+            self.purge(keys=keys, delete=delete)
+
+    def mark_unreferenced(self) -> list[str]:
+        artifacts = Artifact.query.filter(Artifact.ref_count <= 0).with_for_update().all()
+        for artifact in artifacts:
+            artifact.deleting = True
+        keys = [artifact.key for artifact in artifacts]
+        db.session.commit()
+        db.session.close()
+        return keys
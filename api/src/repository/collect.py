@@ -45,7 +45,7 @@ class CollectRepo():
         except Exception:
             raise CollectAccessDbException(collect_id=None, method="getting")
 
-    def insert(self, new_collect: Collect, demands: list[int]) -> None:
+    def insert(self, new_collect: Collect, demands: list[int]) -> int:
         try:
             with app.app_context():
                 db.session.add(new_collect)
@@ -53,8 +53,11 @@ class CollectRepo():
                     Demand.id.in_(demands)).all()
                 for demand in to_add_demands:
                     new_collect.demands.append(demand)
+                db.session.flush()
+                new_collect_id = new_collect.id
                 db.session.commit()
                 db.session.close()
+                return new_collect_id
         except Exception:
             raise CollectAccessDbException(collect_id=None, method="creating")
 
@@ -72,6 +75,23 @@ class CollectRepo():
             raise CollectAccessDbException(
                 collect_id=collect_id, method="updating")
 
+    def update_roadmap(self, collect_id: int, roadmap: str, pdf: str) -> bool:
+        try:
+            with app.app_context():
+                collect = Collect.query.filter_by(id=collect_id).first()
+                # Collecte supprimée entre-temps
+                if collect is None:
+                    db.session.close()
+                    return False
+                collect.roadmap = roadmap
+                collect.pdf = pdf
+                db.session.commit()
+                db.session.close()
+                return True
+        except Exception:
+            raise CollectAccessDbException(
+                collect_id=collect_id, method="updating")
+
     def delete(self, collect_id: int) -> None:
         try:
             with app.app_context():
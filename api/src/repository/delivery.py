@@ -115,3 +115,20 @@ class DeliveryRepo():
         except Exception:
             raise DeliveryAccessDbException(
                 delivery_id=delivery_id, method="deleting")
+
+    def update_roadmap(self, delivery_id: int, roadmap: str, pdf: str) -> bool:
+        try:
+            with app.app_context():
+                delivery = Delivery.query.filter_by(id=delivery_id).first()
+                # Livraison supprimée pendant la génération : rien à mettre à jour
+                if delivery is None:
+                    db.session.close()
+                    return False
+                delivery.roadmap = roadmap
+                delivery.pdf = pdf
+                db.session.commit()
+                db.session.close()
+                return True
+        except Exception:
+            raise DeliveryAccessDbException(
+                delivery_id=delivery_id, method="updating")
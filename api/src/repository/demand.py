@@ -1,4 +1,6 @@
+from sqlalchemy.orm import joinedload
 from model.demand import Demand
+from model.shop import Shop
 from database.db import db
 from app import app
 from exception.demand import DemandAccessDbException
@@ -44,6 +46,15 @@ class DemandRepo():
         except Exception:
             raise DemandAccessDbException(demand_id=None, method="getting")
 
+    def select_open(self) -> list[Demand]:
+        try:
+            # Demandes sans collecte, avec le lieu du magasin chargé dans la même requête
+            demands = Demand.query.options(joinedload(Demand.shop).joinedload(Shop.location)) \
+                .filter(Demand.collect_id.is_(None)).order_by(Demand.limit_datetime).all()
+            return demands
+        except Exception:
+            raise DemandAccessDbException(demand_id=None, method="getting")
+
 
     def insert(self, new_demand: Demand) -> None:
         try:
@@ -66,8 +77,11 @@ class DemandRepo():
                 demand.status = update_demand.status
                 demand.additional = update_demand.additional
                 demand.shop_id = update_demand.shop_id
-                demand.qr_code = update_demand.qr_code
-                demand.pdf = update_demand.pdf
+                # QR code et PDF absents : ceux écrits par la tâche de génération sont conservés
+                if update_demand.qr_code is not None:
+                    demand.qr_code = update_demand.qr_code
+                if update_demand.pdf is not None:
+                    demand.pdf = update_demand.pdf
                 db.session.commit()
                 db.session.close()
         except Exception:
@@ -85,6 +99,23 @@ class DemandRepo():
             raise DemandAccessDbException(
                 demand_id=demand_id, method="updating")
 
+    def update_qr_code(self, demand_id: int, qr_code: str, pdf: str) -> bool:
+        try:
+            with app.app_context():
+                demand = Demand.query.filter_by(id=demand_id).first()
+                # Demande supprimée avant la fin du job
+                if demand is None:
+                    db.session.close()
+                    return False
+                demand.qr_code = qr_code
+                demand.pdf = pdf
+                db.session.commit()
+                db.session.close()
+                return True
+        except Exception:
+            raise DemandAccessDbException(
+                demand_id=demand_id, method="updating")
+
     def delete(self, demand_id: int) -> None:
         try:
             with app.app_context():
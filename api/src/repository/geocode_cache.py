@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy.dialects.mysql import insert
+from model.geocode_cache import GeocodeCache
+from database.db import db
+from app import app
+from exception.location import GeocodeCacheAccessDbException
+
+
+class GeocodeCacheRepo():
+
+    def select_all_by_key(self, address_keys: list[str], created_after: datetime) -> list[GeocodeCache]:
+        try:
+            entries = GeocodeCache.query.filter(GeocodeCache.address_key.in_(address_keys),
+                                                GeocodeCache.created_at >= created_after).all()
+            return entries
+        except Exception:
+            raise GeocodeCacheAccessDbException(method="getting")
+
+    def touch(self, address_keys: list[str]) -> None:
+        try:
+            with app.app_context():
+                GeocodeCache.query.filter(GeocodeCache.address_key.in_(address_keys)) \
+                    .update({GeocodeCache.last_used_at: datetime.now()}, synchronize_session=False)
+                db.session.commit()
+                db.session.close()
+        except Exception:
+            raise GeocodeCacheAccessDbException(method="updating")
+
+    def upsert(self, new_entries: list[GeocodeCache]) -> None:
+        try:
+            with app.app_context():
+                # Une seule requête INSERT ... ON DUPLICATE KEY UPDATE : deux géocodages simultanés de la même
+                # adresse ne se heurtent plus à la clé unique entre la lecture et l'insertion
+                statement = insert(GeocodeCache).values([
+                    {'address_key': entry.address_key, 'latitude': entry.latitude, 'longitude': entry.longitude,
+                     'description': entry.description, 'created_at': entry.created_at,
+                     'last_used_at': entry.last_used_at} for entry in new_entries])
+                statement = statement.on_duplicate_key_update(
+                    latitude=statement.inserted.latitude, longitude=statement.inserted.longitude,
+                    description=statement.inserted.description, created_at=statement.inserted.created_at,
+                    last_used_at=statement.inserted.last_used_at)
+                db.session.execute(statement)
+                db.session.commit()
+                db.session.close()
+        except Exception:
+            raise GeocodeCacheAccessDbException(method="creating")
+
+    def evict(self, created_before: datetime, max_entries: int) -> None:
+        try:
+            with app.app_context():
+                GeocodeCache.query.filter(GeocodeCache.created_at < created_before).delete(synchronize_session=False)
+                # Au-delà de la taille maximale, les entrées les moins récemment utilisées sont supprimées
+                overflow = GeocodeCache.query.count() - max_entries
+                if overflow > 0:
+                    oldest = [entry.id for entry in GeocodeCache.query.order_by(GeocodeCache.last_used_at)
+                              .with_entities(GeocodeCache.id).limit(overflow)]
+                    GeocodeCache.query.filter(GeocodeCache.id.in_(oldest)).delete(synchronize_session=False)
+                db.session.commit()
+                db.session.close()
+        except Exception:
+            raise GeocodeCacheAccessDbException(method="deleting")
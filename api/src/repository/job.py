@@ -0,0 +1,61 @@
+from datetime import datetime
+from model.job import Job
+from database.db import db
+from app import app
+from exception.job import JobAccessDbException
+
+
+class JobRepo():
+
+    def select_one_by_id(self, job_id: int) -> Job:
+        try:
+            job = Job.query.filter_by(id=job_id).first()
+            return job
+        except Exception:
+            raise JobAccessDbException(job_id=job_id, method="getting")
+
+    def select_active(self, type: str, target_id: int) -> Job:
+        try:
+            job = Job.query.filter(Job.type == type, Job.target_id == target_id,
+                                   Job.status.in_(("pending", "running"))).first()
+            return job
+        except Exception:
+            raise JobAccessDbException(job_id=None, method="getting")
+
+    def insert(self, new_job: Job) -> int:
+        try:
+            with app.app_context():
+                db.session.add(new_job)
+                db.session.flush()
+                new_job_id = new_job.id
+                db.session.commit()
+                db.session.close()
+                return new_job_id
+        except Exception:
+            raise JobAccessDbException(job_id=None, method="creating")
+
+    def update_status(self, job_id: int, status: str, error: str = None) -> None:
+        try:
+            with app.app_context():
+                job = Job.query.filter_by(id=job_id).first()
+                job.status = status
+                job.error = error
+                if status == "running":
+                    job.started_at = datetime.now()
+                else:
+                    job.finished_at = datetime.now()
+                db.session.commit()
+                db.session.close()
+        except Exception:
+            raise JobAccessDbException(job_id=job_id, method="updating")
+
+    def fail_active(self, error: str) -> int:
+        try:
+            with app.app_context():
+                count = Job.query.filter(Job.status.in_(("pending", "running"))).update(
+                    {'status': "failed", 'error': error, 'finished_at': datetime.now()}, synchronize_session=False)
+                db.session.commit()
+                db.session.close()
+                return count
+        except Exception:
+            raise JobAccessDbException(job_id=None, method="updating")
@@ -1,7 +1,20 @@
+import math
+from sqlalchemy import func
 from model.location import Location
 from database.db import db
 from app import app
 from exception.location import LocationAccessDbException
+from function.distance import EARTH_RADIUS_KM, bounding_box
+
+
+def distance_km(latitude: float, longitude: float):
+    # Formule de haversine évaluée par la base, distance en km de chaque lieu au point donné
+    dlat = func.radians(Location.latitude - latitude) / 2
+    dlon = func.radians(Location.longitude - longitude) / 2
+    a = (func.pow(func.sin(dlat), 2)
+         + math.cos(math.radians(latitude)) * func.cos(func.radians(Location.latitude)) * func.pow(func.sin(dlon), 2))
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(a))
+
 
 class LocationRepo():    
 
@@ -19,6 +32,20 @@ class LocationRepo():
         except Exception:
             raise LocationAccessDbException(location_id=-1, method="getting")
     
+    def select_within_radius(self, latitude: float, longitude: float, radius_km: float) -> list:
+        try:
+            # Index (latitude, longitude) : seul l'intervalle de latitude délimite la lecture de l'index,
+            # la longitude est filtrée sur les entrées lues, la distance exacte trie le reste
+            lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius_km)
+            distance = distance_km(latitude, longitude).label('distance')
+            locations = db.session.query(Location, distance) \
+                .filter(Location.latitude.between(lat_min, lat_max), Location.longitude.between(lon_min, lon_max)) \
+                .filter(distance_km(latitude, longitude) <= radius_km) \
+                .order_by(distance).all()
+            return locations
+        except Exception:
+            raise LocationAccessDbException(location_id=None, method="getting")
+    
     def select_all(self) -> list[Location]:
         try:
             locations = Location.query.all()
@@ -40,6 +67,18 @@ class LocationRepo():
                 return new_location_id
         except Exception:
             raise LocationAccessDbException(location_id=None, method="creating")
+
+    def insert_many(self, new_locations: list[Location]) -> list[int]:
+        try:
+            with app.app_context():
+                db.session.add_all(new_locations)
+                db.session.flush()
+                new_locations_id = [location.id for location in new_locations]
+                db.session.commit()
+                db.session.close()
+                return new_locations_id
+        except Exception:
+            raise LocationAccessDbException(location_id=None, method="creating")
     
 
 
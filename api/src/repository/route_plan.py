@@ -0,0 +1,50 @@
+from model.route_plan import RoutePlan
+from database.db import db
+from app import app
+from exception.route_plan import RoutePlanAccessDbException
+
+
+class RoutePlanRepo():
+
+    def select_one_by_delivery_id(self, delivery_id: int) -> RoutePlan:
+        try:
+            route_plan = RoutePlan.query.filter_by(delivery_id=delivery_id).first()
+            return route_plan
+        except Exception:
+            raise RoutePlanAccessDbException(route_plan_id=None, method="getting")
+
+    def select_one_by_collect_id(self, collect_id: int) -> RoutePlan:
+        try:
+            route_plan = RoutePlan.query.filter_by(collect_id=collect_id).first()
+            return route_plan
+        except Exception:
+            raise RoutePlanAccessDbException(route_plan_id=None, method="getting")
+
+    def insert(self, new_route_plan: RoutePlan) -> int:
+        try:
+            with app.app_context():
+                # Une seule tournée par livraison ou collecte : la précédente est remplacée
+                previous = RoutePlan.query.filter_by(delivery_id=new_route_plan.delivery_id,
+                                                     collect_id=new_route_plan.collect_id).first()
+                if previous:
+                    db.session.delete(previous)
+                    db.session.flush()
+                db.session.add(new_route_plan)
+                db.session.flush()
+                new_route_plan_id = new_route_plan.id
+                db.session.commit()
+                db.session.close()
+                return new_route_plan_id
+        except Exception:
+            raise RoutePlanAccessDbException(route_plan_id=None, method="creating")
+
+    def delete_by_delivery_id(self, delivery_id: int) -> None:
+        try:
+            with app.app_context():
+                route_plan = RoutePlan.query.filter_by(delivery_id=delivery_id).first()
+                if route_plan:
+                    db.session.delete(route_plan)
+                    db.session.commit()
+                db.session.close()
+        except Exception:
+            raise RoutePlanAccessDbException(route_plan_id=None, method="deleting")
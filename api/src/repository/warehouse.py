@@ -1,7 +1,17 @@
+from sqlalchemy.orm import joinedload
 from model.warehouse import Warehouse
+from model.location import Location
 from database.db import db
+from repository.location import distance_km
 from app import app
 from exception.warehouse import WarehouseAccessDbException
+from function.distance import bounding_box
+
+
+# Recherche des entrepôts les plus proches : premier rayon, multiplié par 4 jusqu'au rayon maximal
+NEAREST_START_RADIUS_KM = 25
+NEAREST_MAX_RADIUS_KM = 1600
+
 
 class WarehouseRepo():    
 
@@ -24,6 +34,28 @@ class WarehouseRepo():
             raise WarehouseAccessDbException(warehouse_id=None, method="getting")
 
     
+    def select_nearest(self, latitude: float, longitude: float, k: int) -> list:
+        try:
+            distance = distance_km(latitude, longitude).label('distance')
+            radius_km = NEAREST_START_RADIUS_KM
+            while True:
+                query = db.session.query(Warehouse, distance).join(Location, Warehouse.location_id == Location.id) \
+                    .filter(Location.latitude.isnot(None))
+                if radius_km is not None:
+                    # Seuls les entrepôts du cercle sont sûrs d'être plus proches que tous ceux qui sont en dehors
+                    lat_min, lat_max, lon_min, lon_max = bounding_box(latitude, longitude, radius_km)
+                    query = query.filter(Location.latitude.between(lat_min, lat_max),
+                                         Location.longitude.between(lon_min, lon_max),
+                                         distance_km(latitude, longitude) <= radius_km)
+                warehouses = query.order_by(distance).limit(k).all()
+                if len(warehouses) >= k or radius_km is None:
+                    return warehouses
+                # Moins de k entrepôts dans le cercle : rayon élargi, puis recherche sans limite
+                radius_km = radius_km * 4 if radius_km * 4 <= NEAREST_MAX_RADIUS_KM else None
+        except Exception:
+            raise WarehouseAccessDbException(warehouse_id=None, method="getting")
+
+    
     def select_all(self) -> list[Warehouse]:
         try:
             warehouses = Warehouse.query.all()
@@ -34,6 +66,14 @@ class WarehouseRepo():
             raise WarehouseAccessDbException(warehouse_id=None, method="getting")
 
 
+    def select_all_with_storages(self) -> list[Warehouse]:
+        try:
+            warehouses = Warehouse.query.options(joinedload(Warehouse.location), joinedload(Warehouse.storages)).all()
+            return warehouses
+        except Exception:
+            raise WarehouseAccessDbException(warehouse_id=None, method="getting")
+
+
     def insert(self, new_warehouse: Warehouse) -> None:
         try:
             with app.app_context():
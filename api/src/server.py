@@ -4,6 +4,8 @@ from dotenv import load_dotenv, find_dotenv
 import os
 
 from database.db import db
+from service.job import JobService
+from service.wasabi_s3 import WasabiS3
 
 # Import Controllers
 from controller.user import *
@@ -25,6 +27,8 @@ from controller.collect import *
 from controller.demand import *
 from controller.vehicle import *
 from controller.ticket import *
+from controller.job import *
+from controller.file import *
 
 
 # Import Models
@@ -45,6 +49,10 @@ from model.collect import Collect
 from model.demand import Demand
 from model.vehicle import Vehicle
 from model.ticket import Ticket
+from model.route_plan import RoutePlan
+from model.geocode_cache import GeocodeCache
+from model.job import Job
+from model.artifact import Artifact
 
 from app import app
 
@@ -85,7 +93,9 @@ api.add_resource(RoleListController, f'{prefix}/role')
 api.add_resource(RoleController, f'{prefix}/role/<int:role_id>')
 
 api.add_resource(LocationListController, f'{prefix}/location')
+api.add_resource(LocationBulkController, f'{prefix}/location/bulk')
 api.add_resource(LocationController, f'{prefix}/location/<int:location_id>')
+api.add_resource(LocationNearbyController, f'{prefix}/location/<int:location_id>/nearby')
 
 api.add_resource(CategoryListController, f'{prefix}/category')
 api.add_resource(CategoryController, f'{prefix}/category/<int:category_id>')
@@ -115,6 +125,7 @@ api.add_resource(CompanyController, f'{prefix}/company/<int:company_id>')
 api.add_resource(CompanyListController, f'{prefix}/company')
 
 api.add_resource(ShopController, f'{prefix}/shop/<int:shop_id>')
+api.add_resource(ShopNearestWarehouseController, f'{prefix}/shop/<int:shop_id>/warehouses/nearest')
 api.add_resource(ShopListController, f'{prefix}/shop')
 api.add_resource(ShopPageController, f'{prefix}/shop/page/<int:page>')
 api.add_resource(ShopSearchController,
@@ -135,14 +146,20 @@ api.add_resource(DeliveryPageController, f'{prefix}/delivery/page/<int:page>')
 #                  f'{prefix}/shop/page/<int:page>/search/<string:search>')
 api.add_resource(DeliversToLocationController,
                  f'{prefix}/delivery/<int:delivery_id>/location/<int:location_id>')
+api.add_resource(DeliveryItineraryController, f'{prefix}/delivery/<int:delivery_id>/itinerary')
+api.add_resource(DeliveryFileController, f'{prefix}/delivery/<int:delivery_id>/<any(roadmap, pdf):name>')
 
 api.add_resource(CollectController, f'{prefix}/collect/<int:collect_id>')
 api.add_resource(CollectListController, f'{prefix}/collect')
 api.add_resource(CollectPageController, f'{prefix}/collect/page/<int:page>')
+api.add_resource(CollectItineraryController, f'{prefix}/collect/<int:collect_id>/itinerary')
+api.add_resource(CollectFileController, f'{prefix}/collect/<int:collect_id>/<any(roadmap, pdf):name>')
 
 api.add_resource(DemandController, f'{prefix}/demand/<int:demand_id>')
 api.add_resource(DemandListController, f'{prefix}/demand')
 api.add_resource(DemandPageController, f'{prefix}/demand/page/<int:page>')
+api.add_resource(DemandGroupingController, f'{prefix}/demand/groupings')
+api.add_resource(DemandFileController, f'{prefix}/demand/<int:demand_id>/<any(qr_code, pdf):name>')
 
 api.add_resource(VehicleController, f'{prefix}/vehicle/<int:vehicle_id>')
 api.add_resource(VehicleListController, f'{prefix}/vehicle')
@@ -153,7 +170,12 @@ api.add_resource(VehicleListController, f'{prefix}/vehicle')
 #                  f'{prefix}/delivery/<int:delivery_id>/location/<int:location_id>')
 
 
+api.add_resource(JobController, f'{prefix}/job/<int:job_id>')
+api.add_resource(JobRetryController, f'{prefix}/job/<int:job_id>/retry')
+api.add_resource(FileController, f'{prefix}/file/<path:key>')
+
 api.add_resource(RoadmapController, f'{prefix}/roadmap')
+api.add_resource(RoadmapRoutesController, f'{prefix}/roadmap/routes')
 
 api.add_resource(RegisterController, f'{prefix}/register')
 api.add_resource(LoginController, f'{prefix}/login')
@@ -167,4 +189,7 @@ if __name__ == "__main__":
     with app.app_context():
         # db.drop_all()
         db.create_all()
+        # Jobs en attente ou en cours lors de l'arrêt : marqués en échec pour pouvoir être relancés
+        JobService().recover()
+        WasabiS3().collect_garbage()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -3,11 +3,15 @@ from repository.collect import CollectRepo
 from exception.collect import *
 from exception.demand import CollectsDemandAlreadyExistsException
 from exception.vehicle import VehicleIdNotFoundException
+from exception.object_storage import ObjectNotReadyException
 from service.vehicle import VehicleService
 from service.demand import DemandService
 from service.storage import StorageService
 from service.roadmap import RoadmapService
+from service.route_plan import RoutePlanService
 from service.wasabi_s3 import WasabiS3
+from service.warehouse_assignment import WarehouseAssignmentService
+from service.job import JobService
 
 
 class CollectService:
@@ -18,7 +22,10 @@ class CollectService:
         self.demand_service = DemandService()
         self.storage_service = StorageService()
         self.roadmap_service = RoadmapService()
+        self.route_plan_service = RoutePlanService()
         self.wasabi_service = WasabiS3()
+        self.warehouse_assignment_service = WarehouseAssignmentService()
+        self.job_service = JobService()
 
 
     def select_one_by_id(self, collect_id: int):
@@ -45,21 +52,70 @@ class CollectService:
 
 
     def insert(self, args: dict):
-        locations = list()
-        new_collect = Collect(datetime=args['datetime'], roadmap=None, vehicle_id=args['vehicle_id'], storage_id=args['storage_id'])
+        demands = list()
+        new_collect = Collect(datetime=args['datetime'], roadmap=None, vehicle_id=args['vehicle_id'], storage_id=args.get('storage_id'))
         self.vehicle_service.select_one_by_id(vehicle_id=new_collect.vehicle_id)
         
-        storage = self.storage_service.select_one_by_id(new_collect.storage_id)
-        locations.append(storage.warehouse.location_id)
         for demand_id in args['demands']:
             check_demand = self.demand_service.select_one_by_id(demand_id=demand_id)
             if check_demand.collect_id:
                 raise CollectsDemandAlreadyExistsException(demand_id=demand_id)
-            locations.append(check_demand.shop.location_id)
-        roadmap = self.roadmap_service.generate_roadmap(locations_id=locations, type="collect")
-        new_collect.roadmap = roadmap['roadmap_src']
-        new_collect.pdf = roadmap['pdf_src']
-        self.collect_repo.insert(new_collect=new_collect, demands=args['demands'])
+            demands.append(check_demand)
+        if new_collect.storage_id is None:
+            suggested = self.warehouse_assignment_service.suggest_storage(
+                [[demand.shop.location.latitude, demand.shop.location.longitude] for demand in demands
+                 if demand.shop.location.latitude is not None])
+            if suggested is None:
+                raise CollectStorageSuggestionException()
+            new_collect.storage_id = suggested['id']
+        self.storage_service.select_one_by_id(new_collect.storage_id)
+        new_collect_id = self.collect_repo.insert(new_collect=new_collect, demands=args['demands'])
+
+        # Tournée, carte et PDF calculés en arrière-plan : roadmap et pdf sont remplis à la fin de la tâche
+        job_id = self.job_service.submit(type="collect_roadmap", target_id=new_collect_id, task=self.generate_roadmap,
+                                         collect_id=new_collect_id)
+        return {'collect_id': new_collect_id, 'job_id': job_id}
+
+
+    def get_stops(self, collect: Collect):
+        # Entrepôt de l'espace de stockage en premier, puis un arrêt par demande
+        locations = [collect.storage.warehouse.location_id]
+        deadlines = dict()
+        for demand in collect.demands:
+            location_id = demand.shop.location_id
+            locations.append(location_id)
+            # Plusieurs demandes d'un même magasin : la plus urgente fixe l'heure limite
+            if demand.limit_datetime and (location_id not in deadlines or demand.limit_datetime < deadlines[location_id]):
+                deadlines[location_id] = demand.limit_datetime
+        return locations, deadlines
+
+
+    def generate_roadmap(self, collect_id: int) -> None:
+        # Arrêts et date relus en base : la tâche peut être relancée à partir du seul identifiant
+        collect = self.select_one_by_id(collect_id=collect_id)
+        previous_files = [collect.roadmap, collect.pdf]
+        start_datetime = collect.datetime
+        locations_id, deadlines = self.get_stops(collect=collect)
+        roadmap = self.roadmap_service.generate_roadmap(locations_id=locations_id, type="collect", deadlines=deadlines,
+                                                        start_datetime=start_datetime)
+        if not self.collect_repo.update_roadmap(collect_id=collect_id, roadmap=roadmap['roadmap_src'], pdf=roadmap['pdf_src']):
+            self.wasabi_service.delete_files([roadmap['roadmap_src'], roadmap['pdf_src']])
+            raise CollectIdNotFoundException(collect_id=collect_id)
+        self.route_plan_service.insert_for_collect(collect_id=collect_id, roadmap=roadmap, start_datetime=start_datetime)
+        self.wasabi_service.delete_files(previous_files)
+
+
+    def get_itinerary(self, collect_id: int):
+        self.select_one_by_id(collect_id=collect_id)
+        return self.route_plan_service.select_one_by_collect_id(collect_id=collect_id)
+
+
+    def get_file(self, collect_id: int, name: str) -> str:
+        # name : roadmap ou pdf, vide tant que la génération de la tournée n'est pas terminée
+        src = getattr(self.select_one_by_id(collect_id=collect_id), name)
+        if not src:
+            raise ObjectNotReadyException(name=name)
+        return src
 
 
     def update(self, collect_id: int, args: dict):
@@ -77,6 +133,7 @@ class CollectService:
 
     def delete(self, collect_id: str):
         collect = self.select_one_by_id(collect_id=collect_id)
-        self.wasabi_service.delete_file(collect.roadmap)
+        self.job_service.check_idle(type="collect_roadmap", target_id=collect_id)
+        self.wasabi_service.delete_files([collect.roadmap, collect.pdf])
         self.collect_repo.delete(collect_id=collect_id)
 
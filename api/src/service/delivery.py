@@ -1,12 +1,16 @@
+from datetime import datetime
 from model.delivery import Delivery
 from repository.delivery import DeliveryRepo
-from exception.delivery import DeliveryIdNotFoundException, DeliversToLocationAlreadyExistsException, DeliversToLocationNotFoundException
+from exception.delivery import DeliveryIdNotFoundException, DeliveryAccessDbException, DeliveryStartLocationException, DeliversToLocationAlreadyExistsException, DeliversToLocationNotFoundException
 from exception.package import PackageDeliveryAlreadyExistsException
+from exception.object_storage import ObjectNotReadyException
 from service.location import LocationService
 from service.vehicle import VehicleService
 from service.package import PackageService
 from service.roadmap import RoadmapService
+from service.route_plan import RoutePlanService
 from service.wasabi_s3 import WasabiS3
+from service.job import JobService
 
 
 class DeliveryService:
@@ -17,7 +21,9 @@ class DeliveryService:
         self.vehicle_service = VehicleService()
         self.package_service = PackageService()
         self.roadmap_service = RoadmapService()
+        self.route_plan_service = RoutePlanService()
         self.wasabi_service = WasabiS3()
+        self.job_service = JobService()
         
 
     def select_one_by_id(self, delivery_id: int):
@@ -50,14 +56,43 @@ class DeliveryService:
             if package.delivery_id:
                 raise PackageDeliveryAlreadyExistsException(package_id=package_id)
         self.vehicle_service.select_one_by_id(vehicle_id=args['vehicle_id'])
-        roadmap = self.roadmap_service.generate_roadmap(args['locations'], type="delivery")
-        new_delivery = Delivery(datetime=args['datetime'], status=args['status'], roadmap=roadmap['roadmap_src'], pdf=roadmap['pdf_src'], vehicle_id=args['vehicle_id'])
-        
-        
-
+        new_delivery = Delivery(datetime=args['datetime'], status=args['status'], roadmap=None, pdf=None, vehicle_id=args['vehicle_id'])
         new_delivery_id = self.delivery_repo.insert(new_delivery=new_delivery, locations=args['locations'], packages=args['packages'])
 
-        return new_delivery_id
+        # Tournée, carte et PDF calculés en arrière-plan : roadmap et pdf sont remplis à la fin de la tâche
+        job_id = self.job_service.submit(type="delivery_roadmap", target_id=new_delivery_id, task=self.generate_roadmap,
+                                         delivery_id=new_delivery_id, locations_id=args['locations'])
+        return {'delivery_id': new_delivery_id, 'job_id': job_id}
+
+
+    def generate_roadmap(self, delivery_id: int, locations_id: list[int]) -> None:
+        # Livraison relue à chaque exécution : une tâche relancée remplace les fichiers d'une exécution précédente
+        delivery = self.select_one_by_id(delivery_id=delivery_id)
+        previous_files = [delivery.roadmap, delivery.pdf]
+        start_datetime = delivery.datetime
+        roadmap = self.roadmap_service.generate_roadmap(locations_id, type="delivery")
+        self.replace_roadmap(delivery_id=delivery_id, roadmap=roadmap, previous_files=previous_files,
+                             start_datetime=start_datetime)
+
+
+    def get_locations_order(self, delivery: Delivery) -> list[int]:
+        # L'ordre enregistré fait foi, les livraisons sans tournée gardent l'ordre de la base
+        if delivery.route_plan:
+            return self.route_plan_service.get_locations_order(route_plan=delivery.route_plan)
+        return [location.id for location in delivery.locations]
+
+
+    def get_itinerary(self, delivery_id: int):
+        self.select_one_by_id(delivery_id=delivery_id)
+        return self.route_plan_service.select_one_by_delivery_id(delivery_id=delivery_id)
+
+
+    def get_file(self, delivery_id: int, name: str) -> str:
+        # name : roadmap ou pdf, vide tant que la génération de la tournée n'est pas terminée
+        src = getattr(self.select_one_by_id(delivery_id=delivery_id), name)
+        if not src:
+            raise ObjectNotReadyException(name=name)
+        return src
 
 
     def insert_location(self, delivery_id: int, location_id: int):
@@ -67,7 +102,19 @@ class DeliveryService:
                 if location.id == location_id:
                     raise DeliversToLocationAlreadyExistsException(delivery_id=delivery_id, location_id=location_id)
         self.location_service.select_one_by_id(location_id=location_id)
-        self.delivery_repo.insert_location(delivery_id=delivery_id, location_id=location_id)  
+        self.job_service.check_idle(type="delivery_roadmap", target_id=delivery_id)
+        previous_files = [delivery.roadmap, delivery.pdf]
+        start_datetime = delivery.datetime
+        roadmap = self.roadmap_service.update_roadmap(locations_id=self.get_locations_order(delivery=delivery),
+                                                      type="delivery", added_id=location_id)
+        try:
+            self.delivery_repo.insert_location(delivery_id=delivery_id, location_id=location_id)
+        except DeliveryAccessDbException:
+            # Arrêt non ajouté : la nouvelle tournée n'est référencée nulle part
+            self.wasabi_service.delete_files([roadmap['roadmap_src'], roadmap['pdf_src']])
+            raise
+        self.replace_roadmap(delivery_id=delivery_id, roadmap=roadmap, previous_files=previous_files,
+                             start_datetime=start_datetime)
                     
 
 
@@ -81,8 +128,9 @@ class DeliveryService:
 
     def delete(self, delivery_id: str):
         delivery = self.select_one_by_id(delivery_id=delivery_id)
-        self.wasabi_service.delete_file(delivery.roadmap)
-        self.wasabi_service.delete_file(delivery.pdf)
+        # Le job écrirait sa tournée sur une livraison supprimée
+        self.job_service.check_idle(type="delivery_roadmap", target_id=delivery_id)
+        self.wasabi_service.delete_files([delivery.roadmap, delivery.pdf])
         self.delivery_repo.delete(delivery_id=delivery_id)
 
 
@@ -97,4 +145,29 @@ class DeliveryService:
         if not location_exist:
             raise DeliversToLocationNotFoundException(
                 delivery_id=delivery_id, location_id=location_id)
-        self.delivery_repo.delete_location(delivery_id=delivery_id, location_id=location_id)
\ No newline at end of file
+        self.job_service.check_idle(type="delivery_roadmap", target_id=delivery_id)
+        locations_id = self.get_locations_order(delivery=delivery)
+        # Le premier arrêt est le point de départ de la tournée : il part en dernier
+        if len(locations_id) > 1 and locations_id[0] == location_id:
+            raise DeliveryStartLocationException(delivery_id=delivery_id, location_id=location_id)
+        previous_files = [delivery.roadmap, delivery.pdf]
+        start_datetime = delivery.datetime
+        self.delivery_repo.delete_location(delivery_id=delivery_id, location_id=location_id)
+        if len(locations_id) > 1:
+            roadmap = self.roadmap_service.update_roadmap(locations_id=locations_id, type="delivery", removed_id=location_id)
+            self.replace_roadmap(delivery_id=delivery_id, roadmap=roadmap, previous_files=previous_files,
+                                 start_datetime=start_datetime)
+        else:
+            # Plus aucun arrêt : tournée, itinéraire et fichiers sont retirés
+            self.delivery_repo.update_roadmap(delivery_id=delivery_id, roadmap=None, pdf=None)
+            self.route_plan_service.delete_for_delivery(delivery_id=delivery_id)
+            self.wasabi_service.delete_files(previous_files)
+
+
+    def replace_roadmap(self, delivery_id: int, roadmap: dict, previous_files: list[str], start_datetime: datetime = None) -> None:
+        # La tournée enregistrée est mise à jour, les anciens fichiers sont supprimés
+        if not self.delivery_repo.update_roadmap(delivery_id=delivery_id, roadmap=roadmap['roadmap_src'], pdf=roadmap['pdf_src']):
+            self.wasabi_service.delete_files([roadmap['roadmap_src'], roadmap['pdf_src']])
+            raise DeliveryIdNotFoundException(delivery_id=delivery_id)
+        self.route_plan_service.insert_for_delivery(delivery_id=delivery_id, roadmap=roadmap, start_datetime=start_datetime)
+        self.wasabi_service.delete_files(previous_files)
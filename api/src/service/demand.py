@@ -3,9 +3,11 @@ from model.demand import Demand
 from repository.demand import DemandRepo
 from exception.demand import DemandIdNotFoundException
 from exception.shop import ShopIdNotFoundException
+from exception.object_storage import ObjectNotReadyException
 from service.shop import ShopService
 from service.qr_code import QrCodeService
 from service.wasabi_s3 import WasabiS3
+from service.job import JobService
 
 
 class DemandService:
@@ -15,6 +17,7 @@ class DemandService:
         self.shop_service = ShopService()
         self.qrcode_service = QrCodeService()
         self.wasabi_service = WasabiS3()
+        self.job_service = JobService()
 
     def select_one_by_id(self, demand_id: int):
         demand = self.demand_repo.select_one_by_id(demand_id=demand_id)
@@ -39,9 +42,6 @@ class DemandService:
         time = datetime.now()
         formatted_time = time.strftime("%Y-%m-%d %H:%M:%S")
         
-        shop = self.shop_service.select_one_by_id(args["shop_id"])
-        shop_details = {"name": shop.name, "location": shop.location.description}
-        
         new_demand = Demand(
             submitted_datetime=formatted_time,
             limit_datetime=args["limit_datetime"],
@@ -54,10 +54,23 @@ class DemandService:
 
         self.shop_service.select_one_by_id(shop_id=new_demand.shop_id)
         new_demand_id = self.demand_repo.insert(new_demand=new_demand)
-        png_src, pdf_src = self.get_qr_code(demand_id=new_demand_id, packages=args['packages'], shop_details=shop_details)
-        return {"demand_id": new_demand_id, "qr_code": png_src, "pdf": pdf_src}
+        # QR code et PDF générés en arrière-plan : qr_code et pdf sont remplis à la fin de la tâche
+        job_id = self.job_service.submit(type="demand_qr_code", target_id=new_demand_id, task=self.generate_qr_code,
+                                         demand_id=new_demand_id, packages=args['packages'])
+        return {"demand_id": new_demand_id, "job_id": job_id}
+
+
+    def generate_qr_code(self, demand_id: int, packages: list) -> None:
+        # Magasin relu en base, packages repris des paramètres enregistrés avec le job
+        demand = self.select_one_by_id(demand_id=demand_id)
+        previous_files = [demand.qr_code, demand.pdf]
+        shop_details = {"name": demand.shop.name, "location": demand.shop.location.description}
+        png_src, pdf_src = self.get_qr_code(demand_id=demand_id, packages=packages, shop_details=shop_details)
+        if not self.demand_repo.update_qr_code(demand_id=demand_id, qr_code=png_src, pdf=pdf_src):
+            self.wasabi_service.delete_files([png_src, pdf_src])
+            raise DemandIdNotFoundException(demand_id=demand_id)
+        self.wasabi_service.delete_files(previous_files)
 
-        
 
     def get_qr_code(self, demand_id: int, packages: list, shop_details: dict):
         data = {
@@ -66,6 +79,14 @@ class DemandService:
         }
         png_src, pdf_src = self.qrcode_service.generate_qrcode(data, shop_details)
         return png_src, pdf_src
+
+
+    def get_file(self, demand_id: int, name: str) -> str:
+        # name : qr_code ou pdf, vide tant que la génération du QR code n'est pas terminée
+        src = getattr(self.select_one_by_id(demand_id=demand_id), name)
+        if not src:
+            raise ObjectNotReadyException(name=name)
+        return src
     
    
 
@@ -76,8 +97,8 @@ class DemandService:
             status=args["status"],
             additional=args["additional"],
             shop_id=args["shop_id"],
-            qr_code=args["qr_code"],
-            pdf=args["pdf"]
+            qr_code=args.get("qr_code"),
+            pdf=args.get("pdf")
         )
         demand = self.demand_repo.select_one_by_id(demand_id=demand_id)
 
@@ -99,5 +120,6 @@ class DemandService:
 
     def delete(self, demand_id: str):
         demand = self.select_one_by_id(demand_id=demand_id)
-        self.wasabi_service.delete_file(demand.pdf)
+        self.job_service.check_idle(type="demand_qr_code", target_id=demand_id)
+        self.wasabi_service.delete_files([demand.qr_code, demand.pdf])
         self.demand_repo.delete(demand_id=demand_id)
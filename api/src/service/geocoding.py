@@ -0,0 +1,136 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import requests
+from exception.location import LocationDetailsException, GeocodingProviderException
+from function.geocoding import normalize_address
+from model.geocode_cache import GeocodeCache
+from repository.geocode_cache import GeocodeCacheRepo
+
+
+# Requêtes simultanées au plus vers le géocodeur lors d'un géocodage groupé
+GEOCODING_MAX_WORKERS = 4
+
+
+class RateLimiter:
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+
+    def wait(self) -> None:
+        # Chaque appel réserve le prochain créneau libre puis attend hors du verrou
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+
+# Limite partagée par tous les threads du processus : le quota est lié à la clé d'API
+_rate_limiter = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(rate=float(os.getenv('GEOCODING_RATE_LIMIT', 1)))
+    return _rate_limiter
+
+
+class MapsCoGeocoder:
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        self.rate_limiter = get_rate_limiter()
+
+
+    def geocode(self, address: str, zip_code: str, city: str, country: str):
+        params = {'q': f"{address}, {zip_code} {city}, {country}", 'api_key': os.getenv('GEOCODING_API_KEY')}
+        for attempt in range(int(os.getenv('GEOCODING_RETRIES', 2)) + 1):
+            self.rate_limiter.wait()
+            response = self.session.get("https://geocode.maps.co/search", params=params,
+                                        timeout=float(os.getenv('GEOCODING_TIMEOUT_SECONDS', 10)))
+            if response.status_code != 429:
+                break
+        data = response.json()
+        if not data:
+            return None
+        return float(data[0]['lat']), float(data[0]['lon']), data[0]['display_name']
+
+
+class LocalGeocoder:
+
+    # Coordonnées déterministes en Île-de-France, sans appel réseau (tests, développement hors ligne)
+    def geocode(self, address: str, zip_code: str, city: str, country: str):
+        digest = hashlib.sha256(normalize_address(address, zip_code, city, country).encode()).digest()
+        latitude = 48.70 + int.from_bytes(digest[:4], "big") / 2 ** 32 * 0.30
+        longitude = 2.10 + int.from_bytes(digest[4:8], "big") / 2 ** 32 * 0.50
+        return round(latitude, 7), round(longitude, 7), f"{address}, {zip_code} {city}, {country}"
+
+
+GEOCODERS = {
+    "maps_co": MapsCoGeocoder,
+    "local": LocalGeocoder,
+}
+
+
+class GeocodingService:
+
+    def __init__(self) -> None:
+        self.geocode_cache_repo = GeocodeCacheRepo()
+        self.provider = os.getenv('GEOCODING_PROVIDER', "maps_co")
+        if self.provider not in GEOCODERS:
+            raise GeocodingProviderException(provider=self.provider, providers=list(GEOCODERS))
+        self.geocoder = GEOCODERS[self.provider]()
+
+
+    def geocode(self, address: str, zip_code: str, city: str, country: str):
+        result = self.geocode_many([(address, zip_code, city, country)])[0]
+        if result is None:
+            raise LocationDetailsException
+        return result
+
+
+    def geocode_many(self, addresses: list[tuple]) -> list[tuple]:
+        # Résultat None pour une adresse introuvable : les autres adresses du lot sont conservées
+        # Adresses identiques à la normalisation près : un seul appel
+        # Fournisseur dans la clé : les coordonnées fictives du géocodeur local ne servent jamais à maps_co
+        keys = [f"{self.provider}|{normalize_address(*address)}" for address in addresses]
+        unique = dict(zip(keys, addresses))
+        ttl = timedelta(days=float(os.getenv('GEOCODING_CACHE_TTL_DAYS', 90)))
+        now = datetime.now()
+
+        results = {entry.address_key: (entry.latitude, entry.longitude, entry.description)
+                   for entry in self.geocode_cache_repo.select_all_by_key(list(unique), created_after=now - ttl)}
+        if results:
+            self.geocode_cache_repo.touch(list(results))
+
+        missing = [key for key in unique if key not in results]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(GEOCODING_MAX_WORKERS, len(missing))) as executor:
+                fetched = list(executor.map(lambda key: self.fetch(unique[key]), missing))
+            new_entries = list()
+            for key, result in zip(missing, fetched):
+                results[key] = result
+                # Échecs non mis en cache : l'adresse est retentée à la prochaine demande
+                if result is not None:
+                    new_entries.append(GeocodeCache(address_key=key, latitude=result[0], longitude=result[1],
+                                                    description=result[2], created_at=now, last_used_at=now))
+            if new_entries:
+                self.geocode_cache_repo.upsert(new_entries=new_entries)
+            self.geocode_cache_repo.evict(created_before=now - ttl,
+                                          max_entries=int(os.getenv('GEOCODING_CACHE_MAX_ENTRIES', 10000)))
+        return [results[key] for key in keys]
+
+
+    def fetch(self, address: tuple):
+        try:
+            return self.geocoder.geocode(*address)
+        except Exception:
+            return None
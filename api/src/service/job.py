@@ -0,0 +1,80 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app import app
+from model.job import Job
+from repository.job import JobRepo
+from exception.job import JobIdNotFoundException, JobInProgressException, JobRetryException
+
+
+# Pool de threads partagé par le processus, créé à la première tâche
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv('JOB_WORKERS', 2)), thread_name_prefix="job")
+        return _executor
+
+
+class JobService:
+
+    def __init__(self) -> None:
+        self.job_repo = JobRepo()
+
+
+    def select_one_by_id(self, job_id: int):
+        job = self.job_repo.select_one_by_id(job_id=job_id)
+        if job:
+            return job
+        else:
+            raise JobIdNotFoundException(job_id=job_id)
+
+
+    def check_idle(self, type: str, target_id: int) -> None:
+        # Une modification faite avant la fin de la tâche serait écrasée par son résultat
+        if self.job_repo.select_active(type=type, target_id=target_id):
+            raise JobInProgressException(type=type, target_id=target_id)
+
+
+    def recover(self) -> int:
+        # Au démarrage : les tâches du processus précédent ne tourneront plus, elles doivent être relancées
+        return self.job_repo.fail_active(error="Interrupted by a server restart.")
+
+
+    def retry(self, job_id: int, task) -> int:
+        job = self.select_one_by_id(job_id=job_id)
+        if job.status != "failed" or job.payload is None:
+            raise JobRetryException(job_id=job_id)
+        self.check_idle(type=job.type, target_id=job.target_id)
+        return self.submit(type=job.type, target_id=job.target_id, task=task, **json.loads(job.payload))
+
+
+    def submit(self, type: str, target_id: int, task, **kwargs) -> int:
+        # kwargs enregistrés avec le job : ils doivent rester sérialisables en JSON
+        new_job = Job(type=type, target_id=target_id, status="pending", payload=json.dumps(kwargs),
+                      created_at=datetime.now())
+        new_job_id = self.job_repo.insert(new_job=new_job)
+        # JOB_WORKERS=0 : tâche exécutée dans la requête (développement, débogage)
+        if int(os.getenv('JOB_WORKERS', 2)) <= 0:
+            self.run(new_job_id, task, kwargs)
+        else:
+            get_executor().submit(self.run, new_job_id, task, kwargs)
+        return new_job_id
+
+
+    def run(self, job_id: int, task, kwargs: dict) -> None:
+        # Hors requête HTTP : le contexte d'application reste ouvert pendant toute la tâche
+        with app.app_context():
+            self.job_repo.update_status(job_id=job_id, status="running")
+            try:
+                task(**kwargs)
+            except Exception as e:
+                self.job_repo.update_status(job_id=job_id, status="failed", error=str(e))
+            else:
+                self.job_repo.update_status(job_id=job_id, status="done")
@@ -1,14 +1,15 @@
 from model.location import Location
 from repository.location import LocationRepo
-from exception.location import LocationIdNotFoundException, LocationDetailsException
-import requests
-import os
+from exception.location import LocationIdNotFoundException
+from function.geocoding import normalize_address
+from service.geocoding import GeocodingService
 
 
 class LocationService:
 
     def __init__(self) -> None:
         self.location_repo = LocationRepo()
+        self.geocoding_service = GeocodingService()
 
     def select_one_by_id(self, location_id: int):
         location = self.location_repo.select_one_by_id(location_id=location_id)
@@ -28,6 +29,14 @@ class LocationService:
         else:
             raise LocationIdNotFoundException(location_id=-1)
 
+    def select_within_radius(self, location_id: int, radius_km: float) -> list:
+        location = self.select_one_by_id(location_id=location_id)
+        if location.latitude is None:
+            return list()
+        nearby = self.location_repo.select_within_radius(latitude=location.latitude, longitude=location.longitude,
+                                                         radius_km=radius_km)
+        return [(other, distance) for other, distance in nearby if other.id != location.id]
+
     def insert(self, args: dict):
         new_location = Location(
             address=args['address'], zip_code=args['zip_code'], city=args['city'], country=args['country'])
@@ -36,6 +45,20 @@ class LocationService:
         new_location_id = self.location_repo.insert(new_location=new_location)
         return new_location_id
 
+    def insert_many(self, locations: list[dict]) -> list[int]:
+        # Un identifiant par adresse, dans l'ordre reçu : None pour une adresse qui n'a pas pu être géocodée
+        new_locations = [Location(address=args['address'], zip_code=args['zip_code'], city=args['city'], country=args['country'])
+                         for args in locations]
+        details = self.geocoding_service.geocode_many(
+            [(location.address, location.zip_code, location.city, location.country) for location in new_locations])
+        geocoded = list()
+        for location, detail in zip(new_locations, details):
+            if detail is not None:
+                location.latitude, location.longitude, location.description = detail
+                geocoded.append(location)
+        new_locations_id = iter(self.location_repo.insert_many(new_locations=geocoded) if geocoded else [])
+        return [next(new_locations_id) if detail is not None else None for detail in details]
+
     def update(self, location_id: int, args: dict):
         update_location = Location(
             address=args['address'], zip_code=args['zip_code'], city=args['city'], country=args['country'])
@@ -44,6 +67,16 @@ class LocationService:
         if not location:
             raise LocationIdNotFoundException(location_id=location_id)
 
+        # Les coordonnées ne sont recalculées que si l'adresse a changé
+        if (normalize_address(location.address, location.zip_code, location.city, location.country)
+                != normalize_address(update_location.address, update_location.zip_code, update_location.city, update_location.country)
+                or not location.latitude):
+            update_location.latitude, update_location.longitude, update_location.description = self.get_location_details(
+                location=update_location)
+        else:
+            update_location.latitude, update_location.longitude, update_location.description = (
+                location.latitude, location.longitude, location.description)
+
         self.location_repo.update(
             location_id=location.id, update_location=update_location)
 
@@ -53,21 +86,7 @@ class LocationService:
         self.location_repo.delete(location_id=location_id)
 
     def get_location_details(self, location: Location):
-        try:
-            argument = f"{location.address},%20{location.zip_code}%20{location.city},%20{location.country}"
-            response = requests.get(
-                f"https://geocode.maps.co/search?q={argument}&api_key={os.getenv('GEOCODING_API_KEY')}")
-            data = response.json()
-            latitude, longitude = self.get_coordinates(data=data)
-            description = self.get_description(data=data)
-            return latitude, longitude, description
-        except Exception:
-            raise LocationDetailsException
-
-    def get_coordinates(self, data: dict):
-        return data[0]['lat'], data[0]['lon']
-
-    def get_description(self, data: dict):
-        return data[0]['display_name']
+        return self.geocoding_service.geocode(address=location.address, zip_code=location.zip_code,
+                                              city=location.city, country=location.country)
 
 
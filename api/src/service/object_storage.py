@@ -0,0 +1,228 @@
+import boto3
+import io
+import mimetypes
+import mmap
+import os
+import tempfile
+import threading
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from exception.object_storage import ObjectNotFoundException, ObjectDeleteException, ObjectStorageAccessException
+
+# delete_objects accepte au plus 1000 clés par requête
+DELETE_BATCH_SIZE = 1000
+# Taille des morceaux envoyés lors d'une lecture en flux
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Client partagé par tous les threads du processus : les clients boto3 sont thread-safe
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            config = Config(max_pool_connections=int(os.getenv('WASABI_MAX_POOL_CONNECTIONS', 10)),
+                            connect_timeout=float(os.getenv('WASABI_CONNECT_TIMEOUT_SECONDS', 5)),
+                            read_timeout=float(os.getenv('WASABI_READ_TIMEOUT_SECONDS', 30)),
+                            retries={'max_attempts': int(os.getenv('WASABI_MAX_ATTEMPTS', 3)), 'mode': "standard"})
+            _s3_client = boto3.client('s3',
+                                      endpoint_url=os.getenv('WASABI_ENDPOINT'),
+                                      aws_access_key_id=os.getenv('WASABI_ACCESS_KEY'),
+                                      aws_secret_access_key=os.getenv('WASABI_SECRET_KEY'),
+                                      config=config)
+        return _s3_client
+
+
+class S3ObjectStorage:
+
+    name = "s3"
+
+    def url(self, key: str) -> str:
+        return f"{os.getenv('WASABI_ENDPOINT')}/{os.getenv('WASABI_BUCKET_NAME')}/{key}"
+
+
+    def key_from_url(self, src: str) -> str:
+        values = src.split(f"{os.getenv('WASABI_BUCKET_NAME')}/")
+        return values[1]
+
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        bucket = os.getenv('WASABI_BUCKET_NAME')
+        s3 = get_s3_client()
+        # Au-delà du seuil, envoi en plusieurs parties (PDF volumineux)
+        threshold = int(float(os.getenv('WASABI_MULTIPART_THRESHOLD_MB', 8)) * 1024 * 1024)
+        if len(data) < threshold:
+            s3.put_object(Body=data, Bucket=bucket, Key=key, ContentType=content_type)
+        else:
+            s3.upload_fileobj(io.BytesIO(data), bucket, key, ExtraArgs={'ContentType': content_type},
+                              Config=TransferConfig(multipart_threshold=threshold, multipart_chunksize=threshold))
+
+
+    def delete(self, keys: list[str]) -> None:
+        bucket = os.getenv('WASABI_BUCKET_NAME')
+        s3 = get_s3_client()
+        failed = list()
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            response = s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': key} for key in keys[start:start + DELETE_BATCH_SIZE]],
+                                                                'Quiet': True})
+            # Quiet : seules les clés en échec sont renvoyées, la requête elle-même réussit
+            failed.extend(error['Key'] for error in response.get('Errors', []))
+        if failed:
+            raise ObjectDeleteException(keys=failed)
+
+
+    def client_error(self, key: str, error: ClientError) -> Exception:
+        # Objet absent du bucket : 404 (HEAD, sans corps) ou NoSuchKey (GET)
+        if error.response.get('Error', {}).get('Code') in ("404", "NoSuchKey", "NotFound"):
+            return ObjectNotFoundException(key=key)
+        return ObjectStorageAccessException(key=key)
+
+
+    def stat(self, key: str) -> dict:
+        try:
+            head = get_s3_client().head_object(Bucket=os.getenv('WASABI_BUCKET_NAME'), Key=key)
+        except ClientError as e:
+            raise self.client_error(key, e)
+        return {'size': head['ContentLength'],
+                'content_type': head.get('ContentType') or mimetypes.guess_type(key)[0] or "application/octet-stream",
+                'etag': head['ETag']}
+
+
+    def read_range(self, key: str, start: int, end: int):
+        # Octets [start, end[ lus en flux depuis le bucket, sans charger l'objet entier
+        if end <= start:
+            return iter(())
+        try:
+            response = get_s3_client().get_object(Bucket=os.getenv('WASABI_BUCKET_NAME'), Key=key,
+                                                  Range=f"bytes={start}-{end - 1}")
+        except ClientError as e:
+            # Supprimé entre stat et la lecture
+            raise self.client_error(key, e)
+        return self.iter_body(response['Body'])
+
+
+    def iter_body(self, body):
+        try:
+            yield from body.iter_chunks(STREAM_CHUNK_SIZE)
+        finally:
+            body.close()
+
+
+    def presigned_url(self, key: str) -> str:
+        return get_s3_client().generate_presigned_url(
+            'get_object', Params={'Bucket': os.getenv('WASABI_BUCKET_NAME'), 'Key': key},
+            ExpiresIn=self.presigned_expires_in())
+
+
+    def presigned_expires_in(self) -> int:
+        return int(os.getenv('WASABI_PRESIGNED_EXPIRES_SECONDS', 900))
+
+
+class LocalObjectStorage:
+
+    name = "local"
+
+    # Fichiers sous OBJECT_STORAGE_DIR, servis par l'API : développement et tests de charge hors ligne
+    def root(self) -> str:
+        return os.path.realpath(os.getenv('OBJECT_STORAGE_DIR', "objects"))
+
+
+    def path(self, key: str) -> str:
+        root = self.root()
+        path = os.path.realpath(os.path.join(root, key))
+        # Une clé ne doit pas sortir du dossier de stockage (« .. », chemin absolu)
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise ObjectNotFoundException(key=key)
+        return path
+
+
+    def url(self, key: str) -> str:
+        return f"{os.getenv('API_PATH')}/file/{key}"
+
+
+    def key_from_url(self, src: str) -> str:
+        return src.split("/file/", 1)[1]
+
+
+    def put(self, key: str, data: bytes, content_type: str) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais un fichier partiel.
+        # Nom unique entre processus : plusieurs workers peuvent écrire la même clé (contenu identique)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+    def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+
+    def open(self, key: str):
+        # Lecture projetée en mémoire : les pages sont chargées par le système à la demande
+        try:
+            with open(self.path(key), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise ObjectNotFoundException(key=key)
+
+
+    def stat(self, key: str) -> dict:
+        try:
+            result = os.stat(self.path(key))
+        except FileNotFoundError:
+            raise ObjectNotFoundException(key=key)
+        return {'size': result.st_size,
+                'content_type': mimetypes.guess_type(key)[0] or "application/octet-stream",
+                'etag': f'"{result.st_mtime_ns:x}-{result.st_size:x}"'}
+
+
+    def read_range(self, key: str, start: int, end: int):
+        return self.stream(self.open(key), start, end)
+
+
+    def presigned_url(self, key: str) -> str:
+        # Pas de signature sur disque local : l'adresse servie par l'API est renvoyée telle quelle
+        return self.url(key)
+
+
+    def presigned_expires_in(self):
+        return None
+
+
+    def stream(self, data, start: int = 0, end: int = None):
+        # Octets [start, end[ envoyés par morceaux, la projection est fermée à la fin de l'envoi
+        end = len(data) if end is None else end
+        try:
+            for offset in range(start, end, STREAM_CHUNK_SIZE):
+                yield bytes(data[offset:min(offset + STREAM_CHUNK_SIZE, end)])
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+OBJECT_STORAGES = {
+    "s3": S3ObjectStorage,
+    "local": LocalObjectStorage,
+}
+
+
+def get_object_storage():
+    return OBJECT_STORAGES[os.getenv('OBJECT_STORAGE_BACKEND', "s3")]()
@@ -1,6 +1,10 @@
 import os
 from fpdf import FPDF
-from service.wasabi_s3 import WasabiS3
+from function.artifacts import artifact_dir
+
+
+# Date de création écrite dans tous les documents, à la place de l'heure de génération
+CREATION_DATE = "D:20000101000000"
 
 
 class PDF(FPDF):
@@ -14,23 +18,43 @@ class PDF(FPDF):
         self.set_font("Arial", "I", 8)
         self.cell(0, 10, "Page %s" % self.page_no(), 0, 0, "C")
 
+    def _putinfo(self):
+        # Date de création fixe : un même document donne les mêmes octets et n'est stocké qu'une fois,
+        # les autres métadonnées (producteur, titre, auteur...) restent celles de fpdf
+        out = self._out
+        self._out = lambda line: out("/CreationDate " + self._textstring(CREATION_DATE)
+                                     if line.startswith("/CreationDate ") else line)
+        try:
+            super()._putinfo()
+        finally:
+            del self._out
 
-class PdfService:
-    def __init__(self) -> None:
-        self.wasabi_service = WasabiS3()
+    def to_bytes(self) -> bytes:
+        # fpdf 1.7 renvoie le document sous forme de str latin-1
+        return self.output(dest="S").encode("latin-1")
 
-    def generate_roadmap_pdf(
+
+class PdfService:
+    def add_image(self, pdf: PDF, image: bytes, x: float, y: float, w: float):
+        # fpdf 1.7 ne lit les images que depuis un fichier
+        with artifact_dir() as workdir:
+            path = os.path.join(workdir, "image.png")
+            with open(path, "wb") as f:
+                f.write(image)
+            pdf.image(path, x=x, y=y, w=w)
+
+    def build_roadmap_pdf(
         self,
         time: str,
         distance: float,
         distance_units: str,
         locations: list,
-        type: str,
-    ):
+        map_png: bytes,
+    ) -> bytes:
         pdf = PDF()
         pdf.add_page()
 
-        pdf.image("tmp/map.png", x=10, y=20, w=180)
+        self.add_image(pdf, map_png, x=10, y=20, w=180)
 
         pdf.set_font("Arial", "", 12)
         pdf.ln(100)
@@ -51,29 +75,13 @@ class PdfService:
             pdf.multi_cell(0, 10, txt, 0, 1)
             pdf.ln(5)
 
-        if not os.path.exists("tmp"):
-            os.makedirs("tmp")
-        pdf.output("tmp/roadmap.pdf")
-        pdf_src = self.wasabi_service.upload_file(
-            folder=f"pdf/{type}",
-            file_path="tmp/roadmap.pdf",
-            type=f"{type}_roadmap",
-            extension="pdf",
-        )
-
-        if os.path.exists("tmp/roadmap.pdf"):
-            os.remove("tmp/roadmap.pdf")
+        return pdf.to_bytes()
 
-        if os.path.exists("tmp/map.png"):
-            os.remove("tmp/map.png")
-
-        return pdf_src
-
-    def generate_demand_pdf(self, data: dict, shop_details: dict):
+    def build_demand_pdf(self, data: dict, shop_details: dict, qrcode_png: bytes) -> bytes:
         pdf = PDF()
         pdf.add_page()
 
-        pdf.image("tmp/qrcode.png", x=10, y=20, w=100)
+        self.add_image(pdf, qrcode_png, x=10, y=20, w=100)
 
         pdf.set_font("Arial", "", 12)
         pdf.ln(90)
@@ -90,20 +98,4 @@ class PdfService:
             pdf.multi_cell(0, 10, txt, 0, 1)
             pdf.ln(5)
 
-        if not os.path.exists("tmp"):
-            os.makedirs("tmp")
-        pdf.output("tmp/demand.pdf")
-        pdf_src = self.wasabi_service.upload_file(
-            folder=f"pdf/demand",
-            file_path="tmp/demand.pdf",
-            type=f"demand",
-            extension="pdf",
-        )
-
-        if os.path.exists("tmp/demand.pdf"):
-            os.remove("tmp/demand.pdf")
-
-        if os.path.exists("tmp/qrcode.png"):
-            os.remove("tmp/qrcode.png")
-
-        return pdf_src
+        return pdf.to_bytes()
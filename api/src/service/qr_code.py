@@ -1,6 +1,6 @@
 import qrcode
 from urllib.parse import urlencode
-import os
+import io
 from service.wasabi_s3 import WasabiS3
 from service.pdf_file import PdfService
 
@@ -10,7 +10,7 @@ class QrCodeService:
         self.wasabi_s3_service = WasabiS3()
         self.pdf_service = PdfService()
 
-    def create_qrcode(self, data: dict):
+    def create_qrcode(self, data: dict) -> bytes:
         query = urlencode(data)
 
         qr = qrcode.QRCode(
@@ -23,16 +23,17 @@ class QrCodeService:
         qr.make(fit=True)
 
         img = qr.make_image(fill_color="black", back_color="white")
-        if not os.path.exists("tmp"):
-            os.makedirs("tmp")
-        img.save("tmp/qrcode.png")
+        buffer = io.BytesIO()
+        img.save(buffer)
+        return buffer.getvalue()
 
     def generate_qrcode(self, data: dict, shop_details: dict):
-        self.create_qrcode(data)
-        png_src = self.wasabi_s3_service.upload_file(
-            folder="qrcode", file_path="tmp/qrcode.png", type="qr-code", extension="png"
-        )
-        pdf_src = self.pdf_service.generate_demand_pdf(
-            data=data, shop_details=shop_details
+        qrcode_png = self.create_qrcode(data)
+        pdf = self.pdf_service.build_demand_pdf(
+            data=data, shop_details=shop_details, qrcode_png=qrcode_png
         )
+        png_src, pdf_src = self.wasabi_s3_service.upload_many([
+            {"folder": "qrcode", "data": qrcode_png, "type": "qr-code", "extension": "png"},
+            {"folder": "pdf/demand", "data": pdf, "type": "demand", "extension": "pdf"},
+        ])
         return png_src, pdf_src
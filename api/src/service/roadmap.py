@@ -1,21 +1,20 @@
 from model.location import Location
 import numpy as np
-import numpy.random
-import math
 import matplotlib.pyplot as plt
 import folium
-from scipy.spatial.distance import cdist
 import pandas as pd
-import requests
-from requests.structures import CaseInsensitiveDict
+import io
+import re
 from service.location import LocationService
 import os
-from datetime import datetime
-from PIL import Image
-import io
-import selenium
+from datetime import datetime, timedelta
 from service.wasabi_s3 import WasabiS3
 from service.pdf_file import PdfService
+from service.routing import RoutingService
+from service.static_map import StaticMapService
+from service.route_optimizer import RouteOptimizerService, SOLVER_VERSION
+from service.time_window_routing import TimeWindowRoutingService
+from function.distance import haversine_matrix
 import time
 
 # Traveling Salesman Problem 
@@ -24,12 +23,14 @@ class RoadmapService:
         self.location_service = LocationService()
         self.wasabi_s3 = WasabiS3()
         self.pdf_service = PdfService()
+        self.route_optimizer = RouteOptimizerService()
+        self.time_window_routing = TimeWindowRoutingService()
+        self.routing_service = RoutingService()
+        self.static_map_service = StaticMapService()
 
 
     def distance(self, coord1, coord2):
-        lat1, lon1 = coord1
-        lat2, lon2 = coord2
-        return math.sqrt((lat2 - lat1)**2 + (lon2 - lon1)**2)
+        return haversine_matrix(np.array([coord1, coord2]))[0, 1]
 
 
     def turn_distance(self, locations: list, permutation):
@@ -39,35 +40,14 @@ class RoadmapService:
         return turn
 
 
-    def improve_reversal_turn(self, locations: list, perm=None):
+    def improve_reversal_turn(self, locations: list, perm=None, seed=None, metric: str = "haversine"):
         if len(locations) == 2:
             return 0, 0, [0,1]
-        
+
         perm = (perm.copy() if perm is not None
                 else list(range(locations.shape[0])))
-        dist_min = self.turn_distance(locations, perm)
-        cont = True
-        nb_perm, nb_iter = 0, 0
-        while cont or nb_iter < len(perm) ** 2:
-            nb_iter += 1
-            p0 = perm.copy()
-            a = numpy.random.randint(0, len(perm) - 2)
-            b = numpy.random.randint(a + 1, len(perm) - 1)
-            if a == 0:
-                perm[0:b] = perm[b:0:-1]
-                perm[b] = p0[0]
-            else:
-                perm[a:b+1] = perm[b:a-1:-1]
-            dist = self.turn_distance(locations, perm)
-            if dist < dist_min:
-                dist_min = dist
-                cont = True
-                nb_perm += 1
-                nb_iter = 0
-            else:
-                perm = p0
-                cont = False
-        return dist_min, nb_perm, perm
+        dist_matrix = self.route_optimizer.build_distance_matrix(locations, metric=metric)
+        return self.route_optimizer.improve_reversal_turn(dist_matrix, perm, rng=np.random.default_rng(seed))
 
 
     def draw_turn(self, locations: list, perm):
@@ -81,37 +61,68 @@ class RoadmapService:
         
 
 
-    def build_permutation(self, locations: list):
-        n = len(locations)
-        dist_matrix = cdist(locations, locations)
-        permutation = [0]  # Commencer avec le premier indice
-        while len(permutation) < n:
-            last_index = permutation[-1]
-            # Exclure les indices déjà utilisés pour éviter les doublons
-            remaining_indices = [i for i in range(n) if i not in permutation]
-            # Trouver l'indice le plus proche du dernier indice dans la permutation
-            next_index = min(remaining_indices, key=lambda x: dist_matrix[last_index][x])
-            permutation.append(next_index)
-        return permutation  
-
-
-    def get_optimal_order_index(self, locations: list) -> list : 
-        min_dist = -1
-        optimal_order = list()
-        for i in range(5):
-            perm = self.build_permutation(locations)
-            dist, nb_perm, perm = self.improve_reversal_turn(locations, perm)
-        
-            if min_dist == -1 or self.turn_distance(locations, perm) < min_dist:
-                min_dist = self.turn_distance(locations, perm)
-                optimal_order = perm
+    def build_permutation(self, locations: list, method: str = "nearest_neighbour", metric: str = "haversine"):
+        dist_matrix = self.route_optimizer.build_distance_matrix(locations, metric=metric)
+        return self.route_optimizer.build_permutation(dist_matrix, method=method,
+                                                      locations=self.route_optimizer.get_kdtree_points(locations, metric))
 
-        return optimal_order
+
+    def get_optimal_order_index(self, locations: list, construction: str = "nearest_neighbour", seed=None, time_budget_ms: int = None,
+                                metric: str = "haversine", road_matrix=None) -> list : 
+        return self.route_optimizer.get_optimal_order(locations, restarts=5, construction=construction,
+                                                      seed=seed, time_budget_ms=time_budget_ms,
+                                                      metric=metric, road_matrix=road_matrix)
     
 
+    def get_travel_matrix(self, coordinates_array, metric: str = "haversine") -> dict:
+        # Durées (s) et distances (m) entre tous les points, calculées une seule fois par tournée
+        if metric == "road":
+            matrix = self.routing_service.matrix(coordinates_array)
+            # Fournisseur indisponible : la matrice locale revient à optimiser la distance à vol d'oiseau
+            if matrix['provider'] != "local":
+                return {**matrix, 'metric': "road"}
+            metric = "haversine"
+        speed = float(os.getenv('ROADMAP_AVERAGE_SPEED_KMH', 30))
+        distances = self.route_optimizer.build_distance_matrix(coordinates_array, metric=metric)
+        return {'durations': distances / speed * 3600, 'distances': distances * 1000, 'metric': metric}
+
+
+    def get_road_matrix(self, matrix: dict):
+        # 2-opt inverse des segments : l'optimiseur travaille sur la moyenne des deux sens
+        if matrix['metric'] != "road":
+            return None
+        return (matrix['durations'] + matrix['durations'].T) / 2
+
+
+    def get_time_window_order(self, locations: list[Location], duration_matrix, deadlines: dict,
+                              start_datetime: datetime):
+        # Temps de service fixe à chaque arrêt
+        service_time = float(os.getenv('ROADMAP_SERVICE_TIME_MINUTES', 10)) * 60
+        limits = [np.inf] + [(deadlines[location.id] - start_datetime).total_seconds()
+                             if deadlines.get(location.id) else np.inf
+                             for location in locations[1:]]
+        solution = self.time_window_routing.solve(duration_matrix, limits, service_time=service_time,
+                                                  time_budget_ms=int(os.getenv('ROADMAP_TIME_BUDGET_MS', 2000)))
+        schedule = list()
+        for position, index in enumerate(solution['order']):
+            limit_datetime = deadlines.get(locations[index].id) if index else None
+            schedule.append({
+                'location': locations[index].json_rest(),
+                'estimated_arrival': (start_datetime + timedelta(seconds=solution['arrivals'][position])).strftime("%Y-%m-%d %H:%M:%S"),
+                'limit_datetime': limit_datetime.strftime("%Y-%m-%d %H:%M:%S") if limit_datetime else None,
+                'late': index in solution['late'],
+            })
+        return solution['order'], schedule
+
+
+    def sort_locations(self, locations: list[Location], locations_id: list[int]) -> list[Location]:
+        # La requête renvoie les lieux dans l'ordre de la base : le point de départ doit rester en tête
+        positions = {location_id: i for i, location_id in reversed(list(enumerate(locations_id)))}
+        return sorted(locations, key=lambda location: positions[location.id])
+
+
     def transform_locations(self, locations: list) -> list:
-        locations_coords = [[float(location.latitude), float(location.longitude)] for location in locations]
-        return np.array(locations_coords)
+        return np.array([[location.latitude, location.longitude] for location in locations], dtype=float)
 
 
     def get_ordered_locations(self, locations: list[Location], optimal_order: list[int]):
@@ -130,38 +141,9 @@ class RoadmapService:
 
     # Points path
     def get_direction_details(self, locations):
-        url = "https://api.geoapify.com/v1/routing"
-        waypoints_param = self.get_waypoints_parameter(locations=locations)
-        api_key_param = f"&apiKey={os.getenv('GEOAPIFY_API_KEY')}"
-        headers = CaseInsensitiveDict()
-        headers["Accept"] = "application/json"
-      
-        response = requests.get(url + waypoints_param + "&mode=drive" + api_key_param, headers)
-        data = response.json()
-    
-        geometry = data['features'][0]['geometry']['coordinates']
-        
-        details = data['features'][0]['properties']
-        distance = details['distance']
-        distance_units = details['distance_units']
-        time = details['time']
-        coordinates = list()
-        
-        for itinerary in geometry:
-            for coordinate in itinerary:
-                coordinates.append([coordinate[1], coordinate[0]])
-        return coordinates, distance, distance_units, time
-
-
-    def get_waypoints_parameter(self, locations):
-        locations_list = [[location.latitude, location.longitude] for location in locations]
-        locations_list.append([locations[0].latitude, locations[0].longitude])
-        parameters = list()
-        for coordinates in locations_list:
-            parameters.append(','.join(coordinates))
-        
-        query = f"?waypoints={'|'.join(parameters)}"
-        return query
+        points = [[location.latitude, location.longitude] for location in locations + locations[:1]]
+        route = self.routing_service.route(points)
+        return route['geometry'], route['distance'], "meters", route['duration']
 
 
     def get_map_zoom(self, data):
@@ -194,48 +176,144 @@ class RoadmapService:
         sw, ne = self.get_map_zoom(points)
         m.fit_bounds([sw, ne])
         formatted_time = time.strftime("%Hh%M", time.gmtime(time_seconds))
-        path = f"tmp/roadmap.html"
-        if not os.path.exists("tmp"):
-            os.makedirs("tmp")
-        m.save(path)
-        self.map_to_png(map=m)
-        return path, distance, distance_units, formatted_time
-
-    def get_map_html(self, filepath: str):
-        f = open(filepath, "r")
-        return f.read() 
-
-    def delete_map(self, filepath: str):
-        if os.path.exists(filepath):
-            os.remove(filepath)
-
-    def map_to_png(self, map): 
-        img_data = map._to_png(5)
-        img = Image.open(io.BytesIO(img_data))
-        if not os.path.exists("tmp"):
-            os.makedirs("tmp")
-        img.save('tmp/map.png')
-
-
-    def generate_roadmap(self, locations_id: int, type: str) -> dict :
+        # Identifiants aléatoires de folium numérotés dans l'ordre : une même tournée donne le même HTML
+        ids = dict()
+        html = re.sub(r"(?<![0-9a-f])[0-9a-f]{32}(?![0-9a-f])", lambda match: ids.setdefault(match.group(0), f"{len(ids):032x}"),
+                      m.get_root().render())
+        map_png = self.map_to_png(points=points, locations=locations)
+        return html, map_png, distance, distance_units, formatted_time
+
+    def map_to_png(self, points: list, locations: list[Location]) -> bytes:
+        # Rendu direct du tracé et des marqueurs, sans navigateur
+        markers = [[location.latitude, location.longitude] for location in locations]
+        img = self.static_map_service.render(route=points, markers=markers)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+    def estimate_distance(self, matrix: dict, optimal_order: list) -> float:
+        # Distance de la tournée fermée, en mètres
+        return round(sum(leg['distance'] for leg in self.get_legs(matrix, optimal_order)))
+
+
+    def get_legs(self, matrix: dict, optimal_order: list) -> list[dict]:
+        # Trajet de chaque arrêt vers le suivant, le dernier revient au point de départ
+        start_index = optimal_order.index(0)
+        order = optimal_order[start_index:] + optimal_order[:start_index]
+        return [{'distance': round(float(matrix['distances'][origin, destination])),
+                 'duration': round(float(matrix['durations'][origin, destination]))}
+                for origin, destination in zip(order, order[1:] + order[:1])]
+
+
+    def compute_order(self, locations_id: list[int], construction: str = "nearest_neighbour", metric: str = "haversine",
+                      deadlines: dict = None, start_datetime: datetime = None, time_budget_ms: int = None) -> dict:
         for id in locations_id:
             self.location_service.select_one_by_id(location_id=id)
-        locations = self.location_service.select_all_by_id(locations_id=locations_id)
+        locations = self.sort_locations(self.location_service.select_all_by_id(locations_id=locations_id), locations_id)
         coordinates_array = self.transform_locations(locations)
-        optimal_order = self.get_optimal_order_index(locations=coordinates_array)
-        ordered_locations = self.get_ordered_locations(locations=locations, optimal_order=optimal_order)
-        path , distance, distance_units, total_time = self.create_map(locations=ordered_locations)
-        roadmap_src = self.wasabi_s3.upload_file(folder=f"roadmap/{type}", file_path=path, type=f"{type}_roadmap", extension="html")
-        pdf_src = self.pdf_service.generate_roadmap_pdf(time=total_time, distance=distance, distance_units=distance_units, locations=ordered_locations, type=type)
-        self.delete_map(path)
+        if time_budget_ms is None:
+            time_budget_ms = int(os.getenv('ROADMAP_TIME_BUDGET_MS', 2000))
+        schedule, optimization_stats = None, None
+        matrix = self.get_travel_matrix(coordinates_array, metric=metric)
+        if deadlines:
+            optimal_order, schedule = self.get_time_window_order(locations, matrix['durations'], deadlines,
+                                                                 start_datetime or datetime.now())
+        else:
+            # Graine dérivée des lieux : une même tournée donne toujours le même ordre
+            optimal_order, optimization_stats = self.route_optimizer.get_optimal_order_with_stats(
+                coordinates_array, restarts=5, construction=construction, seed=sorted(locations_id),
+                time_budget_ms=time_budget_ms, metric=matrix['metric'], road_matrix=self.get_road_matrix(matrix))
+        return {
+            'locations': self.get_ordered_locations(locations=locations, optimal_order=optimal_order),
+            'estimated_distance': self.estimate_distance(matrix, optimal_order),
+            'legs': self.get_legs(matrix, optimal_order),
+            'solver_version': f"{SOLVER_VERSION}:{'time_window' if deadlines else construction}:{matrix['metric']}",
+            'optimization': optimization_stats,
+            'schedule': schedule,
+        }
+
+
+    def get_order(self, locations_id: list[int], construction: str = "nearest_neighbour", metric: str = "haversine") -> dict:
+        order = self.compute_order(locations_id=locations_id, construction=construction, metric=metric,
+                                   time_budget_ms=int(os.getenv('ROADMAP_PREVIEW_TIME_BUDGET_MS', 200)))
+        return {
+            'locations': [location.json_rest() for location in order['locations']],
+            'estimated_distance': order['estimated_distance'],
+            'distance_units': "meters",
+            'optimization': order['optimization'],
+        }
+
+
+    def update_order(self, locations_id: list[int], added_id: int = None, removed_id: int = None,
+                     metric: str = "haversine") -> dict:
+        # locations_id est l'ordre déjà enregistré, point de départ en tête : seul le point modifié est replacé
+        locations_id = list(locations_id) + ([added_id] if added_id is not None else [])
+        for id in locations_id:
+            self.location_service.select_one_by_id(location_id=id)
+        locations = self.sort_locations(self.location_service.select_all_by_id(locations_id=locations_id), locations_id)
+        coordinates_array = self.transform_locations(locations)
+        matrix = self.get_travel_matrix(coordinates_array, metric=metric)
+        dist_matrix = self.route_optimizer.build_distance_matrix(coordinates_array, metric=matrix['metric'],
+                                                                 road_matrix=self.get_road_matrix(matrix))
+        deadline = time.perf_counter() + int(os.getenv('ROADMAP_REPAIR_TIME_BUDGET_MS', 100)) / 1000
+        if added_id is not None:
+            optimal_order = self.route_optimizer.insert_stop(dist_matrix, list(range(len(locations) - 1)),
+                                                             len(locations) - 1, deadline=deadline)
+        else:
+            stop = locations_id.index(removed_id)
+            optimal_order = self.route_optimizer.remove_stop(dist_matrix, list(range(len(locations))),
+                                                             stop, deadline=deadline)
+            del locations[stop]
+            matrix = {**matrix, 'durations': np.delete(np.delete(matrix['durations'], stop, axis=0), stop, axis=1),
+                      'distances': np.delete(np.delete(matrix['distances'], stop, axis=0), stop, axis=1)}
+        return {
+            'locations': self.get_ordered_locations(locations=locations, optimal_order=optimal_order),
+            'estimated_distance': self.estimate_distance(matrix, optimal_order),
+            'legs': self.get_legs(matrix, optimal_order),
+            'solver_version': f"{SOLVER_VERSION}:repair:{matrix['metric']}",
+            'optimization': None,
+            'schedule': None,
+        }
+
+
+    def render_roadmap(self, order: dict, type: str) -> dict:
+        ordered_locations = order['locations']
+        # Carte, image et PDF restent en mémoire : plusieurs tournées peuvent être créées en parallèle
+        html, map_png, distance, distance_units, total_time = self.create_map(locations=ordered_locations)
+        pdf = self.pdf_service.build_roadmap_pdf(time=total_time, distance=distance, distance_units=distance_units,
+                                                 locations=ordered_locations, map_png=map_png)
+        roadmap_src, pdf_src = self.wasabi_s3.upload_many([
+            {'folder': f"roadmap/{type}", 'data': html.encode("utf-8"), 'type': f"{type}_roadmap", 'extension': "html"},
+            {'folder': f"pdf/{type}", 'data': pdf, 'type': f"{type}_roadmap", 'extension': "pdf"},
+        ])
         response = {
             'locations': [location.json_rest() for location in ordered_locations],
             'distance': distance,
             'distance_units': distance_units,
             'time': total_time,
             'roadmap_src': roadmap_src,
-            'pdf_src': pdf_src
+            'pdf_src': pdf_src,
+            'legs': order['legs'],
+            'solver_version': order['solver_version'],
+            'optimization': order['optimization'],
+            'schedule': order['schedule']
         }
         return response
 
 
+    def generate_roadmap(self, locations_id: int, type: str, construction: str = "nearest_neighbour", metric: str = None,
+                         deadlines: dict = None, start_datetime: datetime = None) -> dict :
+        order = self.compute_order(locations_id=locations_id, construction=construction,
+                                   metric=metric or os.getenv('ROADMAP_METRIC', "road"),
+                                   deadlines=deadlines, start_datetime=start_datetime)
+        return self.render_roadmap(order=order, type=type)
+
+
+    def update_roadmap(self, locations_id: list[int], type: str, added_id: int = None, removed_id: int = None,
+                       metric: str = None) -> dict:
+        order = self.update_order(locations_id=locations_id, added_id=added_id, removed_id=removed_id,
+                                  metric=metric or os.getenv('ROADMAP_METRIC', "road"))
+        return self.render_roadmap(order=order, type=type)
+
+
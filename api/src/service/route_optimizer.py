@@ -0,0 +1,557 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from scipy.sparse.csgraph import minimum_spanning_tree
+from scipy.spatial import cKDTree
+from exception.roadmap import RoadmapConstructionException
+from function.distance import distance_matrix, project_equirectangular
+
+
+# Au-delà de cette taille, le plus proche voisin passe par un KD-tree
+KDTREE_MIN_SIZE = 200
+# Nombre de plus proches voisins examinés par la recherche locale
+NEIGHBOURS_K = 8
+# Plus proches voisins ajoutés dans chacun des quatre quadrants autour d'un point
+QUADRANT_NEIGHBOURS = 2
+# Perturbations double-bridge tentées par redémarrage
+ILS_KICKS = 5
+# En dessous de cette taille, lancer des processus coûte plus cher que l'optimisation
+PARALLEL_MIN_SIZE = 50
+# Enregistrée avec chaque tournée : à incrémenter quand l'algorithme change les résultats
+SOLVER_VERSION = "ils-1"
+
+
+# Traveling Salesman Problem on a precomputed distance matrix
+class RouteOptimizerService:
+
+    def build_distance_matrix(self, locations: np.ndarray, metric: str = "haversine", road_matrix: np.ndarray = None) -> np.ndarray:
+        return distance_matrix(locations, metric=metric, road_matrix=road_matrix)
+
+
+    def get_kdtree_points(self, locations: np.ndarray, metric: str):
+        # Le KD-tree n'a de sens que pour les métriques géométriques
+        if metric == "euclidean":
+            return locations
+        if metric in ("haversine", "equirectangular"):
+            return project_equirectangular(locations)
+        return None
+
+
+    def tour_length(self, dist_matrix: np.ndarray, perm) -> float:
+        perm = np.asarray(perm)
+        return float(dist_matrix[perm, np.roll(perm, -1)].sum())
+
+
+    def two_opt_delta(self, dist_matrix: np.ndarray, perm, a: int, b: int) -> float:
+        # Variation de longueur en inversant perm[a:b+1] sur le circuit fermé
+        n = len(perm)
+        prev_node = perm[a - 1]
+        next_node = perm[(b + 1) % n]
+        return (dist_matrix[prev_node, perm[b]] + dist_matrix[perm[a], next_node]
+                - dist_matrix[prev_node, perm[a]] - dist_matrix[perm[b], next_node])
+
+
+    def build_permutation(self, dist_matrix: np.ndarray, method: str = "nearest_neighbour", locations: np.ndarray = None) -> list:
+        if method == "nearest_neighbour" and locations is not None and len(dist_matrix) > KDTREE_MIN_SIZE:
+            return self.nearest_neighbour_kdtree(locations)
+        constructions = {
+            "nearest_neighbour": self.nearest_neighbour,
+            "greedy_edge": self.greedy_edge,
+            "christofides": self.christofides,
+        }
+        if method not in constructions:
+            raise RoadmapConstructionException(method=method)
+        return constructions[method](dist_matrix)
+
+
+    def nearest_neighbour(self, dist_matrix: np.ndarray) -> list:
+        n = len(dist_matrix)
+        visited = np.zeros(n, dtype=bool)
+        visited[0] = True
+        permutation = [0]
+        for _ in range(n - 1):
+            row = np.where(visited, np.inf, dist_matrix[permutation[-1]])
+            next_index = int(np.argmin(row))
+            visited[next_index] = True
+            permutation.append(next_index)
+        return permutation
+
+
+    def nearest_neighbour_kdtree(self, locations: np.ndarray) -> list:
+        n = len(locations)
+        tree = cKDTree(locations)
+        visited = np.zeros(n, dtype=bool)
+        visited[0] = True
+        permutation = [0]
+        for _ in range(n - 1):
+            k = 8
+            while True:
+                # On élargit la recherche tant que tous les voisins sont déjà visités
+                distances, indices = tree.query(locations[permutation[-1]], k=min(k, n))
+                candidates = indices[~visited[indices]]
+                if len(candidates) or k >= n:
+                    break
+                k *= 2
+            next_index = int(candidates[0])
+            visited[next_index] = True
+            permutation.append(next_index)
+        return permutation
+
+
+    def greedy_edge(self, dist_matrix: np.ndarray) -> list:
+        n = len(dist_matrix)
+        rows, cols = np.triu_indices(n, k=1)
+        order = np.argsort(dist_matrix[rows, cols], kind="stable")
+        parent = list(range(n))
+        degree = np.zeros(n, dtype=int)
+        neighbours = [[] for _ in range(n)]
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        nb_edges = 0
+        for edge in order:
+            i, j = int(rows[edge]), int(cols[edge])
+            if degree[i] >= 2 or degree[j] >= 2:
+                continue
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j:
+                continue
+            parent[root_i] = root_j
+            degree[i] += 1
+            degree[j] += 1
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+            nb_edges += 1
+            if nb_edges == n - 1:
+                break
+
+        # Le chemin hamiltonien obtenu est parcouru depuis une de ses extrémités
+        start = int(np.flatnonzero(degree < 2)[0])
+        path = [start]
+        previous = -1
+        while len(path) < n:
+            current = path[-1]
+            next_index = next(i for i in neighbours[current] if i != previous)
+            previous = current
+            path.append(next_index)
+        return self.rotate_to_start(path)
+
+
+    def christofides(self, dist_matrix: np.ndarray) -> list:
+        n = len(dist_matrix)
+        # minimum_spanning_tree ignore les arêtes nulles (adresses identiques) :
+        # une constante ajoutée à toutes les arêtes ne change pas l'arbre couvrant minimal
+        weights = dist_matrix + 1.0
+        np.fill_diagonal(weights, 0)
+        mst = minimum_spanning_tree(weights).tocoo()
+        edges = [(int(i), int(j)) for i, j in zip(mst.row, mst.col)]
+
+        degree = np.zeros(n, dtype=int)
+        for i, j in edges:
+            degree[i] += 1
+            degree[j] += 1
+
+        # Couplage glouton des sommets de degré impair
+        odd = np.flatnonzero(degree % 2 == 1)
+        sub_matrix = dist_matrix[np.ix_(odd, odd)]
+        rows, cols = np.triu_indices(len(odd), k=1)
+        matched = np.zeros(len(odd), dtype=bool)
+        for edge in np.argsort(sub_matrix[rows, cols], kind="stable"):
+            i, j = rows[edge], cols[edge]
+            if not matched[i] and not matched[j]:
+                matched[i] = matched[j] = True
+                edges.append((int(odd[i]), int(odd[j])))
+
+        adjacency = [[] for _ in range(n)]
+        for edge_id, (i, j) in enumerate(edges):
+            adjacency[i].append((j, edge_id))
+            adjacency[j].append((i, edge_id))
+
+        # Circuit eulérien (Hierholzer) puis raccourcis sur les sommets déjà visités
+        used = np.zeros(len(edges), dtype=bool)
+        stack, circuit = [0], []
+        while stack:
+            current = stack[-1]
+            while adjacency[current] and used[adjacency[current][-1][1]]:
+                adjacency[current].pop()
+            if adjacency[current]:
+                next_index, edge_id = adjacency[current].pop()
+                used[edge_id] = True
+                stack.append(next_index)
+            else:
+                circuit.append(stack.pop())
+
+        visited = np.zeros(n, dtype=bool)
+        permutation = list()
+        for i in circuit:
+            if not visited[i]:
+                visited[i] = True
+                permutation.append(i)
+        return self.rotate_to_start(permutation)
+
+
+    def rotate_to_start(self, permutation: list) -> list:
+        start_index = permutation.index(0)
+        return permutation[start_index:] + permutation[:start_index]
+
+
+    def improve_reversal_turn(self, dist_matrix: np.ndarray, perm: list, rng: np.random.Generator = None, deadline: float = None):
+        n = len(perm)
+        perm = list(perm)
+        if n <= 3:
+            return self.tour_length(dist_matrix, perm), 0, perm
+
+        rng = rng if rng is not None else np.random.default_rng()
+        dist_min = self.tour_length(dist_matrix, perm)
+        cont = True
+        nb_perm, nb_iter = 0, 0
+        while cont or nb_iter < n ** 2:
+            # Budget épuisé : la tournée courante est toujours la meilleure trouvée
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            nb_iter += 1
+            a = rng.integers(0, n - 2)
+            b = rng.integers(a + 1, n - 1)
+            delta = self.two_opt_delta(dist_matrix, perm, a, b)
+            if delta < -1e-12:
+                perm[a:b + 1] = perm[a:b + 1][::-1]
+                dist_min += delta
+                cont = True
+                nb_perm += 1
+                nb_iter = 0
+            else:
+                cont = False
+        return dist_min, nb_perm, perm
+
+
+    def get_neighbour_points(self, locations: np.ndarray, metric: str):
+        # Coordonnées planes des points pour les voisins par quadrant, y compris avec la métrique routière
+        if metric == "euclidean":
+            return np.asarray(locations, dtype=float)
+        try:
+            return project_equirectangular(locations)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+
+    def build_neighbours(self, dist_matrix: np.ndarray, k: int, points: np.ndarray = None) -> list:
+        n = len(dist_matrix)
+        k = min(k, n - 1)
+        order = np.argsort(dist_matrix, axis=1, kind="stable")
+        # Le point lui-même n'est pas toujours en première colonne si des adresses sont identiques
+        neighbours = [row[row != i][:k] for i, row in enumerate(order)]
+        if points is not None and n > k + 1:
+            # Plus proches voisins dans chaque quadrant : sur des points groupés en quartiers,
+            # les k plus proches sont tous dans le même quartier et les arêtes entre quartiers ne sont jamais essayées
+            points = np.asarray(points, dtype=float)
+            dx = points[np.newaxis, :, 1] - points[:, np.newaxis, 1]
+            dy = points[np.newaxis, :, 0] - points[:, np.newaxis, 0]
+            quadrants = (dx >= 0).astype(int) + 2 * (dy >= 0)
+            np.fill_diagonal(quadrants, -1)
+            count = min(QUADRANT_NEIGHBOURS, n - 1)
+            extra = list()
+            for quadrant in range(4):
+                masked = np.where(quadrants == quadrant, dist_matrix, np.inf)
+                closest = np.argpartition(masked, count - 1, axis=1)[:, :count]
+                extra.append(np.where(np.isfinite(np.take_along_axis(masked, closest, axis=1)), closest, -1))
+            extra = np.hstack(extra)
+            neighbours = [np.unique(np.concatenate((row, extra_row[extra_row >= 0])))
+                          for row, extra_row in zip(neighbours, extra)]
+        # Du plus proche au plus éloigné : les recherches s'arrêtent dès qu'aucun gain n'est possible
+        return [row[np.argsort(dist_matrix[i, row], kind="stable")] for i, row in enumerate(neighbours)]
+
+
+    def local_search(self, dist_matrix: np.ndarray, perm: list, neighbours: list, deadline: float = None) -> list:
+        perm = list(perm)
+        n = len(perm)
+        if n <= 3:
+            return perm
+
+        # Bits « don't look » : seuls les points dont une arête vient de changer sont réexaminés
+        pos = np.empty(n, dtype=int)
+        pos[perm] = np.arange(n)
+        queue = deque(perm)
+        queued = np.ones(n, dtype=bool)
+        while queue:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            u = queue.popleft()
+            queued[u] = False
+            touched = (self.two_opt_move(dist_matrix, perm, pos, neighbours, u)
+                       or self.or_opt_move(dist_matrix, perm, pos, neighbours, u)
+                       or self.three_opt_move(dist_matrix, perm, pos, neighbours, u))
+            if touched:
+                pos[perm] = np.arange(n)
+                for node in (u, *touched):
+                    if not queued[node]:
+                        queued[node] = True
+                        queue.append(node)
+        return perm
+
+
+    def two_opt_move(self, dist_matrix: np.ndarray, perm: list, pos: np.ndarray, neighbours: list, u: int):
+        # Nouvelle arête (u, v) avec le successeur puis le prédécesseur de u : renvoie les points touchés
+        n = len(perm)
+        i = pos[u]
+        u_next, u_prev = perm[(i + 1) % n], perm[i - 1]
+        for v in neighbours[u]:
+            added = dist_matrix[u, v]
+            if added >= dist_matrix[u, u_next] and added >= dist_matrix[u_prev, u]:
+                break
+            j = pos[v]
+            v_next, v_prev = perm[(j + 1) % n], perm[j - 1]
+            if v != u_next and v_next != u:
+                delta = added + dist_matrix[u_next, v_next] - dist_matrix[u, u_next] - dist_matrix[v, v_next]
+                if delta < -1e-12:
+                    a, b = (i + 1, j) if i < j else (j + 1, i)
+                    perm[a:b + 1] = perm[a:b + 1][::-1]
+                    return [u_next, v, v_next]
+            if v != u_prev and v_prev != u:
+                delta = added + dist_matrix[u_prev, v_prev] - dist_matrix[u_prev, u] - dist_matrix[v_prev, v]
+                if delta < -1e-12:
+                    a, b = (i, j - 1) if i < j else (j, i - 1)
+                    perm[a:b + 1] = perm[a:b + 1][::-1]
+                    return [u_prev, v, v_prev]
+        return None
+
+
+    def or_opt_move(self, dist_matrix: np.ndarray, perm: list, pos: np.ndarray, neighbours: list, u: int):
+        # Déplacement du segment de 1 à 3 points qui commence en u, éventuellement inversé
+        n = len(perm)
+        i = pos[u]
+        for length in (1, 2, 3):
+            if length > n - 3 or i == 0 or i + length > n:
+                break
+            segment = perm[i:i + length]
+            first, last = segment[0], segment[-1]
+            prev_node, next_node = perm[i - 1], perm[(i + length) % n]
+            removal_gain = (dist_matrix[prev_node, first] + dist_matrix[last, next_node]
+                            - dist_matrix[prev_node, next_node])
+            for v in np.concatenate((neighbours[first], neighbours[last])):
+                j = pos[v]
+                if i <= j < i + length or v == prev_node:
+                    continue
+                w = perm[(j + 1) % n]
+                if i <= pos[w] < i + length:
+                    continue
+                forward = dist_matrix[v, first] + dist_matrix[last, w] - dist_matrix[v, w]
+                backward = dist_matrix[v, last] + dist_matrix[first, w] - dist_matrix[v, w]
+                if min(forward, backward) - removal_gain < -1e-12:
+                    moved = segment if forward <= backward else segment[::-1]
+                    rest = perm[:i] + perm[i + length:]
+                    insert_at = rest.index(v) + 1
+                    perm[:] = rest[:insert_at] + moved + rest[insert_at:]
+                    return [prev_node, next_node, first, last, v, w]
+        return None
+
+
+    def three_opt_move(self, dist_matrix: np.ndarray, perm: list, pos: np.ndarray, neighbours: list, a: int):
+        # Échange de deux segments consécutifs sans inversion :
+        # (a, a1) (b, b1) (c, c1) deviennent (a, b1) (c, a1) (b, c1)
+        n = len(perm)
+        i = pos[a]
+        if i >= n - 2:
+            return None
+        a1 = perm[i + 1]
+        for b1 in neighbours[a]:
+            j1 = pos[b1]
+            if j1 <= i + 1:
+                continue
+            b = perm[j1 - 1]
+            gain = dist_matrix[a, a1] + dist_matrix[b, b1] - dist_matrix[a, b1]
+            if gain <= 0:
+                continue
+            for c1 in neighbours[b]:
+                k1 = pos[c1]
+                if k1 <= j1:
+                    continue
+                c = perm[k1 - 1]
+                delta = (dist_matrix[c, a1] + dist_matrix[b, c1]
+                         - dist_matrix[c, c1] - gain)
+                if delta < -1e-12:
+                    perm[i + 1:k1] = perm[j1:k1] + perm[i + 1:j1]
+                    return [a1, b, b1, c, c1]
+        return None
+
+
+    def perturb(self, perm: list, rng: np.random.Generator) -> list:
+        # Double-bridge : un 3-opt aléatoire que la recherche locale ne défait pas directement
+        n = len(perm)
+        if n < 8:
+            return list(perm)
+        p1, p2, p3 = sorted(rng.choice(np.arange(1, n), size=3, replace=False))
+        return perm[:p1] + perm[p3:] + perm[p2:p3] + perm[p1:p2]
+
+
+    def get_optimal_order(self, locations: np.ndarray, restarts: int = 5, construction: str = "nearest_neighbour",
+                          seed=None, time_budget_ms: int = None, improvement: str = "local_search",
+                          neighbours_k: int = NEIGHBOURS_K, workers: int = None,
+                          metric: str = "haversine", road_matrix: np.ndarray = None) -> list:
+        optimal_order, stats = self.get_optimal_order_with_stats(
+            locations, restarts=restarts, construction=construction, seed=seed, time_budget_ms=time_budget_ms,
+            improvement=improvement, neighbours_k=neighbours_k, workers=workers,
+            metric=metric, road_matrix=road_matrix)
+        return optimal_order
+
+
+    def get_optimal_order_with_stats(self, locations: np.ndarray, restarts: int = 5, construction: str = "nearest_neighbour",
+                                     seed=None, time_budget_ms: int = None, improvement: str = "local_search",
+                                     neighbours_k: int = NEIGHBOURS_K, workers: int = None,
+                                     metric: str = "haversine", road_matrix: np.ndarray = None):
+        if len(locations) <= 2:
+            return list(range(len(locations))), {'workers': 0, 'restarts': []}
+
+        wall_deadline = (time.time() + time_budget_ms / 1000
+                         if time_budget_ms is not None else None)
+        dist_matrix = self.build_distance_matrix(locations, metric=metric, road_matrix=road_matrix)
+        start_perm = self.build_permutation(dist_matrix, method=construction,
+                                            locations=self.get_kdtree_points(locations, metric))
+        return self.improve(dist_matrix, start_perm, restarts=restarts, seed=seed, wall_deadline=wall_deadline,
+                            improvement=improvement, neighbours_k=neighbours_k, workers=workers,
+                            neighbour_points=self.get_neighbour_points(locations, metric))
+
+
+    def improve(self, dist_matrix: np.ndarray, start_perm: list, restarts: int = 5, seed=None,
+                wall_deadline: float = None, improvement: str = "local_search", neighbours_k: int = NEIGHBOURS_K,
+                workers: int = None, neighbour_points: np.ndarray = None):
+        # Redémarrages depuis une tournée initiale : wall_deadline est l'échéance absolue (time.time())
+        seeds = np.random.SeedSequence(seed).spawn(restarts)
+        # Listes de voisins construites une fois pour tous les redémarrages
+        neighbours = (self.build_neighbours(dist_matrix, neighbours_k, points=neighbour_points)
+                      if improvement == "local_search" else None)
+
+        workers = workers if workers is not None else int(os.getenv('ROADMAP_WORKERS', os.cpu_count() or 1))
+        workers = min(workers, restarts)
+        results = None
+        if workers > 1 and len(dist_matrix) >= PARALLEL_MIN_SIZE:
+            # Les redémarrages passent par vagues de workers : le i-ème d'un worker partage le temps restant
+            # avec ceux qui le suivent sur ce worker
+            rounds = -(-restarts // workers)
+            tasks = [(dist_matrix, start_perm, improvement, seeds[i], i, wall_deadline, neighbours_k, neighbours,
+                      rounds - i // workers) for i in range(restarts)]
+            pool = get_process_pool(workers)
+            try:
+                results = list(pool.map(run_restart, *zip(*tasks)))
+            except BrokenProcessPool:
+                drop_process_pool(workers, pool)
+        if results is None:
+            workers = 1
+            # En série, chaque redémarrage reçoit une part égale du temps restant :
+            # le premier ne consomme plus tout le budget des suivants
+            results = [run_restart(dist_matrix, start_perm, improvement, seeds[i], i, wall_deadline, neighbours_k,
+                                   neighbours, restarts - i) for i in range(restarts)]
+
+        best = min(results, key=lambda result: result['distance'])
+        stats = {
+            'workers': workers,
+            'restarts': [{key: value for key, value in result.items() if key != 'perm'} for result in results],
+        }
+        return best['perm'], stats
+
+
+    def improve_restart(self, dist_matrix: np.ndarray, start_perm: list, improvement: str, rng: np.random.Generator,
+                        restart_index: int, deadline: float = None, neighbours_k: int = NEIGHBOURS_K,
+                        neighbours: list = None) -> list:
+        if improvement == "reversal":
+            dist, nb_perm, perm = self.improve_reversal_turn(dist_matrix, start_perm, rng=rng, deadline=deadline)
+            return self.rotate_to_start(perm)
+        perm = start_perm if restart_index == 0 else self.perturb(start_perm, rng)
+        return self.iterated_local_search(dist_matrix, perm, kicks=ILS_KICKS, rng=rng,
+                                          deadline=deadline, neighbours_k=neighbours_k, neighbours=neighbours)
+
+
+    def iterated_local_search(self, dist_matrix: np.ndarray, perm: list, kicks: int, rng: np.random.Generator,
+                              deadline: float = None, neighbours_k: int = NEIGHBOURS_K, neighbours: list = None) -> list:
+        neighbours = neighbours if neighbours is not None else self.build_neighbours(dist_matrix, neighbours_k)
+        best = self.local_search(dist_matrix, perm, neighbours, deadline=deadline)
+        best_dist = self.tour_length(dist_matrix, best)
+        for i in range(kicks):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            candidate = self.local_search(dist_matrix, self.perturb(best, rng), neighbours, deadline=deadline)
+            candidate_dist = self.tour_length(dist_matrix, candidate)
+            if candidate_dist < best_dist - 1e-12:
+                best, best_dist = candidate, candidate_dist
+        return self.rotate_to_start(best)
+
+
+    def cheapest_insertion(self, dist_matrix: np.ndarray, perm: list, stop: int) -> int:
+        # Position d'insertion de stop qui allonge le moins la tournée fermée
+        tour = np.asarray(perm)
+        next_nodes = np.roll(tour, -1)
+        costs = dist_matrix[tour, stop] + dist_matrix[stop, next_nodes] - dist_matrix[tour, next_nodes]
+        return int(np.argmin(costs)) + 1
+
+
+    def insert_stop(self, dist_matrix: np.ndarray, perm: list, stop: int, deadline: float = None,
+                    neighbours_k: int = NEIGHBOURS_K) -> list:
+        # Ajout d'un point à une tournée existante : insertion la moins coûteuse puis réparation locale
+        perm = list(perm)
+        perm.insert(self.cheapest_insertion(dist_matrix, perm, stop), stop)
+        return self.repair(dist_matrix, perm, deadline=deadline, neighbours_k=neighbours_k)
+
+
+    def remove_stop(self, dist_matrix: np.ndarray, perm: list, stop: int, deadline: float = None,
+                    neighbours_k: int = NEIGHBOURS_K) -> list:
+        # La tournée renvoyée est indexée sur la matrice sans le point retiré
+        keep = np.delete(np.arange(len(dist_matrix)), stop)
+        perm = [i - 1 if i > stop else i for i in perm if i != stop]
+        return self.repair(dist_matrix[np.ix_(keep, keep)], perm, deadline=deadline, neighbours_k=neighbours_k)
+
+
+    def repair(self, dist_matrix: np.ndarray, perm: list, deadline: float = None,
+               neighbours_k: int = NEIGHBOURS_K) -> list:
+        # Partant d'une tournée déjà optimisée, la recherche locale converge en quelques passes
+        neighbours = self.build_neighbours(dist_matrix, neighbours_k)
+        return self.rotate_to_start(self.local_search(dist_matrix, perm, neighbours, deadline=deadline))
+
+
+# Pools réutilisés d'une requête à l'autre, un par nombre de workers
+_process_pools = dict()
+_process_pools_lock = threading.Lock()
+
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    with _process_pools_lock:
+        if workers not in _process_pools:
+            # forkserver : un fork du serveur (threads des tâches, des envois, de Flask) pourrait hériter d'un verrou tenu
+            _process_pools[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                          mp_context=multiprocessing.get_context("forkserver"))
+        return _process_pools[workers]
+
+
+def drop_process_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    # Un autre thread a pu remplacer le pool cassé entre-temps
+    with _process_pools_lock:
+        if _process_pools.get(workers) is pool:
+            del _process_pools[workers]
+
+
+def run_restart(dist_matrix: np.ndarray, start_perm: list, improvement: str, seed: np.random.SeedSequence,
+                restart_index: int, wall_deadline: float = None, neighbours_k: int = NEIGHBOURS_K,
+                neighbours: list = None, shares: int = 1) -> dict:
+    started = time.perf_counter()
+    # perf_counter n'est pas comparable d'un processus à l'autre : l'échéance voyage en temps absolu.
+    # Le temps restant est partagé avec les shares - 1 redémarrages qui suivent celui-ci
+    deadline = (started + max(wall_deadline - time.time(), 0) / shares
+                if wall_deadline is not None else None)
+    optimizer = RouteOptimizerService()
+    perm = optimizer.improve_restart(dist_matrix, start_perm, improvement, rng=np.random.default_rng(seed),
+                                     restart_index=restart_index, deadline=deadline, neighbours_k=neighbours_k,
+                                     neighbours=neighbours)
+    return {
+        'restart': restart_index,
+        'distance': optimizer.tour_length(dist_matrix, perm),
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+        'budget_exhausted': deadline is not None and time.perf_counter() >= deadline,
+        'perm': [int(i) for i in perm],
+    }
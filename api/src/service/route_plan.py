@@ -0,0 +1,74 @@
+import os
+from datetime import datetime, timedelta
+from model.route_plan import RoutePlan, RoutePlanStop
+from repository.route_plan import RoutePlanRepo
+from exception.route_plan import RoutePlanNotFoundException
+
+
+class RoutePlanService:
+
+    def __init__(self) -> None:
+        self.route_plan_repo = RoutePlanRepo()
+
+
+    def select_one_by_delivery_id(self, delivery_id: int) -> RoutePlan:
+        route_plan = self.route_plan_repo.select_one_by_delivery_id(delivery_id=delivery_id)
+        if route_plan:
+            return route_plan
+        else:
+            raise RoutePlanNotFoundException(owner="delivery", owner_id=delivery_id)
+
+
+    def select_one_by_collect_id(self, collect_id: int) -> RoutePlan:
+        route_plan = self.route_plan_repo.select_one_by_collect_id(collect_id=collect_id)
+        if route_plan:
+            return route_plan
+        else:
+            raise RoutePlanNotFoundException(owner="collect", owner_id=collect_id)
+
+
+    def get_locations_order(self, route_plan: RoutePlan) -> list[int]:
+        return [stop.location_id for stop in route_plan.stops]
+
+
+    def get_arrivals(self, roadmap: dict, start_datetime: datetime) -> list:
+        if roadmap.get('schedule'):
+            return [datetime.strptime(stop['estimated_arrival'], "%Y-%m-%d %H:%M:%S") for stop in roadmap['schedule']]
+        if start_datetime is None:
+            return [None] * len(roadmap['locations'])
+        # Sans heure limite : trajets successifs et temps de service fixe à chaque arrêt
+        service_time = float(os.getenv('ROADMAP_SERVICE_TIME_MINUTES', 10)) * 60
+        arrivals, elapsed = [start_datetime], 0
+        for leg in roadmap['legs'][:-1]:
+            elapsed += leg['duration'] + (service_time if len(arrivals) > 1 else 0)
+            arrivals.append(start_datetime + timedelta(seconds=elapsed))
+        return arrivals
+
+
+    def build_route_plan(self, roadmap: dict, start_datetime: datetime = None) -> RoutePlan:
+        route_plan = RoutePlan(solver_version=roadmap['solver_version'],
+                               distance=sum(leg['distance'] for leg in roadmap['legs']),
+                               duration=sum(leg['duration'] for leg in roadmap['legs']),
+                               created_at=datetime.now())
+        arrivals = self.get_arrivals(roadmap=roadmap, start_datetime=start_datetime)
+        for position, (location, leg, arrival) in enumerate(zip(roadmap['locations'], roadmap['legs'], arrivals)):
+            route_plan.stops.append(RoutePlanStop(position=position, location_id=location['id'],
+                                                  leg_distance=leg['distance'], leg_duration=leg['duration'],
+                                                  estimated_arrival=arrival))
+        return route_plan
+
+
+    def insert_for_delivery(self, delivery_id: int, roadmap: dict, start_datetime: datetime = None) -> int:
+        route_plan = self.build_route_plan(roadmap=roadmap, start_datetime=start_datetime)
+        route_plan.delivery_id = delivery_id
+        return self.route_plan_repo.insert(new_route_plan=route_plan)
+
+
+    def delete_for_delivery(self, delivery_id: int) -> None:
+        self.route_plan_repo.delete_by_delivery_id(delivery_id=delivery_id)
+
+
+    def insert_for_collect(self, collect_id: int, roadmap: dict, start_datetime: datetime = None) -> int:
+        route_plan = self.build_route_plan(roadmap=roadmap, start_datetime=start_datetime)
+        route_plan.collect_id = collect_id
+        return self.route_plan_repo.insert(new_route_plan=route_plan)
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import requests
+from exception.roadmap import RoutingProviderException
+from function.distance import haversine_distances, haversine_matrix
+
+
+# Coordonnées arrondies à ~1 m dans les clés du cache : un même lieu géocodé deux fois partage ses trajets
+CACHE_KEY_DECIMALS = 5
+
+# Erreurs du fournisseur qui basculent sur le calcul local au lieu de faire échouer la tournée
+PROVIDER_ERRORS = (RoutingProviderException, requests.RequestException, KeyError, IndexError, TypeError, ValueError)
+
+
+class LegCache:
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+
+    def key(self, origin, destination) -> tuple:
+        return tuple(round(float(value), CACHE_KEY_DECIMALS) for value in (*origin, *destination))
+
+
+    def get(self, origin, destination):
+        key = self.key(origin, destination)
+        ttl = float(os.getenv('ROUTING_CACHE_TTL_SECONDS', 86400))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry['cached_at'] > ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+
+    def put(self, origin, destination, distance: float, duration: float, geometry: list = None) -> None:
+        key = self.key(origin, destination)
+        max_entries = int(os.getenv('ROUTING_CACHE_MAX_ENTRIES', 100000))
+        with self.lock:
+            previous = self.entries.get(key)
+            # Une entrée issue d'une matrice ne doit pas effacer le tracé déjà connu
+            if geometry is None and previous is not None:
+                geometry = previous['geometry']
+            self.entries[key] = {'distance': distance, 'duration': duration, 'geometry': geometry,
+                                 'cached_at': time.monotonic()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > max_entries:
+                self.entries.popitem(last=False)
+
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+# Cache partagé par tous les threads du processus
+_leg_cache = LegCache()
+
+
+def get_leg_cache() -> LegCache:
+    return _leg_cache
+
+
+class GeoapifyRouter:
+
+    name = "geoapify"
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+
+
+    def request(self, method: str, path: str, params: dict = None, json: dict = None) -> dict:
+        params = {**(params or {}), 'apiKey': os.getenv('GEOAPIFY_API_KEY')}
+        retries = int(os.getenv('ROUTING_RETRIES', 2))
+        status_code = None
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                response = self.session.request(method, f"https://api.geoapify.com/v1/{path}", params=params, json=json,
+                                                headers={'Accept': "application/json"},
+                                                timeout=float(os.getenv('ROUTING_TIMEOUT_SECONDS', 10)))
+            except (requests.ConnectionError, requests.Timeout):
+                continue
+            status_code = response.status_code
+            # Quota dépassé ou erreur serveur : on réessaie, les autres erreurs sont définitives
+            if status_code == 429 or status_code >= 500:
+                continue
+            if not response.ok:
+                break
+            return response.json()
+        raise RoutingProviderException(provider=self.name, status_code=status_code)
+
+
+    def route(self, points: list) -> list[dict]:
+        waypoints = "|".join(f"{point[0]},{point[1]}" for point in points)
+        data = self.request("GET", "routing", params={'waypoints': waypoints, 'mode': "drive"})
+        feature = data['features'][0]
+        # Une ligne de la géométrie par étape, coordonnées en (lon, lat)
+        lines = feature['geometry']['coordinates']
+        legs = feature['properties']['legs']
+        if len(legs) != len(points) - 1 or len(lines) != len(legs):
+            raise RoutingProviderException(provider=self.name)
+        return [{'distance': leg['distance'], 'duration': leg['time'],
+                 'geometry': [[coordinate[1], coordinate[0]] for coordinate in line]}
+                for leg, line in zip(legs, lines)]
+
+
+    def matrix(self, sources: np.ndarray, targets: np.ndarray):
+        data = self.request("POST", "routematrix", json={
+            'mode': "drive",
+            'sources': [{'location': [float(point[1]), float(point[0])]} for point in sources],
+            'targets': [{'location': [float(point[1]), float(point[0])]} for point in targets],
+        })
+        durations = np.full((len(sources), len(targets)), np.nan)
+        distances = np.full((len(sources), len(targets)), np.nan)
+        for row in data['sources_to_targets']:
+            for cell in row:
+                if cell.get('time') is not None and cell.get('distance') is not None:
+                    durations[cell['source_index'], cell['target_index']] = cell['time']
+                    distances[cell['source_index'], cell['target_index']] = cell['distance']
+        # Paire sans itinéraire : la matrice ne peut pas être utilisée telle quelle
+        if np.isnan(durations).any():
+            raise RoutingProviderException(provider=self.name)
+        return durations, distances
+
+
+class LocalRouter:
+
+    name = "local"
+
+    # Ligne droite à vitesse moyenne constante, sans appel réseau (tests, panne du fournisseur)
+    def speed(self) -> float:
+        return float(os.getenv('ROADMAP_AVERAGE_SPEED_KMH', 30))
+
+
+    def route(self, points: list) -> list[dict]:
+        points = np.asarray(points, dtype=float)
+        legs = haversine_distances(points[:-1], points[1:])
+        return [{'distance': round(float(leg) * 1000), 'duration': round(float(leg) / self.speed() * 3600),
+                 'geometry': points[i:i + 2].tolist()}
+                for i, leg in enumerate(legs)]
+
+
+    def matrix(self, sources: np.ndarray, targets: np.ndarray):
+        distances = haversine_matrix(np.vstack((sources, targets)))[:len(sources), len(sources):]
+        return distances / self.speed() * 3600, distances * 1000
+
+
+ROUTERS = {
+    "geoapify": GeoapifyRouter,
+    "local": LocalRouter,
+}
+
+
+class RoutingService:
+
+    def __init__(self) -> None:
+        self.router = ROUTERS[os.getenv('ROUTING_PROVIDER', "geoapify")]()
+        self.fallback = LocalRouter()
+        self.leg_cache = get_leg_cache()
+
+
+    def route(self, points: list) -> dict:
+        # Itinéraire passant par les points dans l'ordre, étapes déjà connues servies par le cache
+        pairs = list(zip(points[:-1], points[1:]))
+        legs = [self.leg_cache.get(origin, destination) for origin, destination in pairs]
+        provider = "cache"
+        if any(leg is None or leg['geometry'] is None for leg in legs):
+            try:
+                legs = self.router.route(points)
+                provider = self.router.name
+                for (origin, destination), leg in zip(pairs, legs):
+                    self.leg_cache.put(origin, destination, leg['distance'], leg['duration'], leg['geometry'])
+            except PROVIDER_ERRORS:
+                legs = self.fallback.route(points)
+                provider = self.fallback.name
+
+        geometry = list()
+        for leg in legs:
+            # Le premier point d'une étape est le dernier de la précédente
+            geometry.extend(leg['geometry'][1:] if geometry and leg['geometry'][0] == geometry[-1] else leg['geometry'])
+        return {
+            'geometry': geometry,
+            'distance': sum(leg['distance'] for leg in legs),
+            'duration': sum(leg['duration'] for leg in legs),
+            'legs': [{'distance': leg['distance'], 'duration': leg['duration']} for leg in legs],
+            'provider': provider,
+        }
+
+
+    def matrix(self, points) -> dict:
+        # Durées (s) et distances (m) entre tous les points, seules les lignes incomplètes sont demandées
+        points = np.asarray(points, dtype=float)
+        size = len(points)
+        durations = np.zeros((size, size))
+        distances = np.zeros((size, size))
+        missing = list()
+        for i in range(size):
+            for j in range(size):
+                if i == j:
+                    continue
+                entry = self.leg_cache.get(points[i], points[j])
+                if entry is None:
+                    missing.append(i)
+                    break
+                durations[i, j] = entry['duration']
+                distances[i, j] = entry['distance']
+
+        provider = "cache"
+        if missing:
+            # Le fournisseur limite le nombre de couples par requête : plusieurs lignes entières par requête,
+            # ou une ligne découpée en blocs de colonnes quand une seule la dépasse
+            max_elements = max(1, int(os.getenv('ROUTING_MATRIX_MAX_ELEMENTS', 1000)))
+            columns = min(size, max_elements)
+            chunk = max(1, max_elements // columns)
+            try:
+                for start in range(0, len(missing), chunk):
+                    rows = missing[start:start + chunk]
+                    for column in range(0, size, columns):
+                        targets = slice(column, column + columns)
+                        durations[rows, targets], distances[rows, targets] = self.router.matrix(points[rows], points[targets])
+                provider = self.router.name
+            except PROVIDER_ERRORS:
+                durations, distances = self.fallback.matrix(points, points)
+                return {'durations': durations, 'distances': distances, 'provider': self.fallback.name}
+            for i in missing:
+                for j in range(size):
+                    if i != j:
+                        self.leg_cache.put(points[i], points[j], float(distances[i, j]), float(durations[i, j]))
+            np.fill_diagonal(durations, 0)
+            np.fill_diagonal(distances, 0)
+        return {'durations': durations, 'distances': distances, 'provider': provider}
@@ -5,6 +5,7 @@ from exception.company import CompanyIdNotFoundException
 from exception.location import LocationIdNotFoundException
 from service.company import CompanyService
 from service.location import LocationService
+from service.warehouse import WarehouseService
 
 
 class ShopService:
@@ -13,6 +14,7 @@ class ShopService:
         self.shop_repo = ShopRepo()
         self.company_service = CompanyService()
         self.location_service = LocationService()
+        self.warehouse_service = WarehouseService()
 
     def select_one_by_id(self, shop_id: int):
         shop = self.shop_repo.select_one_by_id(shop_id=shop_id)
@@ -21,6 +23,12 @@ class ShopService:
         else:
             raise ShopIdNotFoundException(shop_id=shop_id)
         
+    def select_nearest_warehouses(self, shop_id: int, k: int) -> list:
+        shop = self.select_one_by_id(shop_id=shop_id)
+        if shop.location.latitude is None:
+            return list()
+        return self.warehouse_service.select_nearest(latitude=shop.location.latitude, longitude=shop.location.longitude, k=k)
+        
     def select_per_page(self, page: int) -> list[Shop]:
         shops = self.shop_repo.select_per_page(page=page)
         return shops
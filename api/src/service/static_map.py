@@ -0,0 +1,95 @@
+import io
+import math
+import os
+import requests
+from PIL import Image, ImageDraw
+
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+# Couleurs par défaut des cartes folium
+BACKGROUND_COLOR = (242, 239, 233)
+ROUTE_COLOR = (51, 136, 255)
+START_COLOR = (114, 176, 38)
+STOP_COLOR = (56, 170, 221)
+MARKER_RADIUS = 11
+
+
+class StaticMapService:
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+
+
+    def project(self, latitude: float, longitude: float, zoom: int) -> tuple[float, float]:
+        # Web Mercator : coordonnées en pixels de la carte du monde au niveau de zoom donné
+        scale = TILE_SIZE * 2 ** zoom
+        sin_lat = min(max(math.sin(math.radians(float(latitude))), -0.9999), 0.9999)
+        x = (float(longitude) + 180) / 360 * scale
+        y = (0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)) * scale
+        return x, y
+
+
+    def get_zoom(self, points: list, width: int, height: int, padding: int) -> int:
+        # Zoom le plus fort qui fait tenir tous les points dans l'image
+        for zoom in range(MAX_ZOOM, -1, -1):
+            xs, ys = zip(*(self.project(latitude, longitude, zoom) for latitude, longitude in points))
+            if max(xs) - min(xs) <= width - 2 * padding and max(ys) - min(ys) <= height - 2 * padding:
+                return zoom
+        return 0
+
+
+    def get_tile(self, zoom: int, x: int, y: int):
+        # Tuiles lues dans MAP_TILES_DIR ({z}/{x}/{y}.png), téléchargées depuis MAP_TILE_URL si absentes
+        if y < 0 or y >= 2 ** zoom:
+            return None
+        x = x % 2 ** zoom
+        tiles_dir = os.getenv('MAP_TILES_DIR')
+        tile_url = os.getenv('MAP_TILE_URL')
+        path = os.path.join(tiles_dir, str(zoom), str(x), f"{y}.png") if tiles_dir else None
+        if path and os.path.exists(path):
+            return Image.open(path).convert("RGB")
+        if not tile_url:
+            return None
+        try:
+            response = self.session.get(tile_url.format(z=zoom, x=x, y=y),
+                                        headers={'User-Agent': "au-temps-donne roadmap renderer"},
+                                        timeout=float(os.getenv('MAP_TILE_TIMEOUT_SECONDS', 5)))
+            response.raise_for_status()
+            tile = Image.open(io.BytesIO(response.content)).convert("RGB")
+        except (requests.RequestException, OSError):
+            return None
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tile.save(path)
+        return tile
+
+
+    def render(self, route: list, markers: list, width: int = 1200, height: int = 660, padding: int = 40) -> Image.Image:
+        # Tracé et marqueurs dessinés directement, le premier marqueur est le point de départ
+        points = list(route) + list(markers)
+        zoom = self.get_zoom(points, width, height, padding)
+        xs, ys = zip(*(self.project(latitude, longitude, zoom) for latitude, longitude in points))
+        left = (min(xs) + max(xs)) / 2 - width / 2
+        top = (min(ys) + max(ys)) / 2 - height / 2
+
+        image = Image.new("RGB", (width, height), BACKGROUND_COLOR)
+        for tile_x in range(math.floor(left / TILE_SIZE), math.floor((left + width) / TILE_SIZE) + 1):
+            for tile_y in range(math.floor(top / TILE_SIZE), math.floor((top + height) / TILE_SIZE) + 1):
+                tile = self.get_tile(zoom, tile_x, tile_y)
+                if tile is not None:
+                    image.paste(tile, (round(tile_x * TILE_SIZE - left), round(tile_y * TILE_SIZE - top)))
+
+        draw = ImageDraw.Draw(image)
+        pixels = [(x - left, y - top) for x, y in (self.project(latitude, longitude, zoom) for latitude, longitude in route)]
+        if len(pixels) > 1:
+            draw.line(pixels, fill=ROUTE_COLOR, width=5, joint="curve")
+        for i, (latitude, longitude) in enumerate(markers):
+            x, y = self.project(latitude, longitude, zoom)
+            x, y = x - left, y - top
+            draw.ellipse((x - MARKER_RADIUS, y - MARKER_RADIUS, x + MARKER_RADIUS, y + MARKER_RADIUS),
+                         fill=START_COLOR if i == 0 else STOP_COLOR, outline=(255, 255, 255), width=2)
+            label = "S" if i == 0 else str(i)
+            box = draw.textbbox((0, 0), label)
+            draw.text((x - (box[0] + box[2]) / 2, y - (box[1] + box[3]) / 2), label, fill=(255, 255, 255))
+        return image
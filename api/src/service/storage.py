@@ -3,6 +3,7 @@ from repository.storage import StorageRepo
 from exception.storage import StorageIdNotFoundException
 from exception.warehouse import WarehouseIdNotFoundException
 from service.warehouse import WarehouseService
+from service.warehouse_assignment import invalidate_warehouse_index
 
 
 class StorageService:
@@ -34,6 +35,7 @@ class StorageService:
             raise WarehouseIdNotFoundException
       
         self.storage_repo.insert(new_storage=new_storage)
+        invalidate_warehouse_index()
 
     def update(self, storage_id: int, args: dict):
         update_storage = Storage(name=args['name'], warehouse_id=args['warehouse_id'])
@@ -46,8 +48,10 @@ class StorageService:
             raise WarehouseIdNotFoundException
 
         self.storage_repo.update(storage_id=storage_id, update_storage=update_storage)
+        invalidate_warehouse_index()
 
     def delete(self, storage_id: str):
         if not self.storage_repo.select_one_by_id(storage_id=storage_id):
             raise StorageIdNotFoundException(storage_id=storage_id)
         self.storage_repo.delete(storage_id=storage_id)
+        invalidate_warehouse_index()
@@ -0,0 +1,124 @@
+import time
+import numpy as np
+
+
+# Tournée unique avec heure limite de passage (VRPTW à un véhicule), le dépôt est l'indice 0.
+# Les durées sont en secondes depuis le départ du dépôt.
+class TimeWindowRoutingService:
+
+    def schedule(self, duration_matrix: np.ndarray, order: list, service_time: float) -> np.ndarray:
+        order = np.asarray(order)
+        arrivals = np.zeros(len(order))
+        if len(order) > 1:
+            legs = duration_matrix[order[:-1], order[1:]]
+            arrivals[1:] = np.cumsum(legs) + service_time * np.arange(len(order) - 1)
+        return arrivals
+
+
+    def get_slack(self, deadlines: np.ndarray, order: list, arrivals: np.ndarray) -> np.ndarray:
+        # slack[k] : retard maximal absorbable à partir de la position k sans rater d'heure limite
+        slack = deadlines[np.asarray(order)] - arrivals
+        return np.minimum.accumulate(slack[::-1])[::-1]
+
+
+    def insertion_costs(self, duration_matrix: np.ndarray, deadlines: np.ndarray, order: list,
+                        arrivals: np.ndarray, slack: np.ndarray, stop: int, service_time: float, check_stop: bool = True):
+        # Coût et faisabilité de l'insertion de stop après chaque position k, évalués en O(1) par position
+        order = np.asarray(order)
+        next_nodes = np.append(order[1:], 0)
+        travel_in = duration_matrix[order, stop]
+        travel_out = duration_matrix[stop, next_nodes]
+        detour = travel_in + service_time + travel_out - duration_matrix[order, next_nodes]
+        departures = arrivals + np.where(np.arange(len(order)) > 0, service_time, 0)
+        stop_arrivals = departures + travel_in
+
+        next_slack = np.append(slack[1:], np.inf)
+        feasible = detour <= next_slack + 1e-9
+        if check_stop:
+            feasible &= stop_arrivals <= deadlines[stop] + 1e-9
+        return detour, feasible
+
+
+    def insert_stop(self, duration_matrix: np.ndarray, deadlines: np.ndarray, order: list,
+                    stop: int, service_time: float, check_stop: bool = True):
+        arrivals = self.schedule(duration_matrix, order, service_time)
+        slack = self.get_slack(deadlines, order, arrivals)
+        costs, feasible = self.insertion_costs(duration_matrix, deadlines, order, arrivals, slack,
+                                               stop, service_time, check_stop=check_stop)
+        if not feasible.any():
+            return None, None
+        position = int(np.argmin(np.where(feasible, costs, np.inf)))
+        return position + 1, float(costs[position])
+
+
+    def relocate_move(self, duration_matrix: np.ndarray, deadlines: np.ndarray, order: list, service_time: float) -> bool:
+        n = len(order)
+        for i in range(1, n):
+            stop = order[i]
+            prev_node, next_node = order[i - 1], order[(i + 1) % n]
+            removal_gain = (duration_matrix[prev_node, stop] + duration_matrix[stop, next_node]
+                            - duration_matrix[prev_node, next_node] + service_time)
+            reduced = order[:i] + order[i + 1:]
+            position, cost = self.insert_stop(duration_matrix, deadlines, reduced, stop, service_time)
+            if position is not None and position != i and cost - removal_gain < -1e-9:
+                order[:] = reduced[:position] + [stop] + reduced[position:]
+                return True
+        return False
+
+
+    def rescue_late(self, duration_matrix: np.ndarray, deadlines: np.ndarray, effective_deadlines: np.ndarray,
+                    order: list, service_time: float) -> bool:
+        # Un arrêt en retard redevient à l'heure s'il peut être réinséré sans retarder les autres
+        for stop in order[1:]:
+            if effective_deadlines[stop] == deadlines[stop]:
+                continue
+            i = order.index(stop)
+            reduced = order[:i] + order[i + 1:]
+            candidate_deadlines = effective_deadlines.copy()
+            candidate_deadlines[stop] = deadlines[stop]
+            position, cost = self.insert_stop(duration_matrix, candidate_deadlines, reduced, stop, service_time)
+            if position is not None:
+                order[:] = reduced[:position] + [stop] + reduced[position:]
+                effective_deadlines[stop] = deadlines[stop]
+                return True
+        return False
+
+
+    def solve(self, duration_matrix: np.ndarray, deadlines, service_time: float = 0.0,
+              time_budget_ms: int = None) -> dict:
+        n = len(duration_matrix)
+        deadlines = np.asarray(deadlines, dtype=float)
+        deadline = (time.perf_counter() + time_budget_ms / 1000
+                    if time_budget_ms is not None else None)
+
+        # Construction : insertion la moins coûteuse, par heure limite croissante
+        order, late = [0], list()
+        candidates = sorted(range(1, n), key=lambda i: (deadlines[i], duration_matrix[0, i]))
+        for stop in candidates:
+            position, cost = self.insert_stop(duration_matrix, deadlines, order, stop, service_time)
+            if position is None:
+                late.append(stop)
+            else:
+                order.insert(position, stop)
+
+        # Les arrêts hors délai ne doivent pas retarder ceux qui sont à l'heure
+        effective_deadlines = deadlines.copy()
+        effective_deadlines[late] = np.inf
+        for stop in late:
+            position, cost = self.insert_stop(duration_matrix, effective_deadlines, order, stop, service_time)
+            order.insert(position if position is not None else len(order), stop)
+
+        while deadline is None or time.perf_counter() < deadline:
+            if not (self.relocate_move(duration_matrix, effective_deadlines, order, service_time)
+                    or self.rescue_late(duration_matrix, deadlines, effective_deadlines, order, service_time)):
+                break
+
+        arrivals = self.schedule(duration_matrix, order, service_time)
+        late = [int(order[k]) for k in range(1, n) if arrivals[k] > deadlines[order[k]] + 1e-9]
+        total = float(arrivals[-1] + service_time + duration_matrix[order[-1], 0]) if n > 1 else 0.0
+        return {
+            'order': [int(i) for i in order],
+            'arrivals': [float(t) for t in arrivals],
+            'late': late,
+            'duration': total,
+        }
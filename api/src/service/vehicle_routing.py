@@ -0,0 +1,247 @@
+import os
+import time
+import numpy as np
+from exception.roadmap import RoadmapWeightsException
+from function.distance import project_equirectangular
+from service.location import LocationService
+from service.package import PackageService
+from service.route_optimizer import RouteOptimizerService, ILS_KICKS
+from service.vehicle import VehicleService
+from service.warehouse import WarehouseService
+
+
+# Charge utile en kg par type de véhicule : 1 = Camion, 2 = Moto, 3 = Voiture, 4 = Autres
+VEHICLE_CAPACITIES = {1: 1000.0, 2: 30.0, 3: 300.0, 4: 100.0}
+# Nombre maximal de passes de déplacement de points entre tournées
+RELOCATE_MAX_PASSES = 10
+
+
+# Capacitated Vehicle Routing Problem, le dépôt est toujours l'indice 0
+class VehicleRoutingService:
+
+    def __init__(self) -> None:
+        self.route_optimizer = RouteOptimizerService()
+        self.location_service = LocationService()
+        self.package_service = PackageService()
+        self.vehicle_service = VehicleService()
+        self.warehouse_service = WarehouseService()
+
+
+    def get_capacity(self, vehicle) -> float:
+        return VEHICLE_CAPACITIES.get(vehicle.type, VEHICLE_CAPACITIES[4])
+
+
+    def savings_routes(self, dist_matrix: np.ndarray, weights: np.ndarray, stops: list, capacity: float) -> list:
+        stops = np.asarray(stops, dtype=int)
+        if len(stops) == 0:
+            return list()
+        routes = {int(i): [int(i)] for i in stops}
+        route_of = {int(i): int(i) for i in stops}
+        loads = {int(i): float(weights[i]) for i in stops}
+
+        # Clarke & Wright : s(i, j) = d(0, i) + d(0, j) - d(i, j)
+        depot_distances = dist_matrix[0, stops]
+        savings = depot_distances[:, np.newaxis] + depot_distances[np.newaxis, :] - dist_matrix[np.ix_(stops, stops)]
+        rows, cols = np.triu_indices(len(stops), k=1)
+        values = savings[rows, cols]
+        for edge in np.argsort(-values, kind="stable"):
+            if values[edge] <= 0:
+                break
+            i, j = int(stops[rows[edge]]), int(stops[cols[edge]])
+            route_i, route_j = route_of[i], route_of[j]
+            if route_i == route_j or loads[route_i] + loads[route_j] > capacity:
+                continue
+            first, second = routes[route_i], routes[route_j]
+            # Les deux points doivent être en bout de tournée pour être reliés
+            if first[-1] == i and second[0] == j:
+                merged = first + second
+            elif first[0] == i and second[-1] == j:
+                merged = second + first
+            elif first[-1] == i and second[-1] == j:
+                merged = first + second[::-1]
+            elif first[0] == i and second[0] == j:
+                merged = first[::-1] + second
+            else:
+                continue
+            routes[route_i] = merged
+            loads[route_i] += loads.pop(route_j)
+            del routes[route_j]
+            for k in second:
+                route_of[k] = route_i
+        return list(routes.values())
+
+
+    def sweep_routes(self, locations: np.ndarray, weights: np.ndarray, stops: list, capacity: float) -> list:
+        stops = np.asarray(stops, dtype=int)
+        if len(stops) == 0:
+            return list()
+        projected = project_equirectangular(locations)
+        angles = np.arctan2(projected[stops, 0] - projected[0, 0], projected[stops, 1] - projected[0, 1])
+        routes, route, load = list(), list(), 0.0
+        for i in stops[np.argsort(angles, kind="stable")]:
+            if route and load + weights[i] > capacity:
+                routes.append(route)
+                route, load = list(), 0.0
+            route.append(int(i))
+            load += weights[i]
+        routes.append(route)
+        return routes
+
+
+    def assign_vehicles(self, routes: list, weights: np.ndarray, capacities: list, free_vehicles: list):
+        # Meilleur ajustement : la tournée la plus chargée prend le plus petit véhicule suffisant
+        free_vehicles = sorted(free_vehicles, key=lambda v: capacities[v])
+        assigned, unassigned = dict(), list()
+        for route in sorted(routes, key=lambda r: -weights[r].sum()):
+            load = weights[route].sum()
+            vehicle = next((v for v in free_vehicles if capacities[v] >= load), None)
+            if vehicle is None:
+                unassigned.extend(route)
+            else:
+                free_vehicles.remove(vehicle)
+                assigned[vehicle] = list(route)
+        return assigned, unassigned
+
+
+    def insertion_cost(self, dist_matrix: np.ndarray, route: list, stop: int):
+        tour = np.array([0] + route + [0])
+        costs = (dist_matrix[tour[:-1], stop] + dist_matrix[stop, tour[1:]]
+                 - dist_matrix[tour[:-1], tour[1:]])
+        position = int(np.argmin(costs))
+        return float(costs[position]), position
+
+
+    def insert_unassigned(self, dist_matrix: np.ndarray, weights: np.ndarray, capacities: list,
+                          assigned: dict, unassigned: list) -> list:
+        remaining = list()
+        for stop in sorted(unassigned, key=lambda i: -weights[i]):
+            best = None
+            for vehicle, route in assigned.items():
+                if weights[route].sum() + weights[stop] > capacities[vehicle]:
+                    continue
+                cost, position = self.insertion_cost(dist_matrix, route, stop)
+                if best is None or cost < best[0]:
+                    best = (cost, vehicle, position)
+            if best is None:
+                remaining.append(stop)
+            else:
+                cost, vehicle, position = best
+                assigned[vehicle].insert(position, stop)
+        return remaining
+
+
+    def relocate_between_routes(self, dist_matrix: np.ndarray, weights: np.ndarray, capacities: list,
+                                assigned: dict, deadline: float = None) -> None:
+        for _ in range(RELOCATE_MAX_PASSES):
+            improved = False
+            for vehicle, route in assigned.items():
+                for stop in list(route):
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        return
+                    index = route.index(stop)
+                    tour = [0] + route + [0]
+                    prev_node, next_node = tour[index], tour[index + 2]
+                    removal_gain = (dist_matrix[prev_node, stop] + dist_matrix[stop, next_node]
+                                    - dist_matrix[prev_node, next_node])
+                    for other, other_route in assigned.items():
+                        if other == vehicle or weights[other_route].sum() + weights[stop] > capacities[other]:
+                            continue
+                        cost, position = self.insertion_cost(dist_matrix, other_route, stop)
+                        if cost - removal_gain < -1e-9:
+                            route.remove(stop)
+                            other_route.insert(position, stop)
+                            improved = True
+                            break
+            if not improved:
+                return
+
+
+    def improve_route(self, dist_matrix: np.ndarray, route: list, rng: np.random.Generator, deadline: float = None) -> list:
+        nodes = [0] + route
+        if len(nodes) <= 3:
+            return route
+        sub_matrix = dist_matrix[np.ix_(nodes, nodes)]
+        perm = self.route_optimizer.iterated_local_search(sub_matrix, list(range(len(nodes))), kicks=ILS_KICKS,
+                                                          rng=rng, deadline=deadline)
+        return [nodes[i] for i in perm[1:]]
+
+
+    def solve(self, dist_matrix: np.ndarray, weights, capacities: list, locations: np.ndarray = None,
+              method: str = "savings", seed=None, time_budget_ms: int = None) -> dict:
+        weights = np.asarray(weights, dtype=float)
+        deadline = (time.perf_counter() + time_budget_ms / 1000
+                    if time_budget_ms is not None else None)
+        rng = np.random.default_rng(seed)
+        max_capacity = max(capacities, default=0.0)
+        stops = [i for i in range(1, len(dist_matrix)) if weights[i] <= max_capacity]
+        oversized = [i for i in range(1, len(dist_matrix)) if weights[i] > max_capacity]
+
+        assigned, unassigned = dict(), stops
+        free_vehicles = list(range(len(capacities)))
+        # Les points restants sont regroupés à nouveau pour les véhicules encore libres
+        while unassigned and free_vehicles:
+            capacity = max(capacities[v] for v in free_vehicles)
+            if method == "sweep" and locations is not None:
+                routes = self.sweep_routes(locations, weights, unassigned, capacity)
+            else:
+                routes = self.savings_routes(dist_matrix, weights, unassigned, capacity)
+            new_assigned, unassigned = self.assign_vehicles(routes, weights, capacities, free_vehicles)
+            if not new_assigned:
+                break
+            assigned.update(new_assigned)
+            free_vehicles = [v for v in free_vehicles if v not in new_assigned]
+        unassigned = self.insert_unassigned(dist_matrix, weights, capacities, assigned, unassigned)
+        self.relocate_between_routes(dist_matrix, weights, capacities, assigned, deadline=deadline)
+
+        routes = list()
+        for vehicle, route in sorted(assigned.items()):
+            if not route:
+                continue
+            route = self.improve_route(dist_matrix, route, rng, deadline=deadline)
+            routes.append({
+                'vehicle': vehicle,
+                'stops': route,
+                'load': float(weights[route].sum()),
+                'distance': self.route_optimizer.tour_length(dist_matrix, [0] + route),
+            })
+        return {'routes': routes, 'unassigned': sorted(unassigned + oversized)}
+
+
+    def get_stop_weights(self, locations_id: list[int], weights: list = None, packages: list = None) -> list:
+        if weights:
+            if len(weights) != len(locations_id):
+                raise RoadmapWeightsException()
+            return [0.0] + [float(weight) for weight in weights]
+        if packages:
+            # Sans rattachement colis / lieu, le poids total est réparti entre les arrêts
+            total = sum(self.package_service.select_one_by_id(package_id=package_id).weight or 0
+                        for package_id in packages)
+            return [0.0] + [total / len(locations_id)] * len(locations_id)
+        return [0.0] * (len(locations_id) + 1)
+
+
+    def plan_routes(self, warehouse_id: int, locations_id: list[int], vehicles_id: list[int],
+                    weights: list = None, packages: list = None, method: str = "savings") -> dict:
+        warehouse = self.warehouse_service.select_one_by_id(warehouse_id=warehouse_id)
+        locations = [warehouse.location] + [self.location_service.select_one_by_id(location_id=location_id)
+                                            for location_id in locations_id]
+        vehicles = [self.vehicle_service.select_one_by_id(vehicle_id=vehicle_id) for vehicle_id in vehicles_id]
+        stop_weights = self.get_stop_weights(locations_id=locations_id, weights=weights, packages=packages)
+
+        coordinates = np.array([[location.latitude, location.longitude] for location in locations], dtype=float)
+        dist_matrix = self.route_optimizer.build_distance_matrix(coordinates)
+        solution = self.solve(dist_matrix, stop_weights, [self.get_capacity(vehicle) for vehicle in vehicles],
+                              locations=coordinates, method=method, seed=sorted(locations_id),
+                              time_budget_ms=int(os.getenv('ROADMAP_TIME_BUDGET_MS', 2000)))
+
+        return {
+            'warehouse': warehouse.json_rest_storage(),
+            'routes': [{
+                'vehicle': vehicles[route['vehicle']].json_rest(),
+                'capacity': self.get_capacity(vehicles[route['vehicle']]),
+                'load': route['load'],
+                'distance': route['distance'],
+                'locations': [locations[i].json_rest() for i in [0] + route['stops']],
+            } for route in solution['routes']],
+            'unassigned': [locations[i].json_rest() for i in solution['unassigned']],
+        }
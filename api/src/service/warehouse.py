@@ -3,6 +3,7 @@ from repository.warehouse import WarehouseRepo
 from exception.warehouse import WarehouseIdNotFoundException
 from exception.location import LocationIdNotFoundException
 from service.location import LocationService
+from service.warehouse_assignment import invalidate_warehouse_index
 
 
 class WarehouseService:
@@ -27,6 +28,10 @@ class WarehouseService:
         warehouses = self.warehouse_repo.select_all()
         return warehouses
 
+    def select_nearest(self, latitude: float, longitude: float, k: int) -> list:
+        warehouses = self.warehouse_repo.select_nearest(latitude=latitude, longitude=longitude, k=k)
+        return warehouses
+
     def insert(self, args: dict):
         new_warehouse = Warehouse(name=args['name'], location_id=args['location_id'])
 
@@ -34,6 +39,7 @@ class WarehouseService:
            
       
         self.warehouse_repo.insert(new_warehouse=new_warehouse)
+        invalidate_warehouse_index()
 
     def update(self, warehouse_id: int, args: dict):
         update_warehouse = Warehouse(name=args['name'], location_id=args['location_id'])
@@ -45,8 +51,10 @@ class WarehouseService:
         self.location_service.select_one_by_id(update_warehouse.location_id)
 
         self.warehouse_repo.update(warehouse_id=warehouse_id, update_warehouse=update_warehouse)
+        invalidate_warehouse_index()
 
     def delete(self, warehouse_id: str):
         if not self.warehouse_repo.select_one_by_id(warehouse_id=warehouse_id):
             raise WarehouseIdNotFoundException(warehouse_id=warehouse_id)
         self.warehouse_repo.delete(warehouse_id=warehouse_id)
+        invalidate_warehouse_index()
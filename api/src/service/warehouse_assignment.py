@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+import numpy as np
+from scipy.spatial import cKDTree
+from function.distance import haversine_distances, to_unit_vectors
+from repository.demand import DemandRepo
+from repository.warehouse import WarehouseRepo
+
+
+# Index des entrepôts partagé par les requêtes du processus, reconstruit après expiration ou modification
+_warehouse_index = None
+_warehouse_index_lock = threading.Lock()
+
+
+def invalidate_warehouse_index() -> None:
+    global _warehouse_index
+    with _warehouse_index_lock:
+        _warehouse_index = None
+
+
+class WarehouseAssignmentService:
+
+    def __init__(self) -> None:
+        self.warehouse_repo = WarehouseRepo()
+        self.demand_repo = DemandRepo()
+
+
+    def build_index(self) -> dict:
+        # Seuls les entrepôts géolocalisés et disposant d'un stockage peuvent recevoir une collecte
+        warehouses = [warehouse for warehouse in self.warehouse_repo.select_all_with_storages()
+                      if warehouse.storages and warehouse.location.latitude is not None]
+        coordinates = np.array([[warehouse.location.latitude, warehouse.location.longitude]
+                                for warehouse in warehouses], dtype=float).reshape(-1, 2)
+        return {
+            'tree': cKDTree(to_unit_vectors(coordinates)) if len(warehouses) else None,
+            'coordinates': coordinates,
+            'warehouses': [warehouse.json_rest_storage() for warehouse in warehouses],
+            'storages': [{'id': storage.id, 'name': storage.name}
+                         for storage in (min(warehouse.storages, key=lambda storage: storage.id) for warehouse in warehouses)],
+            'expires_at': time.monotonic() + float(os.getenv('WAREHOUSE_INDEX_TTL_SECONDS', 300)),
+        }
+
+
+    def get_index(self) -> dict:
+        global _warehouse_index
+        with _warehouse_index_lock:
+            if _warehouse_index is None or time.monotonic() >= _warehouse_index['expires_at']:
+                _warehouse_index = self.build_index()
+            return _warehouse_index
+
+
+    def assign(self, coordinates, index: dict) -> tuple:
+        # Entrepôt le plus proche de chaque point, en une seule requête sur le KD-tree
+        coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+        if index['tree'] is None or len(coordinates) == 0:
+            return np.full(len(coordinates), -1), np.full(len(coordinates), np.inf)
+        _, nearest = index['tree'].query(to_unit_vectors(coordinates))
+        distances = haversine_distances(coordinates, index['coordinates'][nearest])
+        return nearest, distances
+
+
+    def suggest_storage(self, coordinates) -> dict:
+        # Entrepôt le plus souvent le plus proche des points, puis le plus proche au total en cas d'égalité
+        # Un seul instantané de l'index : il peut être reconstruit entre deux appels à get_index
+        index = self.get_index()
+        nearest, distances = self.assign(coordinates, index=index)
+        candidates = nearest[nearest >= 0]
+        if len(candidates) == 0:
+            return None
+        warehouses, counts = np.unique(candidates, return_counts=True)
+        best = max(warehouses[counts == counts.max()], key=lambda w: -distances[nearest == w].sum())
+        return index['storages'][int(best)]
+
+
+    def get_collect_groupings(self) -> dict:
+        index = self.get_index()
+        demands = self.demand_repo.select_open()
+        located = [demand for demand in demands if demand.shop.location.latitude is not None]
+        nearest, distances = self.assign([[demand.shop.location.latitude, demand.shop.location.longitude]
+                                          for demand in located], index=index)
+
+        groupings = dict()
+        for demand, warehouse_index, distance in zip(located, nearest, distances):
+            if warehouse_index < 0:
+                continue
+            grouping = groupings.setdefault(int(warehouse_index), {
+                'warehouse': index['warehouses'][warehouse_index],
+                'storage': index['storages'][warehouse_index],
+                'demands': list(),
+            })
+            grouping['demands'].append({**demand.json_rest_collect(), 'distance': round(float(distance), 3)})
+
+        assigned = {item['id'] for grouping in groupings.values() for item in grouping['demands']}
+        return {
+            'groupings': list(groupings.values()),
+            'unassigned': [demand.json_rest_collect() for demand in demands if demand.id not in assigned],
+        }
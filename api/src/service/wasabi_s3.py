@@ -1,14 +1,20 @@
-import boto3
-import os
+import hashlib
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from model.artifact import Artifact
+from repository.artifact import ArtifactRepo
+from service.object_storage import get_object_storage, get_s3_client
+
 
 class WasabiS3:
+    def __init__(self) -> None:
+        self.artifact_repo = ArtifactRepo()
+        # Stockage choisi par OBJECT_STORAGE_BACKEND : bucket Wasabi (s3) ou disque local (local)
+        self.object_storage = get_object_storage()
+
     def connect_s3(self):
-        s3 = boto3.client('s3',
-                        endpoint_url=os.getenv('WASABI_ENDPOINT'),
-                        aws_access_key_id=os.getenv('WASABI_ACCESS_KEY'),                           
-                        aws_secret_access_key=os.getenv('WASABI_SECRET_KEY'))
-        return s3
+        return get_s3_client()
     
         
 
@@ -26,25 +32,53 @@ class WasabiS3:
     
 
     
-    def upload_file(self, folder:str, file_path: str, type: str, extension: str):
-        bucket = os.getenv('WASABI_BUCKET_NAME')
-        time = datetime.now()
-        formatted_time = time.strftime('%Y-%m-%d_%H_%M_%f')
-        key = f"{folder}/{type}_{formatted_time}.{extension}"
-        s3 = self.connect_s3()
-        with open(file_path, "rb") as f:
-            file_data = f.read()
-        s3.put_object(Body=file_data, Bucket=bucket, Key=key)
-        return f"{os.getenv('WASABI_ENDPOINT')}/{os.getenv('WASABI_BUCKET_NAME')}/{key}"
+    def upload_bytes(self, folder: str, data: bytes, type: str, extension: str):
+        # Clé dérivée du contenu : un fichier identique déjà présent n'est pas renvoyé, seule sa référence est comptée
+        sha256 = hashlib.sha256(data).hexdigest()
+        key = f"{folder}/{type}_{sha256}.{extension}"
+        content_type = mimetypes.guess_type(f"{type}.{extension}")[0] or "application/octet-stream"
+        new_artifact = Artifact(key=key, sha256=sha256, size=len(data), content_type=content_type, created_at=datetime.now())
+        # Tant que l'envoi n'est pas confirmé, chaque requête envoie le fichier (clé dérivée du contenu : même objet)
+        if self.artifact_repo.acquire(new_artifact=new_artifact):
+            try:
+                self.object_storage.put(key=key, data=data, content_type=content_type)
+            except Exception:
+                self.artifact_repo.release(keys=[key], delete=self.object_storage.delete)
+                raise
+            self.artifact_repo.mark_uploaded(key=key)
+        return self.object_storage.url(key)
+
+
+    def upload_many(self, uploads: list[dict]) -> list[str]:
+        # Envois simultanés (ex. HTML et PDF d'une tournée), adresses renvoyées dans l'ordre des envois
+        if len(uploads) <= 1:
+            return [self.upload_bytes(**upload) for upload in uploads]
+        with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+            return list(executor.map(lambda upload: self.upload_bytes(**upload), uploads))
     
 
+    def get_file_info(self, src: str) -> dict:
+        return self.object_storage.stat(key=self.parse_key(src))
+
+
+    def read_file(self, src: str, start: int, end: int):
+        return self.object_storage.read_range(key=self.parse_key(src), start=start, end=end)
+
+
+    def get_presigned_url(self, src: str) -> dict:
+        return {'url': self.object_storage.presigned_url(key=self.parse_key(src)),
+                'expires_in': self.object_storage.presigned_expires_in()}
+
+
     def parse_key(self, src: str):
-        values = src.split(f"{os.getenv('WASABI_BUCKET_NAME')}/")
-        return values[1]
+        return self.object_storage.key_from_url(src)
+
+
+    def delete_files(self, srcs: list[str]):
+        # Seuls les objets que plus rien ne référence sont supprimés, en une requête par lot de clés
+        self.artifact_repo.release(keys=[self.parse_key(src) for src in srcs if src], delete=self.object_storage.delete)
 
 
-    def delete_file(self, src: str):
-        key = self.parse_key(src)
-        bucket = os.getenv('WASABI_BUCKET_NAME')
-        s3 = self.connect_s3()
-        s3.delete_object(Bucket=bucket, Key=key)
\ No newline at end of file
+    def collect_garbage(self) -> None:
+        # Au démarrage : objets dont la suppression a été interrompue ou refusée par le stockage
+        self.artifact_repo.collect_garbage(delete=self.object_storage.delete)
@@ -26,6 +26,24 @@ SET time_zone = "+00:00";
 
 -- --------------------------------------------------------
 
+--
+-- Structure de la table `artifact`
+--
+
+CREATE TABLE `artifact` (
+  `id` int NOT NULL,
+  `key` varchar(255) NOT NULL,
+  `sha256` varchar(64) NOT NULL,
+  `size` int DEFAULT NULL,
+  `content_type` varchar(100) DEFAULT NULL,
+  `ref_count` int NOT NULL,
+  `uploaded` tinyint(1) NOT NULL DEFAULT '0',
+  `deleting` tinyint(1) NOT NULL DEFAULT '0',
+  `created_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Structure de la table `category`
 --
@@ -226,6 +244,40 @@ INSERT INTO `food` (`id`, `name`, `description`, `category_id`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Structure de la table `geocode_cache`
+--
+
+CREATE TABLE `geocode_cache` (
+  `id` int NOT NULL,
+  `address_key` varchar(255) NOT NULL,
+  `latitude` decimal(10,7) DEFAULT NULL,
+  `longitude` decimal(10,7) DEFAULT NULL,
+  `description` text,
+  `created_at` datetime DEFAULT NULL,
+  `last_used_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `job`
+--
+
+CREATE TABLE `job` (
+  `id` int NOT NULL,
+  `type` varchar(50) NOT NULL,
+  `target_id` int NOT NULL,
+  `status` varchar(20) NOT NULL,
+  `error` text,
+  `payload` text,
+  `created_at` datetime DEFAULT NULL,
+  `started_at` datetime DEFAULT NULL,
+  `finished_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Structure de la table `location`
 --
@@ -237,8 +289,8 @@ CREATE TABLE `location` (
   `city` varchar(30) DEFAULT NULL,
   `country` varchar(30) DEFAULT NULL,
   `description` text,
-  `latitude` varchar(30) DEFAULT NULL,
-  `longitude` varchar(30) DEFAULT NULL
+  `latitude` decimal(10,7) DEFAULT NULL,
+  `longitude` decimal(10,7) DEFAULT NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
 --
@@ -246,14 +298,14 @@ CREATE TABLE `location` (
 --
 
 INSERT INTO `location` (`id`, `address`, `zip_code`, `city`, `country`, `description`, `latitude`, `longitude`) VALUES
-(1, 'Parc des Buttes de Chaumont', '75019', 'Paris', 'France', 'Botzaris - Parc des Buttes Chaumont, Rue Botzaris, Quartier du Combat, 19th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75019, France', '48.8779502', '2.3814623'),
-(2, '28 Boulevard de Magenta', '75019', 'Paris', 'France', '28, Boulevard de Magenta, Quartier de la Porte-Saint-Martin, 10th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75010, France', '48.8705439', '2.3614407'),
-(3, '69 Avenue de France', '75019', 'Paris', 'France', '69, Avenue de France, Quartier de la Gare, 13th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75013, France', '48.8296403', '2.3775887'),
-(4, 'Ranelagh', '75016', 'Paris', 'France', 'Ranelagh, Rue du Ranelagh, Quartier de la Muette, 16th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75016, France', '48.8555764', '2.2702166'),
-(5, 'Paris La défense Arena', '92000', 'Nanterre', 'France', 'Paris La Défense Arena, 99, Rue des Longues Raies, La Défense 7, Quartier du Parc Nord, Nanterre, Arrondissement of Nanterre, Hauts-de-Seine, Ile-de-France, Metropolitan France, 92000, France', '48.89567665', '2.229658055848475'),
-(6, 'Gennevilliers', '92230', 'Gennevilliers', 'France', 'Gennevilliers, Avenue du Général de Gaulle, Le Village, Gennevilliers, Arrondissement of Nanterre, Hauts-de-Seine, Ile-de-France, Metropolitan France, 92230, France', '48.9336452', '2.3075935'),
-(7, '3 Rue Meissonnier', '93500', 'Pantin', 'France', 'Cartel de Belleville, 3, Rue Meissonnier, Cité des Auteurs, Église, Pantin, Bobigny, Seine-Saint-Denis, Ile-de-France, Metropolitan France, 93500, France', '48.8886553', '2.4130258'),
-(8, '17 Rue Yves Toudic', '75010', 'Paris', 'France', 'Lycée Bossuet Notre-Dame, 17, Rue Yves Toudic, Quartier de la Porte-Saint-Martin, 10th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75010, France', '48.8703401', '2.3630653870564453');
+(1, 'Parc des Buttes de Chaumont', '75019', 'Paris', 'France', 'Botzaris - Parc des Buttes Chaumont, Rue Botzaris, Quartier du Combat, 19th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75019, France', 48.8779502, 2.3814623),
+(2, '28 Boulevard de Magenta', '75019', 'Paris', 'France', '28, Boulevard de Magenta, Quartier de la Porte-Saint-Martin, 10th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75010, France', 48.8705439, 2.3614407),
+(3, '69 Avenue de France', '75019', 'Paris', 'France', '69, Avenue de France, Quartier de la Gare, 13th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75013, France', 48.8296403, 2.3775887),
+(4, 'Ranelagh', '75016', 'Paris', 'France', 'Ranelagh, Rue du Ranelagh, Quartier de la Muette, 16th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75016, France', 48.8555764, 2.2702166),
+(5, 'Paris La défense Arena', '92000', 'Nanterre', 'France', 'Paris La Défense Arena, 99, Rue des Longues Raies, La Défense 7, Quartier du Parc Nord, Nanterre, Arrondissement of Nanterre, Hauts-de-Seine, Ile-de-France, Metropolitan France, 92000, France', 48.8956766, 2.2296581),
+(6, 'Gennevilliers', '92230', 'Gennevilliers', 'France', 'Gennevilliers, Avenue du Général de Gaulle, Le Village, Gennevilliers, Arrondissement of Nanterre, Hauts-de-Seine, Ile-de-France, Metropolitan France, 92230, France', 48.9336452, 2.3075935),
+(7, '3 Rue Meissonnier', '93500', 'Pantin', 'France', 'Cartel de Belleville, 3, Rue Meissonnier, Cité des Auteurs, Église, Pantin, Bobigny, Seine-Saint-Denis, Ile-de-France, Metropolitan France, 93500, France', 48.8886553, 2.4130258),
+(8, '17 Rue Yves Toudic', '75010', 'Paris', 'France', 'Lycée Bossuet Notre-Dame, 17, Rue Yves Toudic, Quartier de la Porte-Saint-Martin, 10th Arrondissement, Paris, Ile-de-France, Metropolitan France, 75010, France', 48.8703401, 2.3630654);
 
 -- --------------------------------------------------------
 
@@ -318,6 +370,38 @@ INSERT INTO `role` (`id`, `name`) VALUES
 
 -- --------------------------------------------------------
 
+--
+-- Structure de la table `route_plan`
+--
+
+CREATE TABLE `route_plan` (
+  `id` int NOT NULL,
+  `solver_version` varchar(50) DEFAULT NULL,
+  `distance` int DEFAULT NULL,
+  `duration` int DEFAULT NULL,
+  `created_at` datetime DEFAULT NULL,
+  `delivery_id` int DEFAULT NULL,
+  `collect_id` int DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `route_plan_stop`
+--
+
+CREATE TABLE `route_plan_stop` (
+  `id` int NOT NULL,
+  `route_plan_id` int NOT NULL,
+  `position` int NOT NULL,
+  `location_id` int NOT NULL,
+  `leg_distance` int DEFAULT NULL,
+  `leg_duration` int DEFAULT NULL,
+  `estimated_arrival` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Structure de la table `shop`
 --
@@ -554,6 +638,13 @@ INSERT INTO `warehouse` (`id`, `name`, `location_id`) VALUES
 -- Index pour les tables déchargées
 --
 
+--
+-- Index pour la table `artifact`
+--
+ALTER TABLE `artifact`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `key` (`key`);
+
 --
 -- Index pour la table `category`
 --
@@ -617,11 +708,27 @@ ALTER TABLE `food`
   ADD PRIMARY KEY (`id`),
   ADD KEY `category_id` (`category_id`);
 
+--
+-- Index pour la table `geocode_cache`
+--
+ALTER TABLE `geocode_cache`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `address_key` (`address_key`),
+  ADD KEY `ix_geocode_cache_last_used_at` (`last_used_at`);
+
+--
+-- Index pour la table `job`
+--
+ALTER TABLE `job`
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `ix_job_target` (`type`,`target_id`);
+
 --
 -- Index pour la table `location`
 --
 ALTER TABLE `location`
-  ADD PRIMARY KEY (`id`);
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `ix_location_coordinates` (`latitude`,`longitude`);
 
 --
 -- Index pour la table `package`
@@ -638,6 +745,22 @@ ALTER TABLE `package`
 ALTER TABLE `role`
   ADD PRIMARY KEY (`id`);
 
+--
+-- Index pour la table `route_plan`
+--
+ALTER TABLE `route_plan`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `delivery_id` (`delivery_id`),
+  ADD UNIQUE KEY `collect_id` (`collect_id`);
+
+--
+-- Index pour la table `route_plan_stop`
+--
+ALTER TABLE `route_plan_stop`
+  ADD PRIMARY KEY (`id`),
+  ADD KEY `route_plan_id` (`route_plan_id`,`position`),
+  ADD KEY `location_id` (`location_id`);
+
 --
 -- Index pour la table `shop`
 --
@@ -720,6 +843,12 @@ ALTER TABLE `warehouse`
 -- AUTO_INCREMENT pour les tables déchargées
 --
 
+--
+-- AUTO_INCREMENT pour la table `artifact`
+--
+ALTER TABLE `artifact`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT pour la table `category`
 --
@@ -762,6 +891,18 @@ ALTER TABLE `event`
 ALTER TABLE `food`
   MODIFY `id` int NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=11;
 
+--
+-- AUTO_INCREMENT pour la table `geocode_cache`
+--
+ALTER TABLE `geocode_cache`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
+--
+-- AUTO_INCREMENT pour la table `job`
+--
+ALTER TABLE `job`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT pour la table `location`
 --
@@ -780,6 +921,18 @@ ALTER TABLE `package`
 ALTER TABLE `role`
   MODIFY `id` int NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=5;
 
+--
+-- AUTO_INCREMENT pour la table `route_plan`
+--
+ALTER TABLE `route_plan`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
+--
+-- AUTO_INCREMENT pour la table `route_plan_stop`
+--
+ALTER TABLE `route_plan_stop`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT pour la table `shop`
 --
@@ -880,6 +1033,20 @@ ALTER TABLE `package`
   ADD CONSTRAINT `package_ibfk_2` FOREIGN KEY (`storage_id`) REFERENCES `storage` (`id`),
   ADD CONSTRAINT `package_ibfk_3` FOREIGN KEY (`delivery_id`) REFERENCES `delivery` (`id`);
 
+--
+-- Contraintes pour la table `route_plan`
+--
+ALTER TABLE `route_plan`
+  ADD CONSTRAINT `route_plan_ibfk_1` FOREIGN KEY (`delivery_id`) REFERENCES `delivery` (`id`),
+  ADD CONSTRAINT `route_plan_ibfk_2` FOREIGN KEY (`collect_id`) REFERENCES `collect` (`id`);
+
+--
+-- Contraintes pour la table `route_plan_stop`
+--
+ALTER TABLE `route_plan_stop`
+  ADD CONSTRAINT `route_plan_stop_ibfk_1` FOREIGN KEY (`route_plan_id`) REFERENCES `route_plan` (`id`),
+  ADD CONSTRAINT `route_plan_stop_ibfk_2` FOREIGN KEY (`location_id`) REFERENCES `location` (`id`);
+
 --
 -- Contraintes pour la table `shop`
 --
@@ -127,8 +127,6 @@ export default function AddDemandModal({
               status: 0,
               shop_id: data.shop_id,
               additional: data.additional_info,
-              qr_code: newEvent.qr_code,
-              pdf: newEvent.pdf,
             }),
           }
         );